@@ -1,6 +1,7 @@
 """
 The AI Autonomy Engine — core loop.
-Every 30 min: reads all new signals, decides what matters, pushes to humans.
+Every 30 min: clusters new signals into stories, decides which stories matter, pushes to humans.
+A story reported by several sources is reviewed and pushed once (ai/story_clusterer.py).
 """
 from datetime import datetime, timedelta
 from ai.base_agent import BaseIntelAgent
@@ -16,11 +17,18 @@ class AutonomyEngine(BaseIntelAgent):
 
         since = datetime.utcnow() - timedelta(minutes=35)
 
+        # Signals from producers that do not cluster themselves (Gmail) join their stories here
+        from ai import story_clusterer
+        try:
+            story_clusterer.assign_stories()
+        except Exception as e:
+            print(f"  ⚠️  Story clustering failed: {e}")
+
         with get_db() as db:
-            unreviewed = db.query(models.Signal).filter(
-                models.Signal.created_at >= since,
-                models.Signal.status == 'new'
-            ).all()
+            unreviewed = db.query(models.Story).filter(
+                models.Story.last_seen_at >= since,
+                models.Story.status == 'new'
+            ).order_by(models.Story.max_score.desc()).limit(10).all()
 
             active_deals = db.query(models.Deal).filter(
                 models.Deal.stage.notin_(['closed_won', 'closed_lost'])
@@ -28,21 +36,25 @@ class AutonomyEngine(BaseIntelAgent):
 
             entities = db.query(models.Entity).filter(models.Entity.status == 'active').all()
 
-            signals_data = [{"id": s.id, "title": s.title, "score": s.score,
-                             "entity_id": s.entity_id, "signal_type": s.signal_type}
-                           for s in unreviewed]
+            stories_data = [{"id": s.id, "title": s.title, "score": s.max_score, "entity_id": s.entity_id,
+                             "signal_type": s.signal_type, "signal_count": s.signal_count,
+                             "source_types": s.source_types or []}
+                            for s in unreviewed]
             deals_data = [{"id": d.id, "account_name": d.account_name, "stage": d.stage}
                          for d in active_deals]
             entities_data = [{"id": e.id, "name": e.name, "entity_type": e.entity_type,
                               "threat_level": e.threat_level}
                             for e in entities]
 
-        if not signals_data:
-            print("  → No new signals")
+        if not stories_data:
+            print("  → No new stories")
             return
 
-        print(f"  → Processing {len(signals_data)} signals")
-        decisions = self._should_surface_batch(signals_data[:10], deals_data, entities_data)
+        print(f"  → Processing {len(stories_data)} stories "
+              f"({sum(s['signal_count'] for s in stories_data)} signals)")
+        decisions = self._should_surface_batch(stories_data, deals_data, entities_data)
+        scores = {str(s["id"]): s["score"] for s in stories_data}  # ids come back from the model as JSON
+        self._mark_reviewed({d.get('story_id'): scores.get(str(d.get('story_id'))) for d in decisions})
 
         pushed = 0
         for decision in decisions:
@@ -55,17 +67,21 @@ class AutonomyEngine(BaseIntelAgent):
         self._calibrate_thresholds()
         print(f"  → Pushed {pushed} notifications")
 
-    def _should_surface_batch(self, signals, deals, entities):
-        if not signals:
+    def _should_surface_batch(self, stories, deals, entities):
+        if not stories:
             return []
 
-        signals_text = "\n".join([f"[{s['id']}] Score:{s['score']} Type:{s['signal_type']} - {s['title']}" for s in signals])
+        stories_text = "\n".join([
+            f"[{s['id']}] Score:{s['score']} Type:{s['signal_type']} Sources:{s['signal_count']} "
+            f"({', '.join(s['source_types']) or '?'}) - {s['title']}"
+            for s in stories])
         deals_text = "\n".join([f"- {d['account_name']} ({d['stage']})" for d in deals[:10]])
         entities_text = "\n".join([f"- {e['name']} ({e['entity_type']}, {e['threat_level']})" for e in entities[:15]])
 
         prompt = f"""{DISTYL_SYSTEM_CONTEXT}
 
-Evaluate which signals should be surfaced to the Distyl team NOW.
+Evaluate which stories should be surfaced to the Distyl team NOW. Each story is one event,
+possibly reported by several sources.
 
 Active deals:
 {deals_text or "None"}
@@ -73,13 +89,13 @@ Active deals:
 Tracked entities:
 {entities_text}
 
-New signals:
-{signals_text}
+New stories:
+{stories_text}
 
-For each signal return:
+For each story return:
 [
   {{
-    "signal_id": <id>,
+    "story_id": <id>,
     "surface": true/false,
     "urgency": "immediate|batch|store_only",
     "audience": ["analysts"],
@@ -104,32 +120,52 @@ For each signal return:
             import models
 
             with get_db() as db:
-                signal = db.query(models.Signal).filter(
-                    models.Signal.id == decision.get('signal_id')
+                story = db.query(models.Story).filter(
+                    models.Story.id == decision.get('story_id')
                 ).first()
-                if not signal:
+                if not story:
                     return
 
-                entity = db.query(models.Entity).filter(models.Entity.id == signal.entity_id).first()
+                entity = db.query(models.Entity).filter(models.Entity.id == story.entity_id).first()
                 entity_name = entity.name if entity else "Unknown"
 
                 msg = (
                     f"🧠 *Distyl Intel — Action Suggested*\n\n"
-                    f"*{entity_name}*: {signal.title}\n\n"
+                    f"*{entity_name}*: {story.title}\n\n"
                     f"*Why it matters:* {decision.get('rationale', '')}\n\n"
                     f"*Suggested action:* {decision.get('action_suggestion', '')}\n\n"
-                    f"Score: {signal.score}/100 | Type: {signal.signal_type}"
+                    f"Score: {story.max_score}/100 | Type: {story.signal_type} | "
+                    f"Sources: {story.signal_count}"
                 )
 
                 slack = SlackClient()
                 slack.post_message("#competitive-intel", msg)
 
-                signal.notified_slack = True
+                story.notified_slack = True
+                db.query(models.Signal).filter(models.Signal.id == story.lead_signal_id).update(
+                    {"notified_slack": True}, synchronize_session=False)
                 db.commit()
 
         except Exception as e:
             print(f"  ⚠️  Push failed: {e}")
 
+    def _mark_reviewed(self, reviewed):
+        """{story_id: score it was reviewed at}. A story whose score rose since stays new."""
+        reviewed = {sid: score for sid, score in reviewed.items() if sid and score is not None}
+        if not reviewed:
+            return
+        try:
+            from database import get_db
+            import models
+            with get_db() as db:
+                for story_id, score in reviewed.items():
+                    db.query(models.Story).filter(
+                        models.Story.id == story_id, models.Story.max_score <= score
+                    ).update({"status": "reviewed"}, synchronize_session=False)
+                db.commit()
+        except Exception as e:
+            print(f"  ⚠️  Marking stories reviewed failed: {e}")
+
     def _calibrate_thresholds(self):
         try:
             from database import get_db
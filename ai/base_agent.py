@@ -5,27 +5,41 @@ All agents inherit from this.
 import os
 import json
 import re
+import threading
 import requests
 from datetime import datetime
+from integrations.circuit_breaker import get_breaker, is_failure_status
+from integrations.transport import get_transport
+from ai import search_cache
 
 ANTHROPIC_URL = "https://api.anthropic.com/v1/messages"
 MODEL = "claude-sonnet-4-20250514"
 
+# Prefix on the error string when the Anthropic breaker rejects a call without hitting the network
+CIRCUIT_OPEN_ERROR = "circuit_open"
+
 
 class BaseIntelAgent:
-    def __init__(self, api_key=None):
+    def __init__(self, api_key=None, transport=None):
         self.api_key = api_key or os.getenv('ANTHROPIC_API_KEY')
         if not self.api_key:
             raise ValueError("ANTHROPIC_API_KEY required")
-
-    def _call_claude(self, prompt, use_web_search=False, max_tokens=4000, system=None):
-        """Call Claude API with optional web search tool"""
+        self.transport = transport or get_transport()
+        # Token accounting across every call this instance makes (sections run on several threads)
+        self.usage = {"calls": 0, "input_tokens": 0, "output_tokens": 0, "web_search_requests": 0,
+                      "cached_search_calls": 0, "searches_avoided": 0}
+        self._usage_lock = threading.Lock()
+
+    def _call_claude(self, prompt, use_web_search=False, max_tokens=4000, system=None, search_subject=None):
+        """Call Claude API with optional web search tool.
+        search_subject (a name or list of names) lets the call reuse cached search results for it."""
         tools = []
+        used_search_cache = False
         if use_web_search:
-            tools.append({
-                "type": "web_search_20250305",
-                "name": "web_search"
-            })
+            tool, search_context, used_search_cache = search_cache.prepare(search_subject)
+            if search_context:
+                prompt = f"{search_context}\n\n{prompt}"
+            tools.append(tool)
 
         payload = {
             "model": MODEL,
@@ -44,23 +58,63 @@ class BaseIntelAgent:
             "anthropic-version": "2023-06-01"
         }
 
+        breaker = get_breaker('anthropic')
+        attempt = breaker.reserve()
+        if not attempt:
+            return None, f"{CIRCUIT_OPEN_ERROR}: Anthropic degraded, retry in {breaker.retry_in():.0f}s"
+
+        # Any exit without an outcome (e.g. a replay cassette miss) releases the probe slot
+        with attempt:
+            return self._post_claude(attempt, payload, headers, use_web_search, used_search_cache)
+
+    def _post_claude(self, attempt, payload, headers, use_web_search, used_search_cache):
         try:
-            response = requests.post(ANTHROPIC_URL, json=payload, headers=headers, timeout=180)
+            response = self.transport.post(ANTHROPIC_URL, json=payload, headers=headers, timeout=180)
 
             if response.status_code != 200:
+                if is_failure_status(response.status_code):
+                    attempt.failure(f"HTTP {response.status_code}")
+                else:
+                    attempt.success()
                 return None, f"API error {response.status_code}: {response.text[:300]}"
 
+            attempt.success()
             data = response.json()
+            self._record_usage(data.get('usage') or {})
+            if use_web_search:
+                self._record_searches(data, used_search_cache)
             # Extract all text content blocks (web search returns tool_use + text blocks)
             text_parts = [c['text'] for c in data.get('content', []) if c.get('type') == 'text']
             text_content = '\n'.join(text_parts)
             return text_content, None
 
         except requests.Timeout:
+            attempt.failure("timeout")
             return None, "API timeout (180s)"
+        except requests.RequestException as e:
+            attempt.failure(e)
+            return None, str(e)
         except Exception as e:
             return None, str(e)
 
+    def _record_usage(self, usage):
+        with self._usage_lock:
+            self.usage["calls"] += 1
+            self.usage["input_tokens"] += usage.get('input_tokens') or 0
+            self.usage["output_tokens"] += usage.get('output_tokens') or 0
+            self.usage["web_search_requests"] += (usage.get('server_tool_use') or {}).get('web_search_requests') or 0
+
+    def _record_searches(self, data, used_search_cache):
+        _, avoided = search_cache.record(data, used_search_cache)
+        if used_search_cache:
+            with self._usage_lock:
+                self.usage["cached_search_calls"] += 1
+                self.usage["searches_avoided"] += avoided
+
+    def usage_snapshot(self):
+        with self._usage_lock:
+            return dict(self.usage, total_tokens=self.usage["input_tokens"] + self.usage["output_tokens"])
+
     def _extract_json(self, text):
         """Extract JSON from text, handling markdown fences"""
         if not text:
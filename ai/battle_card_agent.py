@@ -21,13 +21,14 @@ class BattleCardAgent(BaseIntelAgent):
             if dossier_id:
                 dossier = db.query(models.Dossier).filter(models.Dossier.id == dossier_id).first()
                 if dossier:
+                    stored = dossier.get_sections()
                     parts = []
-                    if dossier.section_j_competitive:
-                        parts.append(f"Competitive positioning: {dossier.section_j_competitive[:1000]}")
-                    if dossier.section_c_products:
-                        parts.append(f"Their products: {dossier.section_c_products[:400]}")
-                    if dossier.section_k_threats:
-                        parts.append(f"Threat: {dossier.section_k_threats[:400]}")
+                    if stored['j']:
+                        parts.append(f"Competitive positioning: {stored['j'][:1000]}")
+                    if stored['c']:
+                        parts.append(f"Their products: {stored['c'][:400]}")
+                    if stored['k']:
+                        parts.append(f"Threat: {stored['k'][:400]}")
                     dossier_context = "\n\n".join(parts)
 
         sections = COMPETITIVE_FRAMEWORKS['BATTLECARD_SECTIONS']
@@ -11,11 +11,13 @@ class ChatAgent(BaseIntelAgent):
         import models
 
         context_parts = [DISTYL_SYSTEM_CONTEXT]
+        entity_names = []
 
         try:
             with get_db() as db:
                 entities = db.query(models.Entity).filter(models.Entity.status == 'active').all()
-                context_parts.append(f"\nTracked entities: {', '.join(e.name for e in entities)}")
+                entity_names = [e.name for e in entities]
+                context_parts.append(f"\nTracked entities: {', '.join(entity_names)}")
 
                 deals = db.query(models.Deal).filter(
                     models.Deal.stage.notin_(['closed_won', 'closed_lost'])
@@ -38,11 +40,14 @@ If you don't know something, say so — never hallucinate facts."""
             conv += f"\n{role}: {h.get('content', '')}\n"
         conv += f"\nHuman: {message}\n"
 
+        # Questions about tracked companies reuse searches the dossier and news agents already ran
+        mentioned = [n for n in entity_names if n.lower() in message.lower()]
         response_text, error = self._call_claude(
             conv,
             use_web_search=True,
             max_tokens=2000,
-            system=system
+            system=system,
+            search_subject=mentioned
         )
 
         if error:
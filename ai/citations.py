@@ -0,0 +1,249 @@
+"""
+Deterministic citation extraction — Section L without an LLM call.
+
+Section prompts ask for "[Source: URL, Date]" after every factual claim. This parses those
+markers out of section text, stores each claim in dossier_facts (deduped per entity across
+dossier versions by normalized URL + claim hash), links it to every version that cites it in
+dossier_fact_links, and compiles the appendix from the facts.
+"""
+import hashlib
+import re
+from collections import namedtuple
+from datetime import datetime
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+CITATION_RE = re.compile(r'\[\s*Sources?\s*:\s*(?P<body>[^\]]+)\]', re.I)
+URL_RE = re.compile(r'https?://[^\s,;\]\)]+', re.I)
+# A claim starts after the previous sentence end or line break
+CLAIM_BOUNDARY_RE = re.compile(r'[.!?](?=\s)|\n')
+TRACKING_PARAMS = re.compile(r'^(utm_\w+|fbclid|gclid|mc_cid|mc_eid|ref|ref_src)$', re.I)
+
+DATE_FORMATS = ('%Y-%m-%d', '%Y/%m/%d', '%B %d, %Y', '%b %d, %Y', '%d %B %Y', '%d %b %Y',
+                '%B %Y', '%b %Y', '%Y-%m', '%Y')
+
+Citation = namedtuple('Citation', [
+    'section', 'claim', 'claim_start', 'claim_end',
+    'source_url', 'source_label', 'date_text', 'source_date', 'claim_hash',
+])
+
+
+def normalize_url(url):
+    """Lowercase scheme/host, drop www., fragments, tracking params and trailing slashes."""
+    if not url:
+        return None
+    url = url.strip().rstrip('.,;:)')
+    parts = urlsplit(url)
+    host = (parts.hostname or '').lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+    query = urlencode(sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                             if not TRACKING_PARAMS.match(k)))
+    path = parts.path.rstrip('/') or ''
+    return urlunsplit(((parts.scheme or 'https').lower(), host, path, query, ''))
+
+
+def parse_date(text):
+    text = (text or '').strip().rstrip('.')
+    if not text:
+        return None
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def _normalize_claim(claim):
+    return re.sub(r'\W+', ' ', claim.lower()).strip()
+
+
+def claim_hash(claim, source_url):
+    raw = f"{_normalize_claim(claim)}|{source_url or ''}"
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+def _claim_span(text, marker_start, floor):
+    """(start, end) of the claim a citation marker at marker_start supports."""
+    start = floor
+    for m in CLAIM_BOUNDARY_RE.finditer(text, floor, marker_start):
+        start = m.end()
+    # A citation placed right after the full stop cites the sentence before it
+    if not text[start:marker_start].strip() and start > floor:
+        prior = [m.end() for m in CLAIM_BOUNDARY_RE.finditer(text, floor, max(floor, start - 1))]
+        start = prior[-1] if prior else floor
+    while start < marker_start and text[start] in ' \t\n-*•':
+        start += 1
+    end = marker_start
+    while end > start and text[end - 1] in ' \t':
+        end -= 1
+    return start, end
+
+
+def _split_sources(body):
+    """One marker may cite several sources: "[Source: url1, 2024-05-01; url2, 2024-06-02]"."""
+    for part in re.split(r'\s*;\s*', body):
+        url_match = URL_RE.search(part)
+        if url_match:
+            rest = (part[:url_match.start()] + part[url_match.end():]).strip(' ,')
+            yield url_match.group(0), None, rest or None
+            continue
+        # No URL: "<publication>, <date>", or just a label
+        rest = part.strip()
+        label, _, tail = rest.rpartition(',')
+        if label and parse_date(tail):
+            yield None, label.strip(), tail.strip()
+        else:
+            yield None, rest or None, None
+
+
+def extract_citations(section, text):
+    """Every cited claim in one section's text, in order."""
+    if not text:
+        return []
+    citations = []
+    floor = 0
+    for marker in CITATION_RE.finditer(text):
+        start, end = _claim_span(text, marker.start(), floor)
+        claim = text[start:end].strip()
+        floor = marker.end()
+        if not claim:
+            continue
+        for url, label, date_text in _split_sources(marker.group('body')):
+            source_url = normalize_url(url) if url else None
+            citations.append(Citation(
+                section=section.upper(),
+                claim=claim,
+                claim_start=start,
+                claim_end=end,
+                source_url=source_url,
+                source_label=label,
+                date_text=date_text,
+                source_date=parse_date(date_text),
+                claim_hash=claim_hash(claim, source_url or label),
+            ))
+    return citations
+
+
+def extract_all(sections):
+    """{section key: text} → citations across the dossier, deduped within it."""
+    seen = set()
+    citations = []
+    for key in sorted(sections):
+        for c in extract_citations(key, sections[key]):
+            if c.claim_hash not in seen:
+                seen.add(c.claim_hash)
+                citations.append(c)
+    return citations
+
+
+def _source_type(url):
+    if not url:
+        return 'document'
+    host = urlsplit(url).hostname or ''
+    if host.endswith(('.gov', 'sec.gov')):
+        return 'filing'
+    if 'linkedin.com' in host:
+        return 'linkedin'
+    return 'web'
+
+
+def _facts_by_hash(db, entity_id, hashes):
+    import models
+    found = {}
+    for i in range(0, len(hashes), 500):
+        for fact in db.query(models.DossierFact).filter(
+            models.DossierFact.entity_id == entity_id,
+            models.DossierFact.claim_hash.in_(hashes[i:i + 500])
+        ).all():
+            found[fact.claim_hash] = fact
+    return found
+
+
+def store_facts(db, dossier_id, entity_id, citations):
+    """Bulk-insert new facts and link every cited fact to this dossier. Facts already known for
+    this entity are reused, so verification and hallucination flags carry across versions, and
+    older versions keep their own links. Returns the dossier's facts."""
+    import models
+
+    hashes = list({c.claim_hash for c in citations})
+    existing = _facts_by_hash(db, entity_id, hashes)
+
+    # The fact row carries the latest version's spans; each version's own are on its link
+    db.bulk_update_mappings(models.DossierFact, [{
+        "id": existing[c.claim_hash].id,
+        "last_seen_dossier_id": dossier_id,
+        "section": c.section,
+        "claim_start": c.claim_start,
+        "claim_end": c.claim_end,
+    } for c in citations if c.claim_hash in existing])
+
+    new_rows = [{
+        "dossier_id": dossier_id,
+        "last_seen_dossier_id": dossier_id,
+        "entity_id": entity_id,
+        "section": c.section,
+        "claim": c.claim,
+        "claim_start": c.claim_start,
+        "claim_end": c.claim_end,
+        "claim_hash": c.claim_hash,
+        "source_url": c.source_url,
+        "source_label": c.source_label,
+        "source_type": _source_type(c.source_url),
+        "source_date": c.source_date,
+    } for c in citations if c.claim_hash not in existing]
+    if new_rows:
+        db.bulk_insert_mappings(models.DossierFact, new_rows)
+        db.flush()
+        existing.update(_facts_by_hash(db, entity_id, [r["claim_hash"] for r in new_rows]))
+
+    # A retried generation re-links from scratch
+    db.query(models.DossierFactLink).filter(models.DossierFactLink.dossier_id == dossier_id).delete(
+        synchronize_session=False)
+    db.bulk_insert_mappings(models.DossierFactLink, [{
+        "dossier_id": dossier_id,
+        "fact_id": existing[c.claim_hash].id,
+        "section": c.section,
+        "claim_start": c.claim_start,
+        "claim_end": c.claim_end,
+    } for c in citations])
+    db.flush()
+
+    return dossier_facts(db, dossier_id)
+
+
+def dossier_facts(db, dossier_id):
+    """[(fact, link)] for every fact a dossier version cites, in section and text order. The link
+    holds the claim's section and span in that version."""
+    import models
+    return db.query(models.DossierFact, models.DossierFactLink).join(
+        models.DossierFactLink, models.DossierFactLink.fact_id == models.DossierFact.id
+    ).filter(
+        models.DossierFactLink.dossier_id == dossier_id
+    ).order_by(models.DossierFactLink.section, models.DossierFactLink.claim_start).all()
+
+
+def build_appendix(facts):
+    """Section L from dossier_facts(): one entry per source, with the sections and claims that cite it."""
+    by_source = {}
+    for fact, link in facts:
+        key = fact.source_url or fact.source_label or ''
+        entry = by_source.get(key)
+        if not entry:
+            entry = by_source[key] = {
+                "url": fact.source_url,
+                "label": fact.source_label,
+                "date": fact.source_date.strftime('%Y-%m-%d') if fact.source_date else None,
+                "section": link.section,
+                "sections": [],
+                "claim_summary": (fact.claim or '')[:200],
+                "claims": 0,
+                "fact_ids": [],
+            }
+        if link.section not in entry["sections"]:
+            entry["sections"].append(link.section)
+        entry["claims"] += 1
+        entry["fact_ids"].append(fact.id)
+    return list(by_source.values())
@@ -18,19 +18,32 @@ class DigestAgent(BaseIntelAgent):
         print(f"📰 Generating {digest_type} digest for week {week_number}/{year}")
 
         with get_db() as db:
-            signals = db.query(models.Signal).filter(
+            # One line per story, however many sources reported it; signals from before story
+            # clustering have no story and are listed on their own
+            stories = db.query(models.Story).filter(
+                models.Story.last_seen_at >= since,
+                models.Story.max_score >= 50
+            ).order_by(models.Story.max_score.desc()).limit(20).all()
+            unclustered = db.query(models.Signal).filter(
                 models.Signal.created_at >= since,
-                models.Signal.score >= 50
+                models.Signal.score >= 50,
+                models.Signal.story_id.is_(None)
             ).order_by(models.Signal.score.desc()).limit(20).all()
 
             deals = db.query(models.Deal).filter(
                 models.Deal.stage.notin_(['closed_won', 'closed_lost'])
             ).all()
 
-            signal_summaries = []
-            for s in signals:
-                entity = db.query(models.Entity).filter(models.Entity.id == s.entity_id).first()
-                signal_summaries.append(f"[{s.score}] {entity.name if entity else '?'}: {s.title}")
+            entity_names = dict(db.query(models.Entity.id, models.Entity.name).filter(
+                models.Entity.id.in_({s.entity_id for s in stories + unclustered})
+            ).all())
+            top = sorted([(st.max_score, st.entity_id, st.title, st.signal_count or 1) for st in stories] +
+                         [(s.score, s.entity_id, s.title, 1) for s in unclustered],
+                         key=lambda t: t[0] or 0, reverse=True)[:20]
+            signal_summaries = [
+                f"[{score}] {entity_names.get(eid, '?')}: {title}" + (f" ({count} sources)" if count > 1 else "")
+                for score, eid, title, count in top
+            ]
 
             deal_summaries = [f"{d.account_name} ({d.stage})" for d in deals[:10]]
 
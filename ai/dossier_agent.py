@@ -1,161 +1,232 @@
 """
 Dossier Agent — 12-section Universal Dossier generation + CEO Brief.
-Section-by-section: each gets full attention, later sections reference earlier outputs.
+Each section gets its own call; sections are a declared dependency graph, so a section
+only waits for the sections it references and independent ones run in parallel.
 """
+import os
+import re
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from datetime import datetime
 from ai.base_agent import BaseIntelAgent
+from ai.citations import extract_all, store_facts, build_appendix
+from ai import local_context
+from dossier_storage import pack_dossier
+from integrations.circuit_breaker import get_breaker
 from ai.prompts.dossier_prompts import (
     section_a_prompt, section_b_prompt, section_c_prompt, section_d_prompt,
     section_e_prompt, section_f_prompt, section_g_prompt, section_h_prompt,
-    section_i_prompt, section_j_prompt, section_k_prompt, section_l_prompt,
+    section_i_prompt, section_j_prompt, section_k_prompt,
     CEO_BRIEF_PROMPT
 )
 from ai.prompts.context import DISTYL_SYSTEM_CONTEXT
 
+SECTION_CONCURRENCY = int(os.getenv('DOSSIER_SECTION_CONCURRENCY', 4))
 
-class DossierAgent(BaseIntelAgent):
+SectionSpec = namedtuple('SectionSpec', ['label', 'deps', 'prompt', 'web_search', 'max_tokens'])
 
-    def generate(self, dossier_id, entity_id):
-        """Generate all 12 sections. Called in background thread."""
-        from database import get_db
-        import models
 
-        print(f"📋 Dossier generation starting: dossier={dossier_id}, entity={entity_id}")
+def _text(sections, key):
+    return sections.get(key) or ''
 
-        try:
-            with get_db() as db:
-                dossier = db.query(models.Dossier).filter(models.Dossier.id == dossier_id).first()
-                entity = db.query(models.Entity).filter(models.Entity.id == entity_id).first()
-                if not dossier or not entity:
-                    print(f"❌ Dossier or entity not found")
-                    return
-                dossier.generation_status = 'in_progress'
-                db.commit()
-                entity_name = entity.name
-                entity_type = entity.entity_type
 
-            sections = {}
+def _sections_abc(s):
+    return f"A: {_text(s, 'a')}\n\nB: {_text(s, 'b')}\n\nC: {_text(s, 'c')}"
 
-            # Sections A-D: use web search
-            print(f"  → A: Executive Synopsis")
-            sections['a'], _ = self._call_claude(
-                section_a_prompt(entity_name, entity_type),
-                use_web_search=True, max_tokens=2000
-            )
 
-            print(f"  → B: Business Model")
-            sections['b'], _ = self._call_claude(
-                section_b_prompt(entity_name, sections.get('a', '')),
-                use_web_search=True, max_tokens=2000
-            )
+def _sections_abcd(s):
+    return _sections_abc(s) + f"\n\nD: {_text(s, 'd')}"
 
-            print(f"  → C: Products")
-            sections['c'], _ = self._call_claude(
-                section_c_prompt(entity_name, sections.get('a', '')),
-                use_web_search=True, max_tokens=2500
-            )
 
-            sections_abc = f"A: {sections.get('a','')}\n\nB: {sections.get('b','')}\n\nC: {sections.get('c','')}"
+def _sections_abcdfg(s):
+    return _sections_abcd(s) + f"\n\nF: {_text(s, 'f')}\n\nG: {_text(s, 'g')}"
 
-            print(f"  → D: Clients")
-            sections['d'], _ = self._call_claude(
-                section_d_prompt(entity_name, entity_type, sections_abc),
-                use_web_search=True, max_tokens=2500
-            )
 
-            sections_abcd = sections_abc + f"\n\nD: {sections.get('d','')}"
+def _all_prior(s, keys):
+    return "\n\n".join([f"Section {k.upper()}: {s[k]}" for k in keys if s.get(k)])
 
-            # Sections E-K: synthesize (no web search)
-            print(f"  → E: GTM")
-            sections['e'], _ = self._call_claude(
-                section_e_prompt(entity_name, sections_abcd),
-                use_web_search=False, max_tokens=1500
-            )
 
-            print(f"  → F: Exec Team")
-            sections['f'], _ = self._call_claude(
-                section_f_prompt(entity_name, sections.get('a', '')),
-                use_web_search=True, max_tokens=2000
-            )
+PRIOR_TO_J = ('a', 'b', 'c', 'd', 'e', 'f', 'g', 'h', 'i')
 
-            print(f"  → G: Financials")
-            sections['g'], _ = self._call_claude(
-                section_g_prompt(entity_name, sections_abc),
-                use_web_search=True, max_tokens=1500
-            )
+# key → inputs it reads, prompt builder (entity_name, entity_type, sections), web search, token budget
+SECTION_GRAPH = {
+    'a': SectionSpec("Executive Synopsis", (),
+                     lambda n, t, s: section_a_prompt(n, t), True, 2000),
+    'b': SectionSpec("Business Model", ('a',),
+                     lambda n, t, s: section_b_prompt(n, _text(s, 'a')), True, 2000),
+    'c': SectionSpec("Products", ('a',),
+                     lambda n, t, s: section_c_prompt(n, _text(s, 'a')), True, 2500),
+    'd': SectionSpec("Clients", ('a', 'b', 'c'),
+                     lambda n, t, s: section_d_prompt(n, t, _sections_abc(s)), True, 2500),
+    'e': SectionSpec("GTM", ('a', 'b', 'c', 'd'),
+                     lambda n, t, s: section_e_prompt(n, _sections_abcd(s)), False, 1500),
+    'f': SectionSpec("Exec Team", ('a',),
+                     lambda n, t, s: section_f_prompt(n, _text(s, 'a')), True, 2000),
+    'g': SectionSpec("Financials", ('a', 'b', 'c'),
+                     lambda n, t, s: section_g_prompt(n, _sections_abc(s)), True, 1500),
+    'h': SectionSpec("Technology", ('c',),
+                     lambda n, t, s: section_h_prompt(n, _text(s, 'c')), False, 1500),
+    'i': SectionSpec("Partnerships", ('a', 'b', 'c', 'd', 'f', 'g'),
+                     lambda n, t, s: section_i_prompt(n, _sections_abcdfg(s)), True, 2000),
+    'j': SectionSpec("Competitive Positioning", PRIOR_TO_J,
+                     lambda n, t, s: section_j_prompt(n, t, _all_prior(s, PRIOR_TO_J)), False, 2500),
+    'k': SectionSpec("Threat Assessment", PRIOR_TO_J,
+                     lambda n, t, s: section_k_prompt(n, t, _all_prior(s, PRIOR_TO_J)), False, 1500),
+}
+# Section L (citations) is not a model call: it is parsed out of A–K by ai/citations.py
 
-            print(f"  → H: Technology")
-            sections['h'], _ = self._call_claude(
-                section_h_prompt(entity_name, sections.get('c', '')),
-                use_web_search=False, max_tokens=1500
-            )
 
-            sections_abcfg = sections_abcd + f"\n\nF: {sections.get('f','')}\n\nG: {sections.get('g','')}"
+# Evidence type → sections it can invalidate (downstream dependents are added from SECTION_GRAPH)
+EVIDENCE_SECTIONS = {
+    'exec_change': ('f',),
+    'hiring': ('e', 'f'),
+    'funding': ('g',),
+    'partnership': ('i',),
+    'product_launch': ('c',),
+    'customer_win': ('d',),
+    'email_mention': ('k',),
+    # Unclassified news only feeds the threat assessment, a leaf: invalidating A (which every other
+    # section reads) would regenerate the whole dossier on almost every refresh
+    'news': ('k',),
+}
 
-            print(f"  → I: Partnerships")
-            sections['i'], _ = self._call_claude(
-                section_i_prompt(entity_name, sections_abcfg),
-                use_web_search=True, max_tokens=2000
-            )
+# Unscored news has no signal type yet; a cheap headline classifier routes it
+_HEADLINE_TYPES = [
+    ('funding', re.compile(r'\b(rais(es|ed)|funding|series [a-h]|valuation|investment|ipo)\b', re.I)),
+    ('exec_change', re.compile(r'\b(appoint\w*|names|hires?|steps down|joins as|new (ceo|cto|cfo|coo))\b', re.I)),
+    ('partnership', re.compile(r'\b(partner\w*|alliance|collaborat\w*|teams up)\b', re.I)),
+    ('product_launch', re.compile(r'\b(launch\w*|unveil\w*|introduc\w*|releases?|rolls out)\b', re.I)),
+    ('customer_win', re.compile(r'\b(selects?|deploys?|signs?|contract|chosen by|expands with)\b', re.I)),
+]
 
-            all_prior = "\n\n".join([f"Section {k.upper()}: {v}" for k, v in sections.items() if v])
 
-            print(f"  → J: Competitive Positioning")
-            sections['j'], _ = self._call_claude(
-                section_j_prompt(entity_name, entity_type, all_prior),
-                use_web_search=False, max_tokens=2500
-            )
+def _classify_headline(headline):
+    for signal_type, pattern in _HEADLINE_TYPES:
+        if pattern.search(headline or ''):
+            return signal_type
+    return 'news'
 
-            print(f"  → K: Threat Assessment")
-            sections['k'], _ = self._call_claude(
-                section_k_prompt(entity_name, entity_type, all_prior),
-                use_web_search=False, max_tokens=1500
-            )
 
-            # Section L: compile citations
-            all_text = "\n\n".join([f"Section {k.upper()}: {v}" for k, v in sections.items() if v])
-            print(f"  → L: Citations")
-            citations_text, _ = self._call_claude(
-                section_l_prompt(all_text, entity_name),
-                use_web_search=False, max_tokens=2000
+def _with_dependents(keys):
+    """Close a set of sections over SECTION_GRAPH: anything reading a stale section is stale."""
+    stale = set(keys)
+    for key, spec in SECTION_GRAPH.items():  # declared in topological order
+        if stale.intersection(spec.deps):
+            stale.add(key)
+    return stale
+
+
+class DossierAgent(BaseIntelAgent):
+
+    def generate(self, dossier_id, entity_id, mode='full'):
+        """Generate sections A–K, then compile Section L from their citations. Called in background thread.
+        mode='incremental' regenerates only sections whose evidence changed since the last
+        completed version (plus everything downstream of them) and copies the rest forward."""
+        from database import get_db
+        import models
+
+        print(f"📋 Dossier generation starting: dossier={dossier_id}, entity={entity_id}, mode={mode}")
+        usage_before = self.usage_snapshot()
+
+        try:
+            with get_db() as db:
+                dossier = db.query(models.Dossier).filter(models.Dossier.id == dossier_id).first()
+                entity = db.query(models.Entity).filter(models.Entity.id == entity_id).first()
+                if not dossier or not entity:
+                    print(f"❌ Dossier or entity not found")
+                    return
+                if get_breaker('anthropic').state == 'open':
+                    # Fail fast instead of writing a dossier of twelve empty sections
+                    print(f"🔌 Anthropic circuit open — dossier {dossier_id} not started")
+                    dossier.generation_meta = {'mode': mode, **(dossier.generation_meta or {})}  # for a resume
+                    dossier.generation_status = 'failed'
+                    db.commit()
+                    return
+
+                # Anything checkpointed by an earlier attempt is kept; only the rest is generated
+                meta = dict(dossier.generation_meta or {})
+                completed = meta.get('completed_sections') or []
+                stored = dossier.get_sections()
+                sections = {k: stored[k] for k in completed if k in SECTION_GRAPH}
+                resumed = bool(completed)
+                if not resumed:
+                    meta['mode'] = mode
+                    meta['started_at'] = datetime.utcnow().isoformat()
+                meta['attempts'] = meta.get('attempts', 0) + 1
+
+                dossier.generation_meta = meta
+                dossier.generation_status = 'in_progress'
+                dossier.last_progress_at = datetime.utcnow()
+                db.commit()
+                entity_name = entity.name
+                entity_type = entity.entity_type
+
+            if resumed:
+                print(f"  → Resuming attempt {meta['attempts']}: {''.join(completed).upper()} already done")
+            elif mode == 'incremental':
+                plan = self._plan_incremental(dossier_id, entity_id)
+                if plan:
+                    sections, plan_meta = plan
+                    self._checkpoint_carried_forward(dossier_id, sections, plan_meta)
+                else:
+                    self._checkpoint_carried_forward(dossier_id, {}, {"mode": "full", "incremental_fallback": True})
+
+            local = local_context.gather(entity_id, exclude_dossier_id=dossier_id)
+            timings = {}
+            started = time.time()
+            self._run_section_graph(
+                entity_name, entity_type, sections, timings,
+                on_complete=lambda key, text, timing: self._checkpoint(dossier_id, key, text, timing),
+                local=local
             )
-            try:
-                section_l = self._extract_json(citations_text) if citations_text else []
-            except Exception:
-                section_l = []
+            wall_clock = time.time() - started
 
             confidence = self._assess_confidence(sections)
-            source_count = len(section_l) if isinstance(section_l, list) else 0
 
             with get_db() as db:
                 d = db.query(models.Dossier).filter(models.Dossier.id == dossier_id).first()
                 if d:
-                    d.section_a_synopsis = sections.get('a')
-                    d.section_b_business_model = sections.get('b')
-                    d.section_c_products = sections.get('c')
-                    d.section_d_clients = sections.get('d')
-                    d.section_e_gtm = sections.get('e')
-                    d.section_f_exec_team = sections.get('f')
-                    d.section_g_financials = sections.get('g')
-                    d.section_h_technology = sections.get('h')
-                    d.section_i_partnerships = sections.get('i')
-                    d.section_j_competitive = sections.get('j')
-                    d.section_k_threats = sections.get('k')
+                    citations_started = time.time()
+                    facts = store_facts(db, dossier_id, entity_id, extract_all(sections))
+                    section_l = build_appendix(facts)
+                    source_count = len(section_l)
+                    meta = dict(d.generation_meta or {})
+                    all_timings = meta.get('section_timings') or {}
+                    usage = self._usage_since(usage_before, meta.get('usage'))
+                    meta.update({
+                        "local_context": {
+                            "items": len(local.items),
+                            "prior_dossier": bool(local.prior_sections),
+                            "local_only_sections": sorted(k for k, t in all_timings.items()
+                                                          if t.get('local_only')),
+                        },
+                        "wall_clock_seconds": round(wall_clock, 2),
+                        "critical_path_seconds": self._critical_path(all_timings),
+                        "section_concurrency": SECTION_CONCURRENCY,
+                        "citations": {"facts": len(facts), "sources": source_count,
+                                      "seconds": round(time.time() - citations_started, 3)},
+                        "usage": usage,
+                        "storage": pack_dossier(db, d),
+                    })
+                    d.generation_meta = meta
                     d.section_l_appendix = section_l
                     d.overall_confidence = confidence
                     d.source_count = source_count
                     d.generation_status = 'completed'
                     d.generated_at = datetime.utcnow()
+                    d.last_progress_at = datetime.utcnow()
                     db.commit()
+                    print(f"✅ Dossier {dossier_id} complete in {wall_clock:.0f}s. Confidence: {confidence}. "
+                          f"Web searches: {usage['web_search_requests']} run, {usage['searches_avoided']} avoided via cache")
 
                 e = db.query(models.Entity).filter(models.Entity.id == entity_id).first()
                 if e:
                     e.last_enriched_at = datetime.utcnow()
                     db.commit()
 
-            print(f"✅ Dossier {dossier_id} complete. Confidence: {confidence}, Sources: {source_count}")
-
         except Exception as e:
+            # Checkpointed sections stay on the row, so a resume picks up from here
             print(f"❌ Dossier generation failed: {e}")
             try:
                 from database import get_db
@@ -163,39 +234,228 @@ class DossierAgent(BaseIntelAgent):
                 with get_db() as db:
                     d = db.query(models.Dossier).filter(models.Dossier.id == dossier_id).first()
                     if d:
+                        meta = dict(d.generation_meta or {})
+                        meta['usage'] = self._usage_since(usage_before, meta.get('usage'))
+                        d.generation_meta = meta
                         d.generation_status = 'failed'
                         db.commit()
             except Exception:
                 pass
 
+    def _usage_since(self, before, prior=None):
+        """Tokens spent by this attempt, added to whatever earlier attempts recorded."""
+        now = self.usage_snapshot()
+        prior = prior or {}
+        return {k: (prior.get(k) or 0) + now[k] - before[k] for k in now}
+
+    def _checkpoint(self, dossier_id, key, text, timing):
+        """Persist one finished section. Only sections with text count as completed,
+        so a resume retries the ones that errored."""
+        from database import get_db
+        import models
+
+        with get_db() as db:
+            d = db.query(models.Dossier).filter(models.Dossier.id == dossier_id).first()
+            if not d:
+                return
+            setattr(d, models.DOSSIER_SECTION_COLUMNS[key], text)
+            meta = dict(d.generation_meta or {})
+            meta['section_timings'] = {**(meta.get('section_timings') or {}), key: timing}
+            if text:
+                meta['completed_sections'] = sorted(set(meta.get('completed_sections') or []) | {key})
+            d.generation_meta = meta
+            d.last_progress_at = datetime.utcnow()
+            db.commit()
+
+    def _checkpoint_carried_forward(self, dossier_id, sections, plan_meta):
+        from database import get_db
+        import models
+
+        with get_db() as db:
+            d = db.query(models.Dossier).filter(models.Dossier.id == dossier_id).first()
+            if not d:
+                return
+            for key, text in sections.items():
+                setattr(d, models.DOSSIER_SECTION_COLUMNS[key], text)
+            meta = dict(d.generation_meta or {})
+            meta.update(plan_meta)
+            meta['completed_sections'] = sorted(sections)
+            d.generation_meta = meta
+            d.last_progress_at = datetime.utcnow()
+            db.commit()
+
+    def _plan_incremental(self, dossier_id, entity_id):
+        """Diff evidence since the last completed version. Returns (carried-forward sections, meta)
+        or None when there is no usable prior version."""
+        from database import get_db
+        import models
+
+        with get_db() as db:
+            prior = db.query(models.Dossier).filter(
+                models.Dossier.entity_id == entity_id,
+                models.Dossier.id != dossier_id,
+                models.Dossier.generation_status == 'completed',
+                models.Dossier.generated_at.isnot(None)
+            ).order_by(models.Dossier.generated_at.desc()).first()
+            if not prior:
+                print("  → No completed prior version, falling back to full generation")
+                return None
+            since = prior.generated_at
+            prior_sections = prior.get_sections()
+            prior_id = prior.id
+
+            signals = db.query(models.Signal.signal_type).filter(
+                models.Signal.entity_id == entity_id,
+                models.Signal.created_at > since
+            ).all()
+            news = db.query(models.NewsItem.headline).filter(
+                models.NewsItem.entity_id == entity_id,
+                models.NewsItem.promoted_to_signal == False,
+                models.NewsItem.fetched_at > since
+            ).all()
+            movements = db.query(models.PersonMovement.id).join(
+                models.Person, models.Person.id == models.PersonMovement.person_id
+            ).filter(
+                models.Person.entity_id == entity_id,
+                models.PersonMovement.detected_at > since
+            ).count()
+
+        triggers = {}
+        for (signal_type,) in signals:
+            for key in EVIDENCE_SECTIONS.get(signal_type, EVIDENCE_SECTIONS['news']):
+                triggers.setdefault(key, set()).add(f"signal:{signal_type}")
+        for (headline,) in news:
+            for key in EVIDENCE_SECTIONS[_classify_headline(headline)]:
+                triggers.setdefault(key, set()).add("news")
+        if movements:
+            triggers.setdefault('f', set()).add("person_movement")
+
+        # Missing prior text is regenerated too, otherwise a failed section would be carried forever
+        stale = set(triggers) | {k for k, v in prior_sections.items() if not v}
+        stale = _with_dependents(stale)
+
+        reused = [k for k in SECTION_GRAPH if k not in stale]
+        sections = {k: prior_sections[k] for k in reused}
+
+        print(f"  → Incremental vs dossier {prior_id}: regenerating {''.join(sorted(stale)).upper() or 'nothing'}, "
+              f"reusing {''.join(reused).upper() or 'nothing'}")
+        meta = {
+            "mode": "incremental",
+            "base_dossier_id": prior_id,
+            "evidence_since": since.isoformat(),
+            "evidence": {"signals": len(signals), "news": len(news), "person_movements": movements},
+            "triggers": {k: sorted(v) for k, v in sorted(triggers.items())},
+            "reused_sections": reused,
+            "regenerated_sections": sorted(stale),
+        }
+        return sections, meta
+
+    def _run_section_graph(self, entity_name, entity_type, sections, timings, on_complete=None, local=None):
+        """Run every section not already in `sections`, each as soon as its inputs are done.
+        Prompts are built on this thread from finished inputs; workers only make the API call,
+        and on_complete (the checkpoint) also runs here, so DB writes are serialized.
+        With `local` (a LocalContext), web-search sections are grounded on stored news and signals
+        and only search when those don't cover the section."""
+        done = set(sections)
+        pending = [k for k in SECTION_GRAPH if k not in done]
+        origin = time.time()
+
+        def _run(key, prompt, web_search):
+            spec = SECTION_GRAPH[key]
+            t0 = time.time()
+            text, error = self._call_claude(prompt, use_web_search=web_search, max_tokens=spec.max_tokens,
+                                            search_subject=entity_name)
+            return text, error, t0 - origin, time.time() - t0
+
+        local_only = {}
+        with ThreadPoolExecutor(max_workers=SECTION_CONCURRENCY) as pool:
+            running = {}
+            while pending or running:
+                for key in list(pending):
+                    spec = SECTION_GRAPH[key]
+                    if all(d in done for d in spec.deps):
+                        prompt = spec.prompt(entity_name, entity_type, sections)
+                        web_search = spec.web_search
+                        if web_search and local is not None:
+                            prompt, web_search = self._ground_prompt(prompt, *local.for_section(key))
+                        running[pool.submit(_run, key, prompt, web_search)] = key
+                        local_only[key] = spec.web_search and not web_search
+                        pending.remove(key)
+                if not running:
+                    break
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for fut in finished:
+                    key = running.pop(fut)
+                    text, error, start, seconds = fut.result()
+                    sections[key] = text
+                    done.add(key)
+                    timings[key] = {"start": round(start, 2), "seconds": round(seconds, 2),
+                                    "chars": len(text or ''), "error": error, "local_only": local_only[key]}
+                    if on_complete:
+                        on_complete(key, text, timings[key])
+                    print(f"  → {key.upper()}: {SECTION_GRAPH[key].label} ({seconds:.1f}s){' ⚠️ ' + error if error else ''}")
+
+    def _ground_prompt(self, prompt, context, sufficient):
+        """Prepend local context. Returns (prompt, use web search)."""
+        if not context:
+            return prompt, True
+        if sufficient:
+            return (f"{context}\n\nWeb search is not available for this request: the intelligence above is "
+                    f"current. Base the answer on it and the prior context, cite its URLs, and say where "
+                    f"it is silent.\n\n{prompt}"), False
+        return f"{context}\n\nSearch the web only for what the intelligence above does not cover.\n\n{prompt}", True
+
+    def _critical_path(self, timings):
+        """Longest dependency chain by measured duration — the floor for wall clock at unbounded concurrency."""
+        finish = {}
+        for key, spec in SECTION_GRAPH.items():  # declared in topological order
+            if key in timings:
+                finish[key] = timings[key]['seconds'] + max([finish.get(d, 0) for d in spec.deps] or [0])
+        return round(max(finish.values() or [0]), 2)
+
     def generate_ceo_brief(self, dossier_id, entity_name):
         """Generate CEO 1-page brief for a meeting."""
         print(f"📄 CEO Brief: {entity_name}")
 
         dossier_context = ""
+        entity_id = None
+        dossier_generated_at = None
         try:
             from database import get_db
             import models
             with get_db() as db:
                 dossier = db.query(models.Dossier).filter(models.Dossier.id == dossier_id).first()
                 if dossier:
+                    entity_id = dossier.entity_id
+                    dossier_generated_at = dossier.generated_at
+                    stored = dossier.get_sections()
                     parts = []
-                    if dossier.section_a_synopsis:
-                        parts.append(f"Synopsis: {dossier.section_a_synopsis[:600]}")
-                    if dossier.section_c_products:
-                        parts.append(f"Products: {dossier.section_c_products[:400]}")
-                    if dossier.section_d_clients:
-                        parts.append(f"Clients: {dossier.section_d_clients[:400]}")
+                    if stored['a']:
+                        parts.append(f"Synopsis: {stored['a'][:600]}")
+                    if stored['b']:
+                        parts.append(f"Business model: {stored['b'][:400]}")
+                    if stored['c']:
+                        parts.append(f"Products: {stored['c'][:400]}")
+                    if stored['d']:
+                        parts.append(f"Clients: {stored['d'][:400]}")
                     dossier_context = "\n\n".join(parts)
         except Exception:
             pass
 
         prompt = CEO_BRIEF_PROMPT.format(
             entity_name=entity_name,
-            system_context=DISTYL_SYSTEM_CONTEXT
+            system_context=DISTYL_SYSTEM_CONTEXT,
+            dossier_context=dossier_context or "(no dossier on file)"
         )
 
-        response_text, error = self._call_claude(prompt, use_web_search=True, max_tokens=4000)
+        use_web_search = True
+        if entity_id:
+            local = local_context.gather(entity_id)
+            prompt, use_web_search = self._ground_prompt(
+                prompt, *local.for_brief(dossier_context, dossier_generated_at))
+
+        response_text, error = self._call_claude(prompt, use_web_search=use_web_search, max_tokens=4000,
+                                                 search_subject=entity_name)
 
         if error:
             return {"error": error, "entity_name": entity_name, "generated_at": datetime.utcnow().isoformat()}
@@ -0,0 +1,138 @@
+"""
+Local grounding for dossier sections and CEO briefs.
+
+Before a section goes to web search, this picks the recent Signal and NewsItem rows for
+the entity that bear on that section, plus the section's text from the latest completed
+dossier, and renders them as prompt context. A section whose local coverage is good enough
+runs without the web_search tool at all.
+"""
+import os
+import re
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+LOOKBACK_DAYS = int(os.getenv('LOCAL_CONTEXT_DAYS', 45))
+MAX_ITEMS = int(os.getenv('LOCAL_CONTEXT_MAX_ITEMS', 8))
+# Relevant local items needed to skip web search outright, and with a recent prior section
+MIN_ITEMS = int(os.getenv('LOCAL_CONTEXT_MIN_ITEMS', 5))
+MIN_ITEMS_WITH_PRIOR = int(os.getenv('LOCAL_CONTEXT_MIN_ITEMS_WITH_PRIOR', 2))
+PRIOR_MAX_AGE_DAYS = int(os.getenv('LOCAL_CONTEXT_PRIOR_MAX_AGE_DAYS', 30))
+PRIOR_CHARS = 1500
+
+LocalItem = namedtuple('LocalItem', ['kind', 'signal_type', 'title', 'summary', 'url', 'source', 'date', 'score'])
+
+# Section → (signal types that feed it, headline/summary pattern). Section A takes everything.
+SECTION_TOPICS = {
+    'a': (None, None),
+    'b': (('funding',), re.compile(r'\b(revenue|arr|pricing|subscription|margin|profit\w*|customers?)\b', re.I)),
+    'c': (('product_launch',), re.compile(r'\b(launch\w*|product|platform|feature|release\w*|model|agent)\b', re.I)),
+    'd': (('customer_win',), re.compile(r'\b(client|customer|deploy\w*|selects?|health (plan|system)|payer|hospital|contract)\b', re.I)),
+    'f': (('exec_change', 'hiring'), re.compile(r'\b(ceo|cto|cfo|coo|cpo|cro|chief|appoint\w*|hires?|joins|steps down|executive)\b', re.I)),
+    'g': (('funding',), re.compile(r'\b(rais(es|ed)|funding|series [a-h]|valuation|ipo|revenue|investors?)\b', re.I)),
+    'i': (('partnership',), re.compile(r'\b(partner\w*|alliance|integrat\w*|marketplace|collaborat\w*|teams up)\b', re.I)),
+}
+
+
+class LocalContext:
+
+    def __init__(self, items, prior_sections=None, prior_generated_at=None):
+        self.items = items
+        self.prior_sections = prior_sections or {}
+        self.prior_generated_at = prior_generated_at
+
+    def _prior_is_recent(self, generated_at=None):
+        generated_at = generated_at or self.prior_generated_at
+        return bool(generated_at) and datetime.utcnow() - generated_at <= timedelta(days=PRIOR_MAX_AGE_DAYS)
+
+    def relevant(self, key):
+        """Items bearing on one section, best first."""
+        types, pattern = SECTION_TOPICS.get(key, (None, None))
+        now = datetime.utcnow()
+        ranked = []
+        for item in self.items:
+            if types is None:
+                relevance = 1
+            else:
+                text = f"{item.title or ''} {item.summary or ''}"
+                relevance = (2 if item.signal_type in types else 0) + min(len(pattern.findall(text)), 3)
+            if relevance <= 0:
+                continue
+            age_days = (now - item.date).days if item.date else LOOKBACK_DAYS
+            recency = max(0.0, 1 - age_days / LOOKBACK_DAYS)
+            ranked.append((relevance + 2 * recency + (item.score or 0) / 100, item))
+        ranked.sort(key=lambda r: r[0], reverse=True)
+        return [item for _, item in ranked[:MAX_ITEMS]]
+
+    def covers(self, items, prior_text):
+        if len(items) >= MIN_ITEMS:
+            return True
+        return bool(prior_text) and self._prior_is_recent() and len(items) >= MIN_ITEMS_WITH_PRIOR
+
+    def for_section(self, key):
+        """(context text, sufficient) for one section. sufficient means web search can be skipped."""
+        items = self.relevant(key)
+        prior_text = self.prior_sections.get(key)
+        return self._render(items, prior_text), self.covers(items, prior_text)
+
+    def for_brief(self, dossier_context="", dossier_generated_at=None):
+        """(context text, sufficient) for a CEO brief grounded on the given dossier."""
+        items = self.relevant('a')
+        sufficient = bool(dossier_context) and self._prior_is_recent(dossier_generated_at) and \
+            len(items) >= MIN_ITEMS_WITH_PRIOR
+        return self._render(items, None), sufficient
+
+    def _render(self, items, prior_text):
+        parts = []
+        if items:
+            lines = []
+            for item in items:
+                date = item.date.strftime('%Y-%m-%d') if item.date else 'undated'
+                label = item.signal_type or item.kind
+                line = f"- [{label}] {item.title} — {item.source or 'unknown source'}, {date}"
+                if item.url:
+                    line += f" ({item.url})"
+                if item.summary:
+                    line += f"\n  {item.summary[:300]}"
+                lines.append(line)
+            parts.append("Recent intelligence already collected (cite as [Source: URL, Date]):\n" + "\n".join(lines))
+        if prior_text:
+            as_of = self.prior_generated_at.strftime('%Y-%m-%d') if self.prior_generated_at else 'unknown date'
+            parts.append(f"This section in the previous dossier (as of {as_of}) — update it, keep what still holds:\n"
+                         f"{prior_text[:PRIOR_CHARS]}")
+        return "\n\n".join(parts)
+
+
+def gather(entity_id, exclude_dossier_id=None, days=LOOKBACK_DAYS):
+    """Load the entity's recent signals, unpromoted news and latest completed dossier."""
+    from database import get_db
+    import models
+
+    since = datetime.utcnow() - timedelta(days=days)
+    items = []
+    with get_db() as db:
+        for s in db.query(models.Signal).filter(
+            models.Signal.entity_id == entity_id,
+            models.Signal.created_at >= since
+        ).order_by(models.Signal.score.desc()).limit(200).all():
+            items.append(LocalItem('signal', s.signal_type, s.title, s.summary, s.source_url, s.source_name,
+                                   s.source_date or s.created_at, s.score))
+        # Promoted news is already represented by its signal
+        for n in db.query(models.NewsItem).filter(
+            models.NewsItem.entity_id == entity_id,
+            models.NewsItem.promoted_to_signal == False,
+            models.NewsItem.fetched_at >= since
+        ).order_by(models.NewsItem.fetched_at.desc()).limit(200).all():
+            items.append(LocalItem('news', None, n.headline, n.summary, n.url, n.source_name,
+                                   n.published_at or n.fetched_at, n.relevance_score))
+
+        prior_query = db.query(models.Dossier).filter(
+            models.Dossier.entity_id == entity_id,
+            models.Dossier.generation_status == 'completed'
+        )
+        if exclude_dossier_id:
+            prior_query = prior_query.filter(models.Dossier.id != exclude_dossier_id)
+        prior = prior_query.order_by(models.Dossier.generated_at.desc()).first()
+        prior_sections = prior.get_sections() if prior else {}
+        prior_generated_at = prior.generated_at if prior else None
+
+    return LocalContext(items, prior_sections, prior_generated_at)
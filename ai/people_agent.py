@@ -118,23 +118,27 @@ If no movement detected, return {{"movement_detected": false}}."""
 
             movement.signal_id = signal.id
             db.commit()
+            signal_id, signal_title = signal.id, signal.title
 
-            # Immediate Slack alert for exec changes
-            try:
+        # Immediate Slack alert for exec changes, unless another signal of the same story had one
+        try:
+            from ai import story_clusterer
+            story_clusterer.assign_stories()
+            if story_clusterer.claim_alert(signal_id):
                 from integrations.slack_client import SlackClient
                 SlackClient().post_signal_alert(
                     entity_name=entity_name,
-                    title=signal.title,
+                    title=signal_title,
                     score=85,
                     source_url=data.get('source_url', ''),
                 )
-            except Exception:
-                pass
-
-            return {
-                "person": full_name,
-                "entity": entity_name,
-                "from_company": old_company,
-                "to_company": data.get('new_company'),
-                "summary": data.get('summary'),
-            }
+        except Exception:
+            pass
+
+        return {
+            "person": full_name,
+            "entity": entity_name,
+            "from_company": old_company,
+            "to_company": data.get('new_company'),
+            "summary": data.get('summary'),
+        }
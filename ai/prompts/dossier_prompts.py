@@ -1,4 +1,4 @@
-"""Prompts for all 12 dossier sections (A-L) + CEO Brief"""
+"""Prompts for dossier sections A-K + CEO Brief. Section L is compiled by ai/citations.py"""
 from ai.prompts.context import DISTYL_SYSTEM_CONTEXT, DISTYL_PRODUCTS
 
 
@@ -216,23 +216,6 @@ Be forward-looking. This informs Distyl's product roadmap priorities.
 State CONFIDENCE: High/Medium/Low."""
 
 
-def section_l_prompt(all_prior_sections, entity_name):
-    return f"""Compile Section L — Source Citations for dossier on: **{entity_name}**
-
-Review all prior sections and extract every cited source URL and date.
-Return as JSON array:
-[
-  {{"url": "...", "date": "...", "section": "A", "claim_summary": "..."}},
-  ...
-]
-
-Prior sections:
-{all_prior_sections[:4000]}
-
-Extract ONLY sources actually cited (with URLs). Do not invent sources.
-Return ONLY the JSON array, no other text."""
-
-
 CEO_BRIEF_PROMPT = """You are generating a CEO-level 1-page brief for a meeting with a prospect/account.
 This brief is used by Distyl's CEO or a senior executive before a first meeting.
 
@@ -240,7 +223,10 @@ This brief is used by Distyl's CEO or a senior executive before a first meeting.
 
 Generate a CEO Brief for: **{entity_name}**
 
-Use web search for current, accurate information. Structure exactly as follows:
+Our dossier on them:
+{dossier_context}
+
+Build on the dossier and use web search for current, accurate information. Structure exactly as follows:
 
 **SECTION 1: What the business is and how it makes money**
 3-5 sentences. Include revenue mix breakdown with percentages (most recent fiscal year). Cite sources.
@@ -0,0 +1,323 @@
+"""
+Local relevance pre-filter: news that is obviously noise gets a local score instead of a model call.
+
+Headline, summary and source are hashed (crc32, stable across processes) into 2^FEATURE_BITS
+unigram and bigram features and scored by a logistic regression fitted in NumPy on items the
+model already scored:
+  relevant   relevance_score >= NOISE_SCORE, promoted to a signal, or its signal's push acted on
+  noise      relevance_score < NOISE_SCORE, or its signal's push dismissed
+PushFeedback rows weigh FEEDBACK_WEIGHT times a plain score.
+
+Training holds out every fifth item and picks the highest probability threshold under which at
+least TARGET_NOISE_PRECISION of the held-out items really were noise. Items below it are scored
+1-29 locally (scored_by='prefilter') and never reach SignalAgent; the rest go to the model as
+before. AUDIT_RATE of the confident-noise items are still sent to the model, which keeps a running
+agreement rate. Models are stored in classifier_models and retrained daily
+(jobs/relevance_training.py).
+"""
+import io
+import os
+import random
+import re
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from datetime import datetime
+
+import numpy as np
+
+MODEL_NAME = 'news_relevance'
+ENABLED = os.getenv('RELEVANCE_FILTER_ENABLED', 'true').lower() not in ('0', 'false', 'no', 'off')
+FEATURE_BITS = 18
+MAX_TOKENS = 300
+NOISE_SCORE = 30  # SignalAgent's "noise / low relevance" band is below this
+FEEDBACK_WEIGHT = 3.0
+NEGATIVE_ACTIONS = ('dismissed', 'ignored')
+TARGET_NOISE_PRECISION = float(os.getenv('RELEVANCE_FILTER_PRECISION', 0.97))
+MIN_TRAINING_ITEMS = int(os.getenv('RELEVANCE_FILTER_MIN_ITEMS', 300))
+MIN_CLASS_ITEMS = 30
+MIN_FILTERED_HOLDOUT = 10  # held-out items below the threshold needed to trust its precision
+TRAIN_MAX_ITEMS = int(os.getenv('RELEVANCE_FILTER_TRAIN_MAX_ITEMS', 20000))
+AUDIT_RATE = float(os.getenv('RELEVANCE_FILTER_AUDIT_RATE', 0.05))
+# Audited items whose model score never arrives (the call failed) are dropped oldest first past this
+AUDIT_MAX_PENDING = 5000
+EPOCHS = 150
+LEARNING_RATE = 0.5
+L2 = 1e-5
+# How often a process looks for a newer trained model
+RELOAD_SECONDS = 600
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_MASK = (1 << FEATURE_BITS) - 1
+
+_loaded = None  # (classifier_models.id, RelevanceFilter or None)
+_loaded_at = 0.0
+_audit = OrderedDict()  # news_item_id → probability, for confident-noise items sent to the model anyway
+_stats = {"local": 0, "model": 0, "audited": 0, "agreed": 0}
+_lock = threading.Lock()
+_rng = random.Random()
+
+
+def _field(item, name):
+    value = item.get(name) if isinstance(item, dict) else getattr(item, name, None)
+    return value or ''
+
+
+def _features(item):
+    """(feature indices, l2-normalized counts) of one item."""
+    tokens = _TOKEN.findall(f"{_field(item, 'headline')} {_field(item, 'summary')}".lower())[:MAX_TOKENS]
+    terms = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    terms += [f"source={_field(item, 'source_name').lower()}", f"type={_field(item, 'source_type')}"]
+    hashed = np.fromiter((zlib.crc32(t.encode('utf-8')) & _MASK for t in terms), dtype=np.int64, count=len(terms))
+    indices, counts = np.unique(hashed, return_counts=True)
+    return indices, counts / np.sqrt(np.sum(counts.astype(np.float64) ** 2))
+
+
+def _matrix(items):
+    """Sparse rows as coordinate arrays: (row, column, value, number of rows)."""
+    feats = [_features(item) for item in items]
+    rows = np.repeat(np.arange(len(feats)), [len(i) for i, _ in feats])
+    cols = np.concatenate([i for i, _ in feats]) if feats else np.zeros(0, dtype=np.int64)
+    vals = np.concatenate([v for _, v in feats]) if feats else np.zeros(0)
+    return rows, cols, vals, len(feats)
+
+
+def _sigmoid(z):
+    return 1.0 / (1.0 + np.exp(-np.clip(z, -30, 30)))
+
+
+def _decision(matrix, weights, bias):
+    rows, cols, vals, n = matrix
+    return bias + np.bincount(rows, weights=vals * weights[cols], minlength=n)
+
+
+def _fit(matrix, y, sample_weight):
+    """Weighted logistic regression, full-batch AdaGrad with a small L2 penalty."""
+    rows, cols, vals, _ = matrix
+    weights = np.zeros(1 << FEATURE_BITS)
+    bias = 0.0
+    sq_w = np.full(weights.shape, 1e-8)
+    sq_b = 1e-8
+    sample_weight = sample_weight / sample_weight.sum()
+    for _ in range(EPOCHS):
+        err = (_sigmoid(_decision(matrix, weights, bias)) - y) * sample_weight
+        grad_w = np.bincount(cols, weights=err[rows] * vals, minlength=weights.size) + L2 * weights
+        grad_b = err.sum()
+        sq_w += grad_w ** 2
+        sq_b += grad_b ** 2
+        weights -= LEARNING_RATE * grad_w / np.sqrt(sq_w)
+        bias -= LEARNING_RATE * grad_b / np.sqrt(sq_b)
+    return weights, bias
+
+
+def _noise_threshold(p, y):
+    """Highest threshold (below 0.5) under which at least TARGET_NOISE_PRECISION of items are noise,
+    or 0.0 if no threshold keeps MIN_FILTERED_HOLDOUT items that clean."""
+    order = np.argsort(p)
+    p, y = p[order], y[order]
+    k = np.arange(1, len(p) + 1)
+    precision = (k - np.cumsum(y)) / k
+    ok = np.nonzero((precision >= TARGET_NOISE_PRECISION) & (k >= MIN_FILTERED_HOLDOUT) & (p < 0.5))[0]
+    if not len(ok):
+        return 0.0
+    last = ok[-1]
+    upper = p[last + 1] if last + 1 < len(p) else 0.5
+    return float(min(0.5, (p[last] + upper) / 2))
+
+
+class RelevanceFilter:
+
+    def __init__(self, weights, bias, threshold, metrics=None, trained_at=None):
+        self.weights = weights
+        self.bias = bias
+        self.threshold = threshold
+        self.metrics = metrics or {}
+        self.trained_at = trained_at
+
+    def probabilities(self, items):
+        """P(relevant) per item."""
+        if not items:
+            return np.zeros(0)
+        return _sigmoid(_decision(_matrix(items), self.weights, self.bias))
+
+    @staticmethod
+    def local_score(probability):
+        return int(min(NOISE_SCORE - 1, max(1, round(100 * probability))))
+
+    def to_bytes(self):
+        buf = io.BytesIO()
+        np.savez_compressed(buf, weights=self.weights.astype(np.float32), bias=np.array([self.bias]))
+        return buf.getvalue()
+
+    @classmethod
+    def from_row(cls, row):
+        data = np.load(io.BytesIO(row.weights))
+        return cls(data['weights'].astype(np.float64), float(data['bias'][0]), row.threshold or 0.0,
+                   row.metrics, row.trained_at)
+
+
+def _training_data():
+    from database import get_db
+    import models
+
+    with get_db() as db:
+        items = db.query(
+            models.NewsItem.headline, models.NewsItem.summary, models.NewsItem.source_name,
+            models.NewsItem.source_type, models.NewsItem.relevance_score, models.NewsItem.promoted_to_signal,
+            models.NewsItem.url_hash, models.NewsItem.id
+        ).filter(models.NewsItem.scored_by == 'llm').order_by(models.NewsItem.id.desc()).limit(TRAIN_MAX_ITEMS).all()
+        feedback = dict(db.query(models.Signal.source_url_hash, models.PushFeedback.action).join(
+            models.PushFeedback, models.PushFeedback.signal_id == models.Signal.id
+        ).filter(models.Signal.source_url_hash.isnot(None)).order_by(models.PushFeedback.actioned_at).all())
+
+    rows, labels, weights, ids = [], [], [], []
+    for item in items:
+        relevant, weight = (item.relevance_score or 0) >= NOISE_SCORE or bool(item.promoted_to_signal), 1.0
+        action = feedback.get(item.url_hash)
+        if action == 'acted_on':
+            relevant, weight = True, FEEDBACK_WEIGHT
+        elif action in NEGATIVE_ACTIONS:
+            relevant, weight = False, FEEDBACK_WEIGHT
+        rows.append(dict(item._mapping))
+        labels.append(float(relevant))
+        weights.append(weight)
+        ids.append(item.id)
+    return rows, np.array(labels), np.array(weights), np.array(ids)
+
+
+def train(save=True):
+    """Fit on every model-scored item (newest TRAIN_MAX_ITEMS), calibrate the noise threshold on the
+    held-out fifth and store the model. Returns its metrics, or None without enough data."""
+    started = time.time()
+    items, y, sample_weight, ids = _training_data()
+    positives = int(y.sum())
+    if len(items) < MIN_TRAINING_ITEMS or min(positives, len(items) - positives) < MIN_CLASS_ITEMS:
+        print(f"  → Relevance filter: {len(items)} scored items ({positives} relevant), not enough to train")
+        return None
+
+    holdout = ids % 5 == 0
+    train_idx, hold_idx = np.nonzero(~holdout)[0], np.nonzero(holdout)[0]
+    # Balance the classes so the threshold isn't pushed around by the noise/relevant mix
+    class_weight = np.where(y == 1, len(y) / (2 * positives), len(y) / (2 * (len(y) - positives)))
+    weights, bias = _fit(_matrix([items[i] for i in train_idx]), y[train_idx],
+                         (sample_weight * class_weight)[train_idx])
+
+    p_hold = _sigmoid(_decision(_matrix([items[i] for i in hold_idx]), weights, bias))
+    y_hold = y[hold_idx]
+    threshold = _noise_threshold(p_hold, y_hold)
+    filtered = p_hold < threshold
+    metrics = {
+        "items": len(items), "relevant": positives, "holdout": len(hold_idx),
+        "holdout_accuracy": round(float(np.mean((p_hold >= 0.5) == (y_hold == 1))), 3),
+        "holdout_filtered": round(float(filtered.mean()), 3),
+        "holdout_noise_precision": round(float(1 - y_hold[filtered].mean()), 3) if filtered.any() else None,
+        "seconds": round(time.time() - started, 1),
+    }
+    model = RelevanceFilter(weights, bias, threshold, metrics, datetime.utcnow())
+
+    if save:
+        from database import get_db
+        import models
+        with get_db() as db:
+            db.add(models.ClassifierModel(name=MODEL_NAME, weights=model.to_bytes(), threshold=threshold,
+                                          metrics=metrics, trained_at=model.trained_at))
+            db.commit()
+        invalidate()
+    print(f"  → Relevance filter trained on {len(train_idx)} items: threshold {threshold:.3f}, would skip "
+          f"{metrics['holdout_filtered']:.0%} of held-out items at {metrics['holdout_noise_precision'] or 0:.0%} "
+          f"noise precision, accuracy {metrics['holdout_accuracy']:.0%}")
+    return {"threshold": threshold, **metrics}
+
+
+def get_filter():
+    """The newest trained filter, or None when disabled, untrained or without a confident threshold."""
+    global _loaded, _loaded_at
+    if not ENABLED:
+        return None
+    with _lock:
+        if _loaded is not None and time.time() - _loaded_at < RELOAD_SECONDS:
+            return _loaded[1]
+        try:
+            from database import get_db
+            import models
+            with get_db() as db:
+                newest = db.query(models.ClassifierModel.id).filter(
+                    models.ClassifierModel.name == MODEL_NAME
+                ).order_by(models.ClassifierModel.trained_at.desc()).first()
+                if newest and (_loaded is None or _loaded[0] != newest.id):
+                    row = db.query(models.ClassifierModel).filter(models.ClassifierModel.id == newest.id).first()
+                    model = RelevanceFilter.from_row(row)
+                    _loaded = (row.id, model if model.threshold > 0 else None)
+                elif not newest:
+                    _loaded = (None, None)
+            _loaded_at = time.time()
+        except Exception as e:
+            print(f"  ⚠️  Relevance filter load failed: {e}")
+        return _loaded[1] if _loaded else None
+
+
+def invalidate():
+    global _loaded_at
+    with _lock:
+        _loaded_at = 0.0
+
+
+def prefilter(items):
+    """Score the confident noise among `items` locally and return the rest, which still need the model.
+    items: dicts or objects with id, headline, summary, source_name and source_type."""
+    items = list(items)
+    model = get_filter()
+    if model is None or not items:
+        with _lock:
+            _stats["model"] += len(items)
+        return items
+
+    to_model, local = [], []
+    for item, p in zip(items, model.probabilities(items)):
+        nid = item['id'] if isinstance(item, dict) else item.id
+        if p >= model.threshold:
+            to_model.append(item)
+        elif _rng.random() < AUDIT_RATE:
+            with _lock:
+                _audit[nid] = float(p)
+                while len(_audit) > AUDIT_MAX_PENDING:
+                    _audit.popitem(last=False)
+            to_model.append(item)
+        else:
+            local.append({"id": nid, "relevance_score": model.local_score(p)})
+
+    if local:
+        from database import get_db
+        import models
+        now = datetime.utcnow()
+        with get_db() as db:
+            db.bulk_update_mappings(models.NewsItem, [dict(row, scored_at=now, scored_by='prefilter') for row in local])
+            db.commit()
+
+    with _lock:
+        _stats["local"] += len(local)
+        _stats["model"] += len(to_model)
+    return to_model
+
+
+def record_model_scores(scores):
+    """{news_item_id: model score} — audited items count toward the agreement rate."""
+    with _lock:
+        for nid, score in scores.items():
+            if _audit.pop(nid, None) is not None:
+                _stats["audited"] += 1
+                _stats["agreed"] += int((score or 0) < NOISE_SCORE)
+
+
+def stats(reset=False):
+    """Items scored locally / sent to the model, model calls avoided and the audit agreement rate."""
+    from ai.signal_agent import MAX_ITEMS_PER_CALL
+    with _lock:
+        report = dict(_stats)
+        if reset:
+            for key in _stats:
+                _stats[key] = 0
+    report["calls_avoided"] = round(report["local"] / MAX_ITEMS_PER_CALL, 1)
+    report["agreement_rate"] = round(report["agreed"] / report["audited"], 3) if report["audited"] else None
+    return report
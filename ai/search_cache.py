@@ -0,0 +1,166 @@
+"""
+In-process cache of Anthropic web_search results, keyed by query string, with a TTL.
+
+Every call that enables the web_search tool records the queries the model ran and the
+results it got back (plus the passages it cited). Later calls about the same subject in the
+same process get those results injected as context and a lower max_uses on the tool, so the
+model searches again only for what the cached results don't cover.
+
+The cache lives in process memory and is not shared between processes: dossier sections and
+CEO briefs share it when they run on the same worker, but the scheduler's news search and the
+web process's chat each have their own, and a restart empties it.
+"""
+import os
+import threading
+import time
+
+TTL_SECONDS = int(os.getenv('SEARCH_CACHE_TTL_SECONDS', 6 * 3600))
+# Tool max_uses without / with fresh cached results for the subject
+MAX_USES = int(os.getenv('WEB_SEARCH_MAX_USES', 5))
+MAX_USES_WITH_CONTEXT = int(os.getenv('WEB_SEARCH_MAX_USES_CACHED', 1))
+CONTEXT_MAX_RESULTS = int(os.getenv('SEARCH_CONTEXT_MAX_RESULTS', 20))
+MAX_ENTRIES = 2000
+
+WEB_SEARCH_TOOL = {"type": "web_search_20250305", "name": "web_search"}
+
+
+def _norm(query):
+    return " ".join((query or '').casefold().split())
+
+
+class SearchCache:
+
+    def __init__(self, ttl_seconds=TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries = {}  # normalized query → {"query", "results", "fetched_at"}
+        # Searches per call when no cached context was given — the baseline for "avoided"
+        self._uncached_calls = 0
+        self._uncached_searches = 0
+
+    def store(self, query, results):
+        key = _norm(query)
+        if not key:
+            return
+        with self._lock:
+            self._entries[key] = {"query": query, "results": results, "fetched_at": time.time()}
+            if len(self._entries) > MAX_ENTRIES:
+                oldest = min(self._entries, key=lambda k: self._entries[k]["fetched_at"])
+                self._entries.pop(oldest, None)
+
+    def lookup(self, subjects):
+        """Fresh entries whose query mentions any of the subjects, newest first."""
+        needles = [_norm(s) for s in subjects if s and _norm(s)]
+        if not needles:
+            return []
+        cutoff = time.time() - self.ttl_seconds
+        with self._lock:
+            for key in [k for k, e in self._entries.items() if e["fetched_at"] < cutoff]:
+                del self._entries[key]
+            hits = [e for k, e in self._entries.items() if any(n in k for n in needles)]
+        return sorted(hits, key=lambda e: e["fetched_at"], reverse=True)
+
+    def record_uncached(self, searches):
+        with self._lock:
+            self._uncached_calls += 1
+            self._uncached_searches += searches
+
+    def baseline_searches(self):
+        with self._lock:
+            if not self._uncached_calls:
+                return MAX_USES / 2
+            return self._uncached_searches / self._uncached_calls
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "ttl_seconds": self.ttl_seconds,
+                    "uncached_calls": self._uncached_calls,
+                    "baseline_searches_per_call": round(self._uncached_searches / self._uncached_calls, 2)
+                    if self._uncached_calls else None}
+
+
+_cache = SearchCache()
+
+
+def get_search_cache():
+    return _cache
+
+
+def format_context(entries):
+    seen = set()
+    lines = []
+    for entry in entries:
+        for r in entry["results"]:
+            if r["url"] in seen:
+                continue
+            seen.add(r["url"])
+            line = f"- {r.get('title') or r['url']} — {r['url']}"
+            if r.get('page_age'):
+                line += f" ({r['page_age']})"
+            if r.get('snippets'):
+                line += f"\n  \"{' … '.join(r['snippets'])[:400]}\""
+            lines.append(line)
+            if len(lines) >= CONTEXT_MAX_RESULTS:
+                break
+        if len(lines) >= CONTEXT_MAX_RESULTS:
+            break
+    if not lines:
+        return ""
+    age_minutes = int((time.time() - min(e["fetched_at"] for e in entries)) / 60)
+    queries = "; ".join(e["query"] for e in entries[:8])
+    return (f"Web search results already retrieved for this subject in the last {max(age_minutes, 1)} min "
+            f"(queries: {queries}). Use and cite these as sources; search again only for facts they "
+            f"do not cover.\n" + "\n".join(lines))
+
+
+def prepare(subjects):
+    """Tool definition and context preamble for one call. Returns (tool, context, used_cache)."""
+    subjects = [subjects] if isinstance(subjects, str) else list(subjects or [])
+    context = format_context(_cache.lookup(subjects)) if subjects else ""
+    tool = dict(WEB_SEARCH_TOOL, max_uses=MAX_USES_WITH_CONTEXT if context else MAX_USES)
+    return tool, context, bool(context)
+
+
+def extract_searches(data):
+    """[(query, [result, …])] from a Messages API response, with cited passages attached to results."""
+    content = data.get('content') or []
+    queries = {c.get('id'): (c.get('input') or {}).get('query')
+               for c in content if c.get('type') == 'server_tool_use' and c.get('name') == 'web_search'}
+
+    snippets = {}
+    for block in content:
+        for cite in block.get('citations') or []:
+            if cite.get('type') == 'web_search_result_location' and cite.get('cited_text'):
+                snippets.setdefault(cite.get('url'), []).append(cite['cited_text'][:300])
+
+    searches = []
+    for block in content:
+        if block.get('type') != 'web_search_tool_result':
+            continue
+        query = queries.get(block.get('tool_use_id'))
+        results = block.get('content')
+        if not query or not isinstance(results, list):
+            continue  # error results are not cached
+        searches.append((query, [{
+            "url": r.get('url'),
+            "title": r.get('title'),
+            "page_age": r.get('page_age'),
+            "snippets": snippets.get(r.get('url'), [])[:3],
+        } for r in results if r.get('type') == 'web_search_result' and r.get('url')]))
+    return searches
+
+
+def record(data, used_cache):
+    """Cache this response's searches. Returns (searches run, searches avoided estimate).
+
+    'Avoided' is measured against the mean searches of calls that had no cached context."""
+    searches = extract_searches(data)
+    for query, results in searches:
+        if results:
+            _cache.store(query, results)
+    ran = ((data.get('usage') or {}).get('server_tool_use') or {}).get('web_search_requests')
+    ran = len(searches) if ran is None else ran
+    if not used_cache:
+        _cache.record_uncached(ran)
+        return ran, 0
+    return ran, max(0, round(_cache.baseline_searches() - ran))
@@ -8,20 +8,27 @@ from datetime import datetime
 from ai.base_agent import BaseIntelAgent
 from ai.prompts.context import DISTYL_SYSTEM_CONTEXT
 
+# News items scored per model call; larger batches are split
+MAX_ITEMS_PER_CALL = 20
+
 
 class SignalAgent(BaseIntelAgent):
 
     def score_items(self, news_items, active_deals=None):
-        """Score a batch of news items. Returns list of score dicts."""
+        """Score news items, MAX_ITEMS_PER_CALL per model call. Returns list of score dicts; items the
+        model skipped have none."""
         if not news_items:
             return []
+        if len(news_items) > MAX_ITEMS_PER_CALL:
+            return [score for i in range(0, len(news_items), MAX_ITEMS_PER_CALL)
+                    for score in self.score_items(news_items[i:i + MAX_ITEMS_PER_CALL], active_deals)]
 
         deals_context = ""
         if active_deals:
             deals_context = "Active deals: " + ", ".join([d.account_name for d in active_deals[:10]])
 
         items_text = ""
-        for item in news_items[:20]:
+        for item in news_items:
             items_text += f"\n[{item.id}] {item.headline} | Source: {item.source_name} | Date: {item.published_at}"
 
         prompt = f"""{DISTYL_SYSTEM_CONTEXT}
@@ -64,13 +71,17 @@ Return ONLY the JSON array."""
             return []
 
     def promote_to_signal(self, news_item, score_data):
-        """Create a Signal record from a scored NewsItem"""
+        """Create a Signal record from a scored NewsItem. A signal already holding the item's
+        canonical URL is returned instead, including one a concurrent sweep chunk just created."""
+        from sqlalchemy.exc import IntegrityError
         from database import get_db
+        from integrations.url_canon import url_hash
         import models
 
+        source_url_hash = news_item.url_hash or url_hash(news_item.url)
         with get_db() as db:
             existing = db.query(models.Signal).filter(
-                models.Signal.source_url == news_item.url
+                models.Signal.source_url_hash == source_url_hash
             ).first()
             if existing:
                 return existing.id
@@ -81,6 +92,7 @@ Return ONLY the JSON array."""
                 title=news_item.headline,
                 summary=news_item.summary,
                 source_url=news_item.url,
+                source_url_hash=source_url_hash,
                 source_name=news_item.source_name,
                 source_type=news_item.source_type,
                 source_date=news_item.published_at,
@@ -89,7 +101,17 @@ Return ONLY the JSON array."""
                 deal_relevance={"account": score_data.get('deal_relevance')} if score_data.get('deal_relevance') else None,
             )
             db.add(signal)
-            db.flush()
+            try:
+                db.flush()
+            except IntegrityError:
+                # Lost the race to another chunk promoting the same URL
+                db.rollback()
+                existing = db.query(models.Signal).filter(
+                    models.Signal.source_url_hash == source_url_hash
+                ).first()
+                if existing:
+                    return existing.id
+                raise
 
             ni = db.query(models.NewsItem).filter(models.NewsItem.id == news_item.id).first()
             if ni:
@@ -0,0 +1,220 @@
+"""
+Story clustering: signals that report the same event are collapsed into one story.
+
+The same launch arrives as a NewsAPI article, an RSS item, a web search summary and an email
+mention — four signals, four reviews, up to four alerts. assign_stories() gives every new signal a
+story: it joins the story of the most similar signal of the same entity seen in the last
+WINDOW_HOURS if their TF-IDF cosine similarity reaches SIMILARITY, and starts a new story otherwise.
+
+Signals are compared on title + summary words, without stopwords, the entity's own name and
+aliases, and the generated "Email mention:" / "Exec move:" prefixes; IDF is taken over the window.
+Similarities of a chunk of new signals against the whole window are one matrix product; only the
+chunk's own terms are materialized, since other terms add nothing to the dot product. Tokens are
+cached per signal, so a run only tokenizes the signals it has not seen yet.
+
+The autonomy engine reviews stories (again when a higher-scoring signal joins), 80+ alerts go out
+once per story (claim_alert) and the digest lists stories. Assignment runs in the scheduler and in
+the web process (admin-triggered sweeps): runs in one process take turns on a lock, and across
+processes each signal is claimed with a conditional UPDATE and the stories it joins are locked.
+"""
+import os
+import re
+import threading
+from collections import Counter
+from datetime import datetime, timedelta
+
+import numpy as np
+
+WINDOW_HOURS = int(os.getenv('STORY_WINDOW_HOURS', 72))
+WINDOW_MAX_SIGNALS = int(os.getenv('STORY_WINDOW_MAX_SIGNALS', 5000))
+SIMILARITY = float(os.getenv('STORY_SIMILARITY', 0.5))
+CHUNK_SIZE = 64  # new signals compared per matrix product
+MAX_TOKENS = 200
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_GENERATED_PREFIX = re.compile(r"^\s*(?:email mention|exec move)\s*:\s*", re.I)
+_STOPWORDS = frozenset("""
+a an and are as at be been by for from has have in into is it its of on or that the their this to
+was were will with new says said after over about more than up its inc llc ltd co
+""".split())
+# Summaries of these source types are generated boilerplate ("From: … Entity mentioned in email
+# thread."), not the event
+_TITLE_ONLY = frozenset({'gmail'})
+
+_tokens = {}  # signal id → Counter of terms, for signals in the window
+_lock = threading.Lock()
+
+
+def _terms(title, summary, source_type, ignore=frozenset()):
+    text = _GENERATED_PREFIX.sub('', title or '')
+    if source_type not in _TITLE_ONLY:
+        text = f"{text} {summary or ''}"
+    words = [w for w in _TOKEN.findall(text.lower()) if w not in _STOPWORDS and w not in ignore and len(w) > 1]
+    return Counter(words[:MAX_TOKENS])
+
+
+def _name_words(db, entity_ids):
+    """{entity_id: words of its name and aliases}. Signals are only compared within an entity, where
+    its name is in every one of them, so it says nothing about the event."""
+    import models
+    rows = db.query(models.Entity.id, models.Entity.name, models.Entity.aliases).filter(
+        models.Entity.id.in_(entity_ids)).all()
+    return {eid: frozenset(_TOKEN.findall(" ".join([name or ''] + list(aliases or [])).lower()))
+            for eid, name, aliases in rows}
+
+
+def _tfidf(counters):
+    """Sublinear TF-IDF rows, l2-normalized, as coordinate arrays: (row, term id, weight, vocabulary size)."""
+    vocab = {}
+    rows, cols, tf = [], [], []
+    for r, counts in enumerate(counters):
+        for term, n in counts.items():
+            rows.append(r)
+            cols.append(vocab.setdefault(term, len(vocab)))
+            tf.append(n)
+    rows, cols = np.array(rows, dtype=np.int64), np.array(cols, dtype=np.int64)
+    df = np.bincount(cols, minlength=len(vocab))
+    idf = np.log((1 + len(counters)) / (1 + df)) + 1.0
+    vals = (1.0 + np.log(np.array(tf, dtype=np.float64))) * idf[cols]
+    norms = np.sqrt(np.bincount(rows, weights=vals ** 2, minlength=len(counters)))
+    return rows, cols, vals / np.maximum(norms[rows], 1e-12), len(vocab)
+
+
+def _similarities(matrix, n, query_rows):
+    """Cosine similarity of each query row against all n rows: a len(query_rows) x n array."""
+    rows, cols, vals, _ = matrix
+    in_query = np.isin(rows, query_rows)
+    terms = np.unique(cols[in_query])
+    # Dense over the query's terms only; every other term contributes zero to the dot product
+    position = np.full(cols.max() + 1, -1, dtype=np.int64)
+    position[terms] = np.arange(len(terms))
+    keep = position[cols] >= 0
+    window = np.zeros((n, len(terms)), dtype=np.float32)
+    np.add.at(window, (rows[keep], position[cols[keep]]), vals[keep])
+    return window[query_rows] @ window.T
+
+
+def assign_stories():
+    """Give every signal of the last WINDOW_HOURS without a story one.
+    Returns {signal_id: (story_id, started_a_new_story)} for the signals assigned in this call."""
+    from database import get_db
+    import models
+
+    with _lock, get_db() as db:
+        since = datetime.utcnow() - timedelta(hours=WINDOW_HOURS)
+        window = db.query(
+            models.Signal.id, models.Signal.entity_id, models.Signal.title, models.Signal.summary,
+            models.Signal.source_type, models.Signal.story_id,
+        ).filter(models.Signal.created_at >= since).order_by(models.Signal.id.desc()).limit(WINDOW_MAX_SIGNALS).all()
+        window = sorted(window, key=lambda s: s.id)
+        if all(s.story_id for s in window):
+            return {}
+
+        for sid in set(_tokens) - {s.id for s in window}:
+            del _tokens[sid]
+        unseen = [s for s in window if s.id not in _tokens]
+        if unseen:
+            names = _name_words(db, {s.entity_id for s in unseen})
+            for s in unseen:
+                _tokens[s.id] = _terms(s.title, s.summary, s.source_type, names.get(s.entity_id, frozenset()))
+
+        n = len(window)
+        matrix = _tfidf([_tokens[s.id] for s in window])
+        entity = np.array([s.entity_id for s in window])
+        story_of = [s.story_id for s in window]
+        pending = [i for i, s in enumerate(window) if not s.story_id]
+        is_pending = np.array([not s.story_id for s in window])
+
+        matches = {}  # window row → window row whose story it joins, or None for a new story
+        for start in range(0, len(pending), CHUNK_SIZE):
+            chunk = np.array(pending[start:start + CHUNK_SIZE])
+            sims = _similarities(matrix, n, chunk) if matrix[3] else np.zeros((len(chunk), n))
+            # Same entity, and only signals that will have a story by then: assigned ones, and new
+            # ones before it in id order
+            sims[entity[chunk][:, None] != entity[None, :]] = -1.0
+            sims[is_pending[None, :] & (np.arange(n)[None, :] >= chunk[:, None])] = -1.0
+            best = sims.argmax(axis=1)
+            for i, j, sim in zip(chunk, best, sims[np.arange(len(chunk)), best]):
+                matches[i] = j if sim >= SIMILARITY else None
+
+        signals = {s.id: s for s in db.query(models.Signal).filter(
+            models.Signal.id.in_([window[i].id for i in pending])).all()}
+        # Locked until commit (Postgres), so a run in another process joining them waits for ours
+        joined = {story_of[matches[i]] for i in pending if matches[i] is not None and story_of[matches[i]]}
+        stories = {st.id: st for st in db.query(models.Story).filter(
+            models.Story.id.in_(joined)).with_for_update().all()}
+
+        def _story(story_id):
+            if story_id not in stories:
+                stories[story_id] = db.query(models.Story).filter(
+                    models.Story.id == story_id).with_for_update().one()
+            return stories[story_id]
+
+        assigned = {}
+        for i in pending:
+            signal = signals[window[i].id]
+            j = matches[i]
+            if j is None:
+                story = models.Story(
+                    entity_id=signal.entity_id, title=signal.title, summary=signal.summary,
+                    lead_signal_id=signal.id, signal_type=signal.signal_type, max_score=signal.score or 0,
+                    signal_count=1, source_types=[signal.source_type] if signal.source_type else [],
+                    first_seen_at=signal.created_at, last_seen_at=signal.created_at,
+                    notified_slack=bool(signal.notified_slack),
+                )
+                db.add(story)
+                db.flush()
+                stories[story.id] = story
+            else:
+                story = _story(story_of[j])
+            # Another process may have assigned the signal since the window was read
+            claimed = db.query(models.Signal).filter(
+                models.Signal.id == signal.id, models.Signal.story_id.is_(None)
+            ).update({"story_id": story.id}, synchronize_session=False)
+            if not claimed:
+                if j is None:
+                    db.delete(stories.pop(story.id))
+                    db.flush()
+                story_of[i] = db.query(models.Signal.story_id).filter(models.Signal.id == signal.id).scalar()
+                continue
+            if j is not None:
+                _add_to_story(story, signal)
+            story_of[i] = story.id
+            assigned[signal.id] = (story.id, j is None)
+        db.commit()
+
+    joined = sum(1 for _, new in assigned.values() if not new)
+    print(f"  📚 Stories: {len(assigned)} signals assigned, {joined} joined an existing story")
+    return assigned
+
+
+def _add_to_story(story, signal):
+    story.signal_count = (story.signal_count or 0) + 1
+    story.last_seen_at = max(filter(None, [story.last_seen_at, signal.created_at]), default=None)
+    if signal.source_type and signal.source_type not in (story.source_types or []):
+        story.source_types = list(story.source_types or []) + [signal.source_type]
+    if (signal.score or 0) > (story.max_score or 0):
+        story.status = 'new'  # reviewed at a lower score: review it again
+        story.max_score = signal.score
+        story.lead_signal_id = signal.id
+        story.title = signal.title
+        story.summary = signal.summary
+        story.signal_type = signal.signal_type
+
+
+def claim_alert(signal_id):
+    """Claim the Slack alert for a signal's story: True for the one caller that should post it.
+    A signal without a story (clustering failed) is alerted on its own."""
+    from database import get_db
+    import models
+
+    with get_db() as db:
+        story_id = db.query(models.Signal.story_id).filter(models.Signal.id == signal_id).scalar()
+        if story_id is None:
+            return True
+        claimed = db.query(models.Story).filter(
+            models.Story.id == story_id,
+            (models.Story.notified_slack == None) | (models.Story.notified_slack == False),
+        ).update({"notified_slack": True}, synchronize_session=False)
+        db.commit()
+    return claimed == 1
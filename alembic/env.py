@@ -19,7 +19,8 @@ if database_url.startswith('postgres://'):
 config.set_main_option('sqlalchemy.url', database_url)
 
 if config.config_file_name is not None:
-    fileConfig(config.config_file_name)
+    # Also runs inside the app (database.run_migrations): leave the app's loggers enabled
+    fileConfig(config.config_file_name, disable_existing_loggers=False)
 
 target_metadata = Base.metadata
 
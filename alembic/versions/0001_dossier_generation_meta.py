@@ -0,0 +1,32 @@
+"""dossier generation_meta column
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19 09:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _has_column(table, column):
+    return column in {c['name'] for c in sa.inspect(op.get_bind()).get_columns(table)}
+
+
+def upgrade() -> None:
+    # init_db() create_all() already builds fresh databases with this column
+    if not _has_column('dossiers', 'generation_meta'):
+        op.add_column('dossiers', sa.Column('generation_meta', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('dossiers', 'generation_meta')
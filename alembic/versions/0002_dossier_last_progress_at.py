@@ -0,0 +1,31 @@
+"""dossier last_progress_at heartbeat column
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 10:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _has_column(table, column):
+    return column in {c['name'] for c in sa.inspect(op.get_bind()).get_columns(table)}
+
+
+def upgrade() -> None:
+    if not _has_column('dossiers', 'last_progress_at'):
+        op.add_column('dossiers', sa.Column('last_progress_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('dossiers', 'last_progress_at')
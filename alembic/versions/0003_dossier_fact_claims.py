@@ -0,0 +1,51 @@
+"""dossier_facts claim span, hash and last-seen columns for deterministic citations
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 12:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+NEW_COLUMNS = [
+    ('last_seen_dossier_id', sa.Integer()),
+    ('claim_start', sa.Integer()),
+    ('claim_end', sa.Integer()),
+    ('claim_hash', sa.String(40)),
+    ('source_label', sa.String(500)),
+]
+
+
+def _has_column(table, column):
+    return column in {c['name'] for c in sa.inspect(op.get_bind()).get_columns(table)}
+
+
+def _has_index(table, name):
+    return name in {i['name'] for i in sa.inspect(op.get_bind()).get_indexes(table)}
+
+
+def upgrade() -> None:
+    for name, type_ in NEW_COLUMNS:
+        if not _has_column('dossier_facts', name):
+            op.add_column('dossier_facts', sa.Column(name, type_, nullable=True))
+    if not _has_index('dossier_facts', 'ix_dossier_facts_last_seen_dossier_id'):
+        op.create_index('ix_dossier_facts_last_seen_dossier_id', 'dossier_facts', ['last_seen_dossier_id'])
+    if not _has_index('dossier_facts', 'ux_dossier_facts_entity_claim'):
+        op.create_index('ux_dossier_facts_entity_claim', 'dossier_facts', ['entity_id', 'claim_hash'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ux_dossier_facts_entity_claim', table_name='dossier_facts')
+    op.drop_index('ix_dossier_facts_last_seen_dossier_id', table_name='dossier_facts')
+    for name, _ in reversed(NEW_COLUMNS):
+        op.drop_column('dossier_facts', name)
@@ -0,0 +1,105 @@
+"""dossier packed/delta section storage, with backfill of completed versions
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19 14:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _has_column(table, column):
+    return column in {c['name'] for c in sa.inspect(op.get_bind()).get_columns(table)}
+
+
+def _dossiers_table():
+    from models import DOSSIER_SECTION_COLUMNS
+    return sa.table(
+        'dossiers',
+        sa.column('id', sa.Integer), sa.column('entity_id', sa.Integer),
+        sa.column('generation_status', sa.String), sa.column('storage_format', sa.String),
+        sa.column('sections_blob', sa.LargeBinary), sa.column('delta_base_id', sa.Integer),
+        *[sa.column(col, sa.Text) for col in DOSSIER_SECTION_COLUMNS.values()]
+    ), DOSSIER_SECTION_COLUMNS
+
+
+def _backfill():
+    """Pack every completed plain version, oldest first per entity, with the same snapshot/delta
+    policy the app uses for new versions."""
+    from dossier_storage import plan_pack
+
+    bind = op.get_bind()
+    dossiers, columns = _dossiers_table()
+    unpacked = sa.and_(
+        dossiers.c.generation_status == 'completed',
+        sa.or_(dossiers.c.storage_format.is_(None), dossiers.c.storage_format == 'plain')
+    )
+    entity_ids = bind.execute(sa.select(dossiers.c.entity_id).where(unpacked).distinct()).scalars().all()
+
+    raw_total, stored_total, rows_total = 0, 0, 0
+    for entity_id in entity_ids:
+        rows = bind.execute(
+            sa.select(dossiers.c.id, *[dossiers.c[col] for col in columns.values()])
+            .where(unpacked, dossiers.c.entity_id == entity_id)
+            .order_by(dossiers.c.id)
+        ).mappings().all()
+
+        base_id, base_sections, deltas = None, None, 0
+        for row in rows:
+            sections = {k: row[col] for k, col in columns.items()}
+            fmt, blob = plan_pack(sections, base_sections, deltas)
+            bind.execute(dossiers.update().where(dossiers.c.id == row['id']).values(
+                storage_format=fmt,
+                sections_blob=blob,
+                delta_base_id=base_id if fmt == 'delta' else None,
+                **{col: None for col in columns.values()}
+            ))
+            if fmt == 'packed':
+                base_id, base_sections, deltas = row['id'], sections, 0
+            else:
+                deltas += 1
+            raw_total += sum(len((t or '').encode('utf-8')) for t in sections.values())
+            stored_total += len(blob)
+            rows_total += 1
+
+    if rows_total:
+        print(f"Packed {rows_total} dossier versions: {raw_total} → {stored_total} bytes")
+
+
+def upgrade() -> None:
+    if not _has_column('dossiers', 'storage_format'):
+        op.add_column('dossiers', sa.Column('storage_format', sa.String(10), nullable=True))
+    if not _has_column('dossiers', 'sections_blob'):
+        op.add_column('dossiers', sa.Column('sections_blob', sa.LargeBinary(), nullable=True))
+    if not _has_column('dossiers', 'delta_base_id'):
+        op.add_column('dossiers', sa.Column('delta_base_id', sa.Integer(), nullable=True))
+    _backfill()
+
+
+def downgrade() -> None:
+    # Unpack first so no section text is lost with the blob column
+    from dossier_storage import read_sections
+    from sqlalchemy.orm import Session
+    import models
+
+    session = Session(bind=op.get_bind())
+    packed = session.query(models.Dossier).filter(models.Dossier.storage_format.in_(['packed', 'delta'])).all()
+    unpacked = [(d, read_sections(d)) for d in packed]  # read all before any base blob is cleared
+    for d, sections in unpacked:
+        for key, col in models.DOSSIER_SECTION_COLUMNS.items():
+            setattr(d, col, sections[key])
+        d.storage_format, d.sections_blob, d.delta_base_id = 'plain', None, None
+    session.flush()
+    op.drop_column('dossiers', 'delta_base_id')
+    op.drop_column('dossiers', 'sections_blob')
+    op.drop_column('dossiers', 'storage_format')
@@ -0,0 +1,220 @@
+"""canonical URL hash columns on news_items, news_duplicates and signals, with backfill and merge
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19 16:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 1000
+
+# (table, url column, hash column, unique index)
+HASH_COLUMNS = [
+    ('news_items', 'url', 'url_hash', 'ux_news_items_url_hash'),
+    ('news_duplicates', 'url', 'url_hash', 'ux_news_duplicates_url_hash'),
+    ('signals', 'source_url', 'source_url_hash', 'ux_signals_source_url_hash'),
+]
+
+
+def _has_table(table):
+    return sa.inspect(op.get_bind()).has_table(table)
+
+
+def _has_column(table, column):
+    return column in {c['name'] for c in sa.inspect(op.get_bind()).get_columns(table)}
+
+
+def _has_index(table, name):
+    return name in {i['name'] for i in sa.inspect(op.get_bind()).get_indexes(table)}
+
+
+def _table(name, *columns):
+    return sa.table(name, sa.column('id', sa.Integer), *[sa.column(c) for c in columns])
+
+
+def _backfill_hashes(table, url_col, hash_col):
+    """Hash every row's URL in id-ordered batches. Signals only get a hash when they came from a
+    news item (same canonical URL), matching what SignalAgent.promote_to_signal sets."""
+    from integrations.url_canon import url_hash
+
+    bind = op.get_bind()
+    t = _table(table, url_col, hash_col)
+    news = _table('news_items', 'url_hash')
+    last_id, hashed = 0, 0
+    while True:
+        rows = bind.execute(
+            sa.select(t.c.id, t.c[url_col])
+            .where(t.c[hash_col].is_(None), t.c[url_col].isnot(None), t.c.id > last_id)
+            .order_by(t.c.id).limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            return hashed
+        last_id = rows[-1][0]
+        hashes = {row_id: url_hash(url) for row_id, url in rows}
+        if table == 'signals':
+            from_news = set(bind.execute(
+                sa.select(news.c.url_hash).where(news.c.url_hash.in_({h for h in hashes.values() if h}))
+            ).scalars())
+            hashes = {row_id: h for row_id, h in hashes.items() if h in from_news}
+        updates = [{'_id': row_id, '_hash': h} for row_id, h in hashes.items() if h]
+        if updates:
+            bind.execute(t.update().where(t.c.id == sa.bindparam('_id')).values({hash_col: sa.bindparam('_hash')}),
+                         updates)
+            hashed += len(updates)
+
+
+def _duplicate_groups(table, hash_col):
+    """Batches of [ids] sharing a hash, lowest id first."""
+    bind = op.get_bind()
+    t = _table(table, hash_col)
+    while True:
+        dup_hashes = bind.execute(
+            sa.select(t.c[hash_col]).where(t.c[hash_col].isnot(None))
+            .group_by(t.c[hash_col]).having(sa.func.count() > 1).limit(BATCH_SIZE)
+        ).scalars().all()
+        if not dup_hashes:
+            return
+        groups = {}
+        for row_id, h in bind.execute(
+            sa.select(t.c.id, t.c[hash_col]).where(t.c[hash_col].in_(dup_hashes)).order_by(t.c.id)
+        ):
+            groups.setdefault(h, []).append(row_id)
+        yield list(groups.values())
+
+
+def _merge_news_items():
+    """Keep the oldest row per URL; it inherits promotion and the best score, and the extras'
+    near-duplicate links move to it."""
+    bind = op.get_bind()
+    items = _table('news_items', 'promoted_to_signal', 'relevance_score')
+    fingerprints = sa.table('news_fingerprints', sa.column('news_item_id', sa.Integer))
+    duplicates = sa.table('news_duplicates', sa.column('canonical_id', sa.Integer))
+    has_fingerprints, has_duplicates = _has_table('news_fingerprints'), _has_table('news_duplicates')
+    merged = 0
+    for groups in _duplicate_groups('news_items', 'url_hash'):
+        for keep, *extra in groups:
+            rows = bind.execute(sa.select(items.c.promoted_to_signal, items.c.relevance_score)
+                                .where(items.c.id.in_([keep, *extra]))).all()
+            if has_duplicates:
+                bind.execute(duplicates.update().where(duplicates.c.canonical_id.in_(extra)).values(canonical_id=keep))
+            if has_fingerprints:
+                bind.execute(fingerprints.delete().where(fingerprints.c.news_item_id.in_(extra)))
+            bind.execute(items.delete().where(items.c.id.in_(extra)))
+            bind.execute(items.update().where(items.c.id == keep).values(
+                promoted_to_signal=any(r.promoted_to_signal for r in rows),
+                relevance_score=max((r.relevance_score or 0) for r in rows),
+            ))
+            merged += len(extra)
+    return merged
+
+
+def _merge_signals():
+    """Keep the oldest signal per URL; feedback and person movements pointing at the extras move to
+    it, and so do the signal_ids lists of Gmail mentions and Drive docs."""
+    bind = op.get_bind()
+    signals = _table('signals', 'notified_slack')
+    referencing = [sa.table(t, sa.column('signal_id', sa.Integer))
+                   for t in ('push_feedback', 'person_movements') if _has_table(t)]
+    merged_into = {}
+    for groups in _duplicate_groups('signals', 'source_url_hash'):
+        for keep, *extra in groups:
+            notified = bind.execute(sa.select(signals.c.notified_slack)
+                                    .where(signals.c.id.in_([keep, *extra]))).scalars().all()
+            for ref in referencing:
+                bind.execute(ref.update().where(ref.c.signal_id.in_(extra)).values(signal_id=keep))
+            bind.execute(signals.delete().where(signals.c.id.in_(extra)))
+            bind.execute(signals.update().where(signals.c.id == keep).values(notified_slack=any(notified)))
+            merged_into.update(dict.fromkeys(extra, keep))
+    for table in ('gmail_mentions', 'drive_docs'):
+        if merged_into and _has_table(table):
+            _remap_signal_ids(table, merged_into)
+    return len(merged_into)
+
+
+def _remap_signal_ids(table, merged_into):
+    """Rewrite the table's JSON signal_ids lists to the surviving ids, in id-ordered batches."""
+    bind = op.get_bind()
+    t = sa.table(table, sa.column('id', sa.Integer), sa.column('signal_ids', sa.JSON))
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(t.c.id, t.c.signal_ids).where(t.c.signal_ids.isnot(None), t.c.id > last_id)
+            .order_by(t.c.id).limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            return
+        last_id = rows[-1][0]
+        updates = []
+        for row_id, signal_ids in rows:
+            if isinstance(signal_ids, list) and any(sid in merged_into for sid in signal_ids):
+                remapped = list(dict.fromkeys(merged_into.get(sid, sid) for sid in signal_ids))
+                updates.append({'_id': row_id, '_ids': remapped})
+        if updates:
+            bind.execute(t.update().where(t.c.id == sa.bindparam('_id')).values(signal_ids=sa.bindparam('_ids')),
+                         updates)
+
+
+def _merge_news_duplicates():
+    bind = op.get_bind()
+    duplicates = _table('news_duplicates')
+    merged = 0
+    for groups in _duplicate_groups('news_duplicates', 'url_hash'):
+        extra = [row_id for _, *ids in groups for row_id in ids]
+        bind.execute(duplicates.delete().where(duplicates.c.id.in_(extra)))
+        merged += len(extra)
+    return merged
+
+
+def _drop_url_unique(table, column):
+    """The wide unique on the raw URL is superseded by the hash index. SQLite keeps it: its unnamed
+    table constraint can only go with a table rebuild, and canonical duplicates hit the hash first."""
+    if op.get_bind().dialect.name == 'sqlite':
+        return
+    inspector = sa.inspect(op.get_bind())
+    for uc in inspector.get_unique_constraints(table):
+        if uc['column_names'] == [column] and uc.get('name'):
+            op.drop_constraint(uc['name'], table, type_='unique')
+    for ix in inspector.get_indexes(table):
+        if ix.get('unique') and ix['column_names'] == [column]:
+            op.drop_index(ix['name'], table_name=table)
+
+
+def upgrade() -> None:
+    present = [entry for entry in HASH_COLUMNS if _has_table(entry[0])]
+    for table, _, hash_col, _ in present:
+        if not _has_column(table, hash_col):
+            op.add_column(table, sa.Column(hash_col, sa.String(40), nullable=True))
+
+    hashed = {table: _backfill_hashes(table, url_col, hash_col) for table, url_col, hash_col, _ in present}
+    merged = {'news_items': _merge_news_items(), 'signals': _merge_signals()}
+    if _has_table('news_duplicates'):
+        merged['news_duplicates'] = _merge_news_duplicates()
+    if any(hashed.values()) or any(merged.values()):
+        print("URL hash backfill: " + ", ".join(
+            f"{table} {hashed[table]} hashed / {merged.get(table, 0)} merged" for table in hashed))
+
+    for table, url_col, hash_col, index in present:
+        if not _has_index(table, index):
+            op.create_index(index, table, [hash_col], unique=True)
+        if table != 'signals':
+            _drop_url_unique(table, url_col)
+
+
+def downgrade() -> None:
+    # Merged duplicates are not restored, and the raw URL unique constraint is not recreated
+    for table, _, hash_col, index in reversed(HASH_COLUMNS):
+        if _has_table(table) and _has_column(table, hash_col):
+            if _has_index(table, index):
+                op.drop_index(index, table_name=table)
+            op.drop_column(table, hash_col)
@@ -0,0 +1,31 @@
+"""entity aliases column for mention matching
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19 18:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _has_column(table, column):
+    return column in {c['name'] for c in sa.inspect(op.get_bind()).get_columns(table)}
+
+
+def upgrade() -> None:
+    if not _has_column('entities', 'aliases'):
+        op.add_column('entities', sa.Column('aliases', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('entities', 'aliases')
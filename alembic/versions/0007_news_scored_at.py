@@ -0,0 +1,53 @@
+"""news_items scored_at marker and score_attempts counter, replacing the relevance_score == 0 sentinel
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19 19:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0007'
+down_revision: Union[str, None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _has_column(table, column):
+    return column in {c['name'] for c in sa.inspect(op.get_bind()).get_columns(table)}
+
+
+def _has_index(table, name):
+    return name in {i['name'] for i in sa.inspect(op.get_bind()).get_indexes(table)}
+
+
+def upgrade() -> None:
+    added = not _has_column('news_items', 'scored_at')
+    if added:
+        op.add_column('news_items', sa.Column('scored_at', sa.DateTime(), nullable=True))
+    if not _has_column('news_items', 'score_attempts'):
+        op.add_column('news_items', sa.Column('score_attempts', sa.Integer(), nullable=True))
+
+    if added:
+        # A non-zero score or a promotion means the item was scored; the rest are the backlog
+        news = sa.table('news_items', sa.column('scored_at', sa.DateTime), sa.column('score_attempts', sa.Integer),
+                        sa.column('relevance_score', sa.Integer), sa.column('promoted_to_signal', sa.Boolean),
+                        sa.column('fetched_at', sa.DateTime), sa.column('created_at', sa.DateTime))
+        scored = sa.or_(news.c.relevance_score > 0, news.c.promoted_to_signal == sa.true())
+        op.execute(news.update().where(scored).values(
+            scored_at=sa.func.coalesce(news.c.fetched_at, news.c.created_at), score_attempts=1))
+        op.execute(news.update().where(news.c.score_attempts.is_(None)).values(score_attempts=0))
+
+    if not _has_index('news_items', 'ix_news_items_scored_at'):
+        op.create_index('ix_news_items_scored_at', 'news_items', ['scored_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_news_items_scored_at', table_name='news_items')
+    op.drop_column('news_items', 'score_attempts')
+    op.drop_column('news_items', 'scored_at')
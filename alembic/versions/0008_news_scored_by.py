@@ -0,0 +1,34 @@
+"""news_items scored_by, separating model scores from pre-filter scores
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19 20:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0008'
+down_revision: Union[str, None] = '0007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _has_column(table, column):
+    return column in {c['name'] for c in sa.inspect(op.get_bind()).get_columns(table)}
+
+
+def upgrade() -> None:
+    if not _has_column('news_items', 'scored_by'):
+        op.add_column('news_items', sa.Column('scored_by', sa.String(20), nullable=True))
+        # Everything scored so far was scored by the model
+        news = sa.table('news_items', sa.column('scored_by', sa.String), sa.column('scored_at', sa.DateTime))
+        op.execute(news.update().where(news.c.scored_at.isnot(None)).values(scored_by='llm'))
+
+
+def downgrade() -> None:
+    op.drop_column('news_items', 'scored_by')
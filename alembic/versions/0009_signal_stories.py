@@ -0,0 +1,43 @@
+"""signals story_id, linking signals that report the same event to one story
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-19 21:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0009'
+down_revision: Union[str, None] = '0008'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _has_column(table, column):
+    return column in {c['name'] for c in sa.inspect(op.get_bind()).get_columns(table)}
+
+
+def _has_index(table, name):
+    return name in {i['name'] for i in sa.inspect(op.get_bind()).get_indexes(table)}
+
+
+def upgrade() -> None:
+    # The stories table itself comes from create_all; existing signals are left unclustered and
+    # read as single-signal stories until they age out
+    if not _has_column('signals', 'story_id'):
+        op.add_column('signals', sa.Column('story_id', sa.Integer(), nullable=True))
+        # SQLite cannot add a constraint to an existing table
+        if op.get_bind().dialect.name != 'sqlite':
+            op.create_foreign_key('fk_signals_story_id', 'signals', 'stories', ['story_id'], ['id'])
+    if not _has_index('signals', 'ix_signals_story_id'):
+        op.create_index('ix_signals_story_id', 'signals', ['story_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_signals_story_id', table_name='signals')
+    op.drop_column('signals', 'story_id')
@@ -0,0 +1,53 @@
+"""dossier_fact_links, one row per dossier version citing a fact, backfilled from the fact pointers
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-20 09:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0010'
+down_revision: Union[str, None] = '0009'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # create_all builds the table when the app starts; a bare `alembic upgrade` has to
+    if 'dossier_fact_links' not in sa.inspect(op.get_bind()).get_table_names():
+        op.create_table(
+            'dossier_fact_links',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('dossier_id', sa.Integer(), sa.ForeignKey('dossiers.id'), nullable=False),
+            sa.Column('fact_id', sa.Integer(), sa.ForeignKey('dossier_facts.id'), nullable=False),
+            sa.Column('section', sa.String(5)),
+            sa.Column('claim_start', sa.Integer()),
+            sa.Column('claim_end', sa.Integer()),
+        )
+        op.create_index('ix_dossier_fact_links_fact_id', 'dossier_fact_links', ['fact_id'])
+        op.create_index('ux_dossier_fact_links_dossier_fact', 'dossier_fact_links',
+                        ['dossier_id', 'fact_id'], unique=True)
+
+    # Only the first and latest version of each fact are known; versions in between stay unlinked.
+    # Spans of the latest version are all that was kept, so both links get them.
+    for pointer in ('last_seen_dossier_id', 'dossier_id'):
+        op.execute(f"""
+            INSERT INTO dossier_fact_links (dossier_id, fact_id, section, claim_start, claim_end)
+            SELECT f.{pointer}, f.id, f.section, f.claim_start, f.claim_end
+            FROM dossier_facts f
+            WHERE f.{pointer} IS NOT NULL
+              AND NOT EXISTS (SELECT 1 FROM dossier_fact_links l
+                              WHERE l.dossier_id = f.{pointer} AND l.fact_id = f.id)
+        """)
+
+
+def downgrade() -> None:
+    op.drop_index('ux_dossier_fact_links_dossier_fact', table_name='dossier_fact_links')
+    op.drop_index('ix_dossier_fact_links_fact_id', table_name='dossier_fact_links')
+    op.drop_table('dossier_fact_links')
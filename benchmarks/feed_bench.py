@@ -0,0 +1,105 @@
+"""
+RSS parsing benchmark — feedparser vs the streaming parser in integrations/feed_stream.py,
+on synthetic feeds of increasing size. Time and peak Python memory (tracemalloc) per parse.
+
+    python -m benchmarks.feed_bench --items 1000 5000 20000
+
+Cases per feed size:
+  feedparser       whole body parsed, first 20 entries used (what fetch_rss used to do)
+  stream first 20  streaming parse, stops after 20 entries
+  stream all       streaming parse of every entry (worst case: nothing seen, nothing too old)
+  stream seen      all but the newest 10 entries already seen — the usual refresh
+"""
+import argparse
+import io
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from email.utils import format_datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+CHUNK = 64 * 1024
+
+
+def _feed(items):
+    now = datetime(2026, 10, 1)
+    out = ['<?xml version="1.0" encoding="UTF-8"?><rss version="2.0" '
+           'xmlns:content="http://purl.org/rss/1.0/modules/content/"><channel><title>Bench</title>']
+    for i in range(items):
+        pub = format_datetime(now - timedelta(minutes=15 * i)).replace('-0000', '+0000')
+        out.append(
+            f"<item><title>Health plan deploys claims automation&nbsp;{i}</title>"
+            f"<link>https://bench.example.com/story/{i}</link><guid>bench-{i}</guid>"
+            f"<description><![CDATA[<p>{'Payer operations update. ' * 12}</p>]]></description>"
+            f"<content:encoded><![CDATA[<p>{'Full article body text. ' * 40}</p>]]></content:encoded>"
+            f"<pubDate>{pub}</pubDate></item>"
+        )
+    out.append('</channel></rss>')
+    return ''.join(out).encode('utf-8')
+
+
+def _chunks(body, read):
+    stream = io.BytesIO(body)
+    while True:
+        chunk = stream.read(CHUNK)
+        if not chunk:
+            return
+        read[0] += len(chunk)
+        yield chunk
+
+
+def _cases(body, items):
+    import feedparser
+    from integrations.feed_stream import iter_entries
+
+    def _feedparser(read):
+        read[0] = len(body)
+        return len(feedparser.parse(body).entries[:20])
+
+    # Entries are counted, not kept, so peak memory is the parser's own
+    seen = {f"bench-{i}" for i in range(10, items)}
+    return {
+        "feedparser": _feedparser,
+        "stream first 20": lambda read: sum(1 for _ in iter_entries(_chunks(body, read), limit=20)),
+        "stream all": lambda read: sum(1 for _ in iter_entries(_chunks(body, read))),
+        "stream seen": lambda read: sum(1 for _ in iter_entries(_chunks(body, read), seen_ids=seen)),
+    }
+
+
+def _measure(fn, repeats):
+    times = []
+    for _ in range(repeats):
+        read = [0]
+        started = time.perf_counter()
+        count = fn(read)
+        times.append(time.perf_counter() - started)
+    # Memory in a separate pass: tracemalloc slows pure-Python parsing too much to time under it
+    tracemalloc.start()
+    fn([0])
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(times), peak, count, read[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--items', type=int, nargs='+', default=[1000, 5000, 20000])
+    parser.add_argument('--repeats', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"🧪 Feed parsing benchmark — {CHUNK // 1024}KB chunks, median of {args.repeats}")
+    print(f"  {'items':>6} {'feed':>8}  {'case':<16} {'time':>9} {'peak mem':>10} {'entries':>8} {'bytes read':>11}")
+    for items in args.items:
+        body = _feed(items)
+        for name, fn in _cases(body, items).items():
+            seconds, peak, entries, read = _measure(fn, args.repeats)
+            print(f"  {items:>6} {len(body) / 1e6:>6.1f}MB  {name:<16} {seconds * 1000:>7.1f}ms "
+                  f"{peak / 1e6:>8.2f}MB {entries:>8} {read / 1e6:>9.2f}MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""
+Entity mention benchmark — the per-entity substring loop the Gmail webhook used to run, a plain
+longest-first regex alternation (EntityMatcher before the trie), and the trie-compiled
+EntityMatcher, on synthetic entities and documents.
+
+    python -m benchmarks.matcher_bench --entities 1000 --docs 10000
+
+Every document mentions a few entities by name or alias and contains near-misses that a substring
+test takes for mentions ("Cohere" in "coherent", "Glean" in "gleaned"). Mentions found per case are
+reported next to the time, so false positives show up as a higher count.
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+PREFIXES = ["Cohere", "Glean", "Abridge", "Nuance", "Olive", "Notable", "Infinitus", "Hippocratic",
+            "Suki", "Ambience", "Regard", "Innovaccer", "Qventus", "Akasa", "Cedar", "Zelis"]
+SUFFIXES = ["Health", "AI", "Labs", "Systems", "Analytics", "Technologies", "Care", "Networks"]
+NEAR_MISSES = ["coherent", "gleaned", "nuanced", "notably", "cedars", "regardless", "olive oil"]
+FILLER = ("payer operations claims automation prior authorization member services contract "
+          "renewal pilot expansion model evaluation workflow clinical documentation").split()
+
+
+def _entities(n, rng):
+    names, aliases = {}, {}
+    for eid in range(1, n + 1):
+        prefix = PREFIXES[eid % len(PREFIXES)]
+        names[eid] = f"{prefix} {SUFFIXES[eid % len(SUFFIXES)]} {eid}" if eid > len(PREFIXES) else prefix
+        if rng.random() < 0.3:
+            aliases[eid] = [f"{prefix}{eid} Inc."]
+    return names, aliases
+
+
+def _documents(n, names, aliases, rng, words=150):
+    ids = list(names)
+    docs = []
+    for _ in range(n):
+        text = [rng.choice(FILLER) for _ in range(words)]
+        for _ in range(rng.randint(0, 3)):
+            eid = rng.choice(ids)
+            term = rng.choice(aliases[eid]) if eid in aliases and rng.random() < 0.5 else names[eid]
+            text.insert(rng.randrange(len(text)), term)
+        text.insert(rng.randrange(len(text)), rng.choice(NEAR_MISSES))
+        docs.append(" ".join(text))
+    return docs
+
+
+def _cases(names, aliases):
+    from integrations.entity_matcher import EntityMatcher
+
+    terms = {eid: [names[eid]] + aliases.get(eid, []) for eid in names}
+    lowered = {eid: [t.lower() for t in ts] for eid, ts in terms.items()}
+
+    def substring(doc):
+        text = doc.lower()
+        return {eid for eid, ts in lowered.items() if any(t in text for t in ts)}
+
+    by_term = {t.casefold(): eid for eid, ts in terms.items() for t in ts}
+    alternation = re.compile(r"(?<!\w)(?:%s)(?!\w)" % "|".join(
+        re.escape(t) for t in sorted(by_term, key=len, reverse=True)), re.I)
+
+    def plain_regex(doc):
+        return {by_term[m.group(0).casefold()] for m in alternation.finditer(doc)}
+
+    started = time.perf_counter()
+    matcher = EntityMatcher(names, aliases)
+    compile_seconds = time.perf_counter() - started
+    return {"substring loop": substring, "plain alternation": plain_regex, "trie matcher": matcher.match}, \
+        compile_seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--entities', type=int, default=1000)
+    parser.add_argument('--docs', type=int, default=10000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    names, aliases = _entities(args.entities, rng)
+    docs = _documents(args.docs, names, aliases, rng)
+    cases, compile_seconds = _cases(names, aliases)
+
+    print(f"🧪 Entity matcher benchmark — {len(names)} entities ({sum(map(len, aliases.values()))} aliases), "
+          f"{len(docs)} documents; trie compiled in {compile_seconds * 1000:.0f}ms")
+    print(f"  {'case':<18} {'time':>9} {'docs/s':>9} {'mentions':>9}")
+    for name, match in cases.items():
+        started = time.perf_counter()
+        mentions = sum(len(match(doc)) for doc in docs)
+        elapsed = time.perf_counter() - started
+        print(f"  {name:<18} {elapsed:>8.2f}s {len(docs) / elapsed:>9.0f} {mentions:>9}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+"""
+Offline pipeline benchmark — runs the real NewsAggregator, SignalAgent, AutonomyEngine and
+DossierAgent code paths against the stand-in server or recorded cassettes, on a scratch SQLite DB.
+
+    python -m benchmarks.pipeline_bench --mode standin --anthropic-latency lognormal:0.0,0.5
+    python -m benchmarks.pipeline_bench --mode replay --cassettes cassettes/ --latency recorded
+
+--mode record writes cassettes through the stand-in; add --live (and real keys) to record the
+real upstreams instead. The app itself records with INTEL_TRANSPORT=record INTEL_CASSETTE_DIR=cassettes/.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _configure_env(args):
+    # database.py reads DATABASE_URL at import time, so this must run before any app import
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+    for key in ('ANTHROPIC_API_KEY', 'NEWSAPI_KEY', 'PERPLEXITY_API_KEY'):
+        if not args.live:
+            os.environ[key] = 'bench-key'
+    os.environ['INTEL_TRANSPORT'] = args.mode
+    os.environ['INTEL_CASSETTE_DIR'] = args.cassettes
+    os.environ['INTEL_REPLAY_LATENCY'] = args.latency
+    os.environ['INTEL_REPLAY_SEED'] = str(args.seed)
+
+
+def _entity_names(n):
+    from benchmarks.standin_server import DEFAULT_ENTITIES
+    names = DEFAULT_ENTITIES + [f"Bench Co {i}" for i in range(max(0, n - len(DEFAULT_ENTITIES)))]
+    return names[:n]
+
+
+def _timed(label, fn, results):
+    started = time.time()
+    out = fn()
+    elapsed = time.time() - started
+    results.append((label, elapsed))
+    print(f"  {label:<34} {elapsed:8.2f}s")
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--mode', choices=['standin', 'replay', 'record'], default='standin')
+    parser.add_argument('--cassettes', default='cassettes')
+    parser.add_argument('--latency', default='recorded', help='replay latency spec')
+    parser.add_argument('--entities', type=int, default=10)
+    parser.add_argument('--dossiers', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--port', type=int, default=0, help='stand-in port (0 = ephemeral)')
+    parser.add_argument('--live', action='store_true', help='record against real upstreams')
+    for upstream in ('anthropic', 'newsapi', 'perplexity', 'rss'):
+        parser.add_argument(f'--{upstream}-latency', default='none', help='stand-in latency spec')
+    args = parser.parse_args()
+    _configure_env(args)
+
+    server = None
+    if args.mode in ('standin', 'record') and not args.live and not os.getenv('INTEL_STANDIN_URL'):
+        from benchmarks.standin_server import serve, StandinConfig
+        server = serve(args.port, StandinConfig(
+            entities=_entity_names(args.entities), seed=args.seed,
+            latency={u: getattr(args, f'{u}_latency') for u in ('anthropic', 'newsapi', 'perplexity', 'rss')},
+        ), background=True)
+        os.environ['INTEL_STANDIN_URL'] = f"http://127.0.0.1:{server.server_address[1]}"
+
+    from database import init_db, get_db
+    import models
+    from integrations.news_aggregator import NewsAggregator
+    from jobs.news_refresh import refresh_entity_news
+    from ai.signal_agent import SignalAgent
+    from ai.autonomy_engine import AutonomyEngine
+    from ai.dossier_agent import DossierAgent
+
+    init_db()
+    with get_db() as db:
+        for name in _entity_names(args.entities):
+            db.add(models.Entity(name=name, entity_type='competitor', threat_level='high', status='active'))
+        db.commit()
+        entities = [(e.id, e.name) for e in db.query(models.Entity).all()]
+
+    results = []
+    print(f"🧪 Pipeline benchmark — transport={args.mode}, entities={len(entities)}")
+
+    aggregator = NewsAggregator()
+    _timed("news refresh (all entities)", lambda: sum(
+        refresh_entity_news(eid, ename, 'competitor', [], aggregator) for eid, ename in entities), results)
+
+    with get_db() as db:
+        items = db.query(models.NewsItem).order_by(models.NewsItem.id).all()
+        deals = db.query(models.Deal).all()
+        db.expunge_all()  # keep loaded attributes readable after the session closes
+    scores = _timed("signal scoring", lambda: SignalAgent().score_items(items, deals), results)
+    for score_data in (scores or [])[:10]:
+        item = next((i for i in items if i.id == score_data.get('id')), None)
+        if item:
+            SignalAgent().promote_to_signal(item, score_data)
+
+    _timed("autonomy engine", lambda: AutonomyEngine().run(), results)
+
+    for n in range(args.dossiers):
+        eid = entities[n % len(entities)][0]
+        with get_db() as db:
+            d = models.Dossier(entity_id=eid, version=n + 1, generation_status='pending')
+            db.add(d)
+            db.commit()
+            dossier_id = d.id
+        _timed(f"dossier generate #{n + 1}", lambda: DossierAgent().generate(dossier_id, eid), results)
+
+    total = sum(t for _, t in results)
+    print(f"  {'total':<34} {total:8.2f}s")
+    if server:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+"""
+RSS feed state with entities polled on different cadences — a check, not a timing.
+
+    python -m benchmarks.rss_cadence_check --cycles 6
+
+Two entities share one feed: Acme is polled every cycle, Beta every third. The feed answers 304
+to a request carrying its current ETag. Every item is stored and committed, as the ingest pipeline
+does. Checked per run:
+
+  conditional   every request after the first carries If-None-Match, including while the feed's
+                new state is held for Beta
+  once          each entity gets each article exactly once, however many cycles it skipped
+  saved         feed_state holds the latest ETag once both entities have committed
+  store fails   items given back after a failed store come back on the next fetch, once
+
+Runs against a throwaway SQLite database; exits 1 if a check fails.
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+FEED_ITEM = ("<item><title>{title}</title><link>https://feed.example.com/{slug}</link><guid>{slug}</guid>"
+             "<description>{title}</description><pubDate>{date}</pubDate></item>")
+
+
+class _Response:
+    def __init__(self, status, body=b'', etag=None):
+        self.status_code = status
+        self._body = body
+        self.headers = {'ETag': etag} if etag else {}
+
+    def iter_content(self, size):
+        for i in range(0, len(self._body), size):
+            yield self._body[i:i + size]
+
+    @property
+    def content(self):
+        return self._body
+
+    def close(self):
+        pass
+
+
+class _FeedServer:
+    """One feed with articles; a new ETag whenever an article is added. Other feeds are empty."""
+
+    def __init__(self, url):
+        from email.utils import format_datetime
+        from datetime import datetime
+        self.url = url
+        self.articles = []
+        self.requests = []  # (url, If-None-Match sent)
+        self._date = format_datetime(datetime.utcnow()).replace('-0000', '+0000')
+
+    @property
+    def etag(self):
+        return f'"v{len(self.articles)}"'
+
+    def add(self, slug, title):
+        self.articles.insert(0, (slug, title))
+
+    def get(self, url, headers=None, timeout=None, stream=False):
+        sent = (headers or {}).get('If-None-Match')
+        if url != self.url:
+            return _Response(200, b'<rss version="2.0"><channel><title>x</title></channel></rss>', '"empty"')
+        self.requests.append(sent)
+        if sent == self.etag:
+            return _Response(304)
+        items = "".join(FEED_ITEM.format(slug=slug, title=title, date=self._date) for slug, title in self.articles)
+        body = f'<?xml version="1.0"?><rss version="2.0"><channel><title>Feed</title>{items}</channel></rss>'
+        return _Response(200, body.encode('utf-8'), self.etag)
+
+
+def run(cycles):
+    os.environ['DATABASE_URL'] = f"sqlite:///{tempfile.mkdtemp()}/rss_cadence.db"
+    from database import init_db, get_db
+    import models
+    from integrations.news_sources.rss import RssSource, HEALTHCARE_RSS_FEEDS
+
+    init_db()
+    with get_db() as db:
+        db.add_all([models.Entity(id=1, name='Acme', entity_type='competitor', status='active'),
+                    models.Entity(id=2, name='Beta', entity_type='competitor', status='active')])
+        db.commit()
+
+    feed_url = HEALTHCARE_RSS_FEEDS[0][1]
+    server = _FeedServer(feed_url)
+    server.add('both-1', 'Acme and Beta sign a claims partnership')
+    source = RssSource(server)
+    source.set_entities({1: 'Acme', 2: 'Beta'})
+
+    received = {1: [], 2: []}
+    failures = []
+    for cycle in range(cycles):
+        if cycle == 2:
+            server.add('acme-2', 'Acme launches a prior authorization agent')
+        if cycle == 3:
+            server.add('beta-3', 'Beta hires a chief medical officer')
+        source._entries = None  # a new RSS_CYCLE_SECONDS window
+        for eid, every in ((1, 1), (2, 3)):
+            if cycle % every:
+                continue
+            items = source.fetch(eid, {1: 'Acme', 2: 'Beta'}[eid])
+            if eid == 1 and cycle == 2:
+                source.give_back(eid, items)  # the store failed
+                continue
+            received[eid] += [item.url for item in items]
+            source.commit(eid)
+
+    if any(sent is None for sent in server.requests[1:]):
+        failures.append(f"conditional: {sum(1 for s in server.requests[1:] if s is None)} of "
+                        f"{len(server.requests) - 1} later requests had no If-None-Match")
+    for eid, urls in received.items():
+        if len(urls) != len(set(urls)):
+            failures.append(f"once: entity {eid} got repeats: {urls}")
+    expected = {1: {'both-1', 'acme-2'}, 2: {'both-1', 'beta-3'}}
+    for eid, slugs in expected.items():
+        got = {url.rsplit('/', 1)[1] for url in received[eid]}
+        if got != slugs:
+            failures.append(f"once: entity {eid} got {sorted(got)}, expected {sorted(slugs)}")
+    with get_db() as db:
+        state = db.query(models.FeedState).filter(models.FeedState.url == feed_url).first()
+        saved_etag = state.etag if state else None
+    if not source._uncommitted and saved_etag != server.etag:
+        failures.append(f"saved: feed_state etag {saved_etag}, feed is at {server.etag}")
+
+    print(f"requests: {len(server.requests)}, with If-None-Match: {sum(1 for s in server.requests if s)}")
+    print(f"received: {received}")
+    print(f"feed_state etag: {saved_etag} (feed {server.etag}), still held: {sorted(source._uncommitted)}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--cycles', type=int, default=6)
+    args = parser.parse_args()
+    failures = run(args.cycles)
+    for failure in failures:
+        print(f"FAIL {failure}")
+    print("OK" if not failures else f"{len(failures)} check(s) failed")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
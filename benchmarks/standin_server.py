@@ -0,0 +1,309 @@
+"""
+Local stand-in for Anthropic, NewsAPI, Perplexity and RSS feeds.
+
+Pair with INTEL_TRANSPORT=standin: the transport rewrites https://<host>/<path> to
+http://127.0.0.1:8765/<host>/<path>, and this server answers by host. Responses are
+deterministic per request so benchmark runs are comparable.
+
+    python -m benchmarks.standin_server --port 8765 --anthropic-latency lognormal:0.5,0.4 --error-rate 0.02
+"""
+import argparse
+import email.utils
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+from integrations.transport import sample_latency
+
+DEFAULT_ENTITIES = ["Cohere", "Google Cloud Healthcare AI", "IBM Watson Health", "Palantir"]
+TOPICS = ["partnership", "funding round", "product launch", "exec hire", "customer win", "pilot expansion"]
+
+
+def _rng(*parts):
+    seed = hashlib.sha256("|".join(str(p) for p in parts).encode()).hexdigest()
+    return random.Random(int(seed[:16], 16))
+
+
+def _iso(dt):
+    return dt.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+class StandinConfig:
+
+    def __init__(self, entities=None, latency=None, error_rate=0.0, rss_items=20, seed=0):
+        self.entities = entities or DEFAULT_ENTITIES
+        self.latency = latency or {}  # upstream → latency spec
+        self.error_rate = error_rate
+        self.rss_items = rss_items
+        self.seed = seed
+        self.requests = {}
+        self._lock = threading.Lock()
+        self._rng = random.Random(seed)
+
+    def count(self, upstream):
+        with self._lock:
+            self.requests[upstream] = self.requests.get(upstream, 0) + 1
+
+    def delay(self, upstream):
+        with self._lock:
+            return sample_latency(self.latency.get(upstream, 'none'), self._rng)
+
+    def should_fail(self):
+        with self._lock:
+            return self._rng.random() < self.error_rate
+
+
+# ── Anthropic ─────────────────────────────────────────────────────
+
+def _section_text(prompt, rng):
+    m = re.search(r'\*\*(.+?)\*\*', prompt)
+    subject = m.group(1) if m else "the company"
+    slug = re.sub(r'[^a-z0-9]+', '-', subject.lower()).strip('-')
+    sentences = []
+    for i in range(rng.randint(6, 10)):
+        topic = rng.choice(TOPICS)
+        day = datetime(2026, 1, 1) + timedelta(days=rng.randint(0, 280))
+        sentences.append(
+            f"{subject} reported a {topic} affecting its healthcare business "
+            f"[Source: https://news.example.com/{slug}/{topic.replace(' ', '-')}-{i}, {day:%Y-%m-%d}]."
+        )
+    return " ".join(sentences) + "\n\nCONFIDENCE: Medium — synthetic stand-in output"
+
+
+def _anthropic_text(prompt, rng):
+    ids = [int(x) for x in re.findall(r'^\[(\d+)\]', prompt, re.M)]
+    if 'Score these news items' in prompt:
+        return json.dumps([{
+            "id": i, "score": rng.randint(1, 100), "signal_type": rng.choice(
+                ["news", "product_launch", "exec_change", "partnership", "funding", "customer_win"]),
+            "rationale": "Synthetic score.", "deal_relevance": None,
+        } for i in ids])
+    if 'should be surfaced' in prompt:
+        return json.dumps([{
+            "story_id": i, "surface": rng.random() < 0.3, "urgency": "batch", "audience": ["analysts"],
+            "action_suggestion": "Review.", "dossier_update_needed": None, "rationale": "Synthetic.",
+        } for i in ids])
+    if 'Return 3-5 items as JSON' in prompt:
+        name = re.search(r'developments from (.+?) in \d{4}', prompt)
+        name = name.group(1) if name else "Company"
+        return json.dumps([{
+            "headline": f"{name} {rng.choice(TOPICS)} {rng.randint(1, 9999)}",
+            "summary": f"{name} announced a {rng.choice(TOPICS)}.",
+            "url": f"https://search.example.com/{rng.randint(1, 10**9)}",
+            "date": _iso(datetime.utcnow() - timedelta(hours=rng.randint(1, 160))),
+        } for _ in range(rng.randint(3, 5))])
+    if 'Return as JSON' in prompt or 'Return JSON' in prompt:
+        return json.dumps({"entity_name": "stand-in", "subject": "Stand-in digest", "headline": "Synthetic",
+                           "overall_confidence": "Medium", "sources": []})
+    return _section_text(prompt, rng)
+
+
+def _anthropic_response(body, rng):
+    messages = body.get('messages') or [{}]
+    prompt = messages[-1].get('content', '')
+    if isinstance(prompt, list):
+        prompt = " ".join(b.get('text', '') for b in prompt if isinstance(b, dict))
+    text = _anthropic_text(prompt, rng)
+    content = []
+    searches = 0
+    search_tool = next((t for t in body.get('tools') or [] if t.get('name') == 'web_search'), None)
+    if search_tool:
+        # Prompts carrying cached results search less; max_uses caps it either way
+        searches = rng.randint(0, 1) if 'already retrieved' in prompt else rng.randint(1, 3)
+        searches = min(searches, search_tool.get('max_uses') or searches)
+        subject = re.search(r'\*\*(.+?)\*\*|developments from (.+?) in \d{4}', prompt)
+        subject = next((g for g in subject.groups() if g), None) if subject else prompt[:40]
+        for n in range(searches):
+            tool_id = f"srvtoolu_{rng.randint(1, 10**9)}"
+            content.append({"type": "server_tool_use", "id": tool_id, "name": "web_search",
+                            "input": {"query": f"{subject} {rng.choice(TOPICS)} {n}"}})
+            content.append({"type": "web_search_tool_result", "tool_use_id": tool_id, "content": [
+                {"type": "web_search_result", "url": f"https://news.example.com/r/{rng.randint(1, 10**9)}",
+                 "title": "Synthetic result", "page_age": "2 days ago"}
+            ]})
+    content.append({"type": "text", "text": text})
+    return {
+        "id": f"msg_{rng.randint(1, 10**12)}", "type": "message", "role": "assistant",
+        "model": body.get('model'), "content": content, "stop_reason": "end_turn",
+        "usage": {"input_tokens": len(prompt) // 4, "output_tokens": len(text) // 4,
+                  "server_tool_use": {"web_search_requests": searches}},
+    }
+
+
+# ── NewsAPI / Perplexity / RSS ────────────────────────────────────
+
+def _newsapi_response(query, rng):
+    # Each name gets an article every 3 hours (offset per name), anchored to the hour so repeat
+    # queries see the same articles and new ones appear over time; `from` is honored like NewsAPI's
+    q = query.get('q', [''])[0]
+    page_size = int(query.get('pageSize', ['10'])[0])
+    page = int(query.get('page', ['1'])[0])
+    names = re.findall(r'"([^"]+)"', q) or [q]
+    bucket_start = datetime.utcfromtimestamp(int(time.time() // 3600) * 3600)
+    since = bucket_start - timedelta(days=7)
+    if query.get('from'):
+        since = max(since, datetime.fromisoformat(query['from'][0].replace('Z', '')))
+    articles = []
+    for name in names:
+        offset = int(hashlib.md5(name.encode()).hexdigest(), 16) % 180
+        slug = re.sub(r'[^a-z0-9]+', '-', name.lower())
+        for k in range(7 * 8):
+            pub = bucket_start - timedelta(minutes=offset + k * 180)
+            if pub < since:
+                break
+            topic = TOPICS[(k + offset) % len(TOPICS)]
+            stamp = int(pub.timestamp())
+            articles.append({
+                "source": {"id": None, "name": "Stand-in Wire"},
+                "title": f"{name} {topic} update {stamp}",
+                "description": f"{name} announced a {topic}.",
+                "url": f"https://wire.example.com/{slug}/{stamp}",
+                "publishedAt": _iso(pub),
+            })
+    articles.sort(key=lambda a: a["publishedAt"], reverse=True)
+    return {"status": "ok", "totalResults": len(articles),
+            "articles": articles[(page - 1) * page_size:page * page_size]}
+
+
+def _perplexity_response(body, rng):
+    prompt = (body.get('messages') or [{}])[-1].get('content', '')
+    return {
+        "choices": [{"message": {"role": "assistant", "content":
+                     f"Recent developments: {prompt[:80]} — " + " ".join(rng.choice(TOPICS) for _ in range(20))}}],
+        "citations": [f"https://perplexity.example.com/c/{rng.randint(1, 10**9)}"],
+    }
+
+
+def _rss_feed(host, path, config):
+    # Content changes once per hour so conditional GETs see realistic 304s
+    bucket = int(time.time() // 3600)
+    rng = _rng(host, path, bucket, config.seed)
+    bucket_start = datetime.utcfromtimestamp(bucket * 3600)
+    items = []
+    for i in range(config.rss_items):
+        name = rng.choice(config.entities)
+        topic = rng.choice(TOPICS)
+        pub = bucket_start - timedelta(minutes=i * 45)
+        items.append(
+            f"<item><title>{name} {topic} {bucket}-{i}</title>"
+            f"<link>https://{host}/story/{bucket}-{i}</link>"
+            f"<guid>https://{host}/story/{bucket}-{i}</guid>"
+            f"<description>{name} announced a {topic} with a health plan.</description>"
+            f"<pubDate>{email.utils.format_datetime(pub.replace(tzinfo=None))}</pubDate></item>"
+        )
+    body = (f'<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel>'
+            f'<title>{host}</title><link>https://{host}/</link>{"".join(items)}</channel></rss>')
+    return body.encode(), bucket
+
+
+def make_handler(config):
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, *args):
+            pass
+
+        def _split(self):
+            parsed = urlparse(self.path)
+            host, _, rest = parsed.path.lstrip('/').partition('/')
+            return host, '/' + rest, parse_qs(parsed.query)
+
+        def _send(self, status, body, content_type='application/json', headers=None):
+            if isinstance(body, (dict, list)):
+                body = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            for k, v in (headers or {}).items():
+                self.send_header(k, v)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _upstream(self, host):
+            if 'anthropic' in host:
+                return 'anthropic'
+            if 'newsapi' in host:
+                return 'newsapi'
+            if 'perplexity' in host:
+                return 'perplexity'
+            return 'rss'
+
+        def _prelude(self, upstream):
+            config.count(upstream)
+            time.sleep(config.delay(upstream))
+            if config.should_fail():
+                self._send(503, {"error": "stand-in injected failure"})
+                return False
+            return True
+
+        def do_GET(self):
+            host, path, query = self._split()
+            if host == '_stats':
+                return self._send(200, config.requests)
+            upstream = self._upstream(host)
+            if not self._prelude(upstream):
+                return
+            if upstream == 'newsapi':
+                return self._send(200, _newsapi_response(query, _rng(self.path, config.seed)))
+            body, bucket = _rss_feed(host, path, config)
+            etag = f'"{hashlib.md5(body).hexdigest()}"'
+            last_modified = email.utils.formatdate(bucket * 3600, usegmt=True)
+            if self.headers.get('If-None-Match') == etag or \
+                    (not self.headers.get('If-None-Match') and self.headers.get('If-Modified-Since') == last_modified):
+                return self._send(304, b'', headers={'ETag': etag, 'Last-Modified': last_modified})
+            self._send(200, body, 'application/rss+xml', {'ETag': etag, 'Last-Modified': last_modified})
+
+        def do_POST(self):
+            host, path, _ = self._split()
+            length = int(self.headers.get('Content-Length', 0))
+            body = json.loads(self.rfile.read(length) or b'{}')
+            upstream = self._upstream(host)
+            if not self._prelude(upstream):
+                return
+            rng = _rng(json.dumps(body, sort_keys=True), config.seed)
+            if upstream == 'anthropic':
+                return self._send(200, _anthropic_response(body, rng))
+            if upstream == 'perplexity':
+                return self._send(200, _perplexity_response(body, rng))
+            self._send(404, {"error": f"no stand-in for POST {host}{path}"})
+
+    return Handler
+
+
+def serve(port=8765, config=None, background=False):
+    """Start the stand-in. With background=True returns the server running in a daemon thread."""
+    server = ThreadingHTTPServer(('127.0.0.1', port), make_handler(config or StandinConfig()))
+    server.daemon_threads = True
+    if background:
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+    print(f"🧪 Stand-in upstreams on http://127.0.0.1:{server.server_address[1]}")
+    server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--entities', default=','.join(DEFAULT_ENTITIES))
+    parser.add_argument('--rss-items', type=int, default=20)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--seed', type=int, default=0)
+    for upstream in ('anthropic', 'newsapi', 'perplexity', 'rss'):
+        parser.add_argument(f'--{upstream}-latency', default='none')
+    args = parser.parse_args()
+    serve(args.port, StandinConfig(
+        entities=[e.strip() for e in args.entities.split(',') if e.strip()],
+        latency={u: getattr(args, f'{u}_latency') for u in ('anthropic', 'newsapi', 'perplexity', 'rss')},
+        error_rate=args.error_rate, rss_items=args.rss_items, seed=args.seed,
+    ))
+
+
+if __name__ == '__main__':
+    main()
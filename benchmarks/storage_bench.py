@@ -0,0 +1,156 @@
+"""
+Dossier storage benchmark — bytes on disk and read latency for plain Text columns,
+zlib snapshots only, and snapshot + delta (the default), on a scratch SQLite DB.
+
+    python -m benchmarks.storage_bench --entities 20 --versions 12 --churn 0.3
+
+Versions are synthetic: each one rewrites a --churn fraction of the previous version's
+sections, each of those by replacing some of its sentences — the way incremental refreshes do.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+WORDS = ("platform revenue enterprise claims automation healthcare payer provider deployment contract "
+         "pilot expansion partnership funding valuation hiring leadership product launch model agent "
+         "workflow compliance underwriting prior-authorization member servicing pricing margin").split()
+
+
+def _sentence(rng, n):
+    day = f"2026-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+    words = " ".join(rng.choice(WORDS) for _ in range(rng.randint(12, 28)))
+    return f"{words.capitalize()} [Source: https://news.example.com/{rng.randint(1, 10**6)}/{n}, {day}]."
+
+
+def _section(rng, sentences=None):
+    return " ".join(_sentence(rng, i) for i in range(sentences or rng.randint(8, 20)))
+
+
+def _evolve(rng, sections, churn):
+    out = dict(sections)
+    for key in sections:
+        if rng.random() < churn:
+            parts = out[key].split("]. ")
+            for _ in range(max(1, len(parts) // 4)):
+                parts[rng.randrange(len(parts))] = _sentence(rng, rng.randint(0, 99)).rstrip(']. ')
+            out[key] = "]. ".join(parts)
+    return out
+
+
+def _corpus(entities, versions, churn, seed):
+    import models
+    rng = random.Random(seed)
+    corpus = []
+    for e in range(entities):
+        sections = {k: _section(rng) for k in models.DOSSIER_SECTION_COLUMNS}
+        history = [sections]
+        for _ in range(versions - 1):
+            sections = _evolve(rng, sections, churn)
+            history.append(sections)
+        corpus.append(history)
+    return corpus
+
+
+def _load(mode, corpus, snapshot_every):
+    """Fresh DB with every version stored in the given mode. Returns (engine, db path)."""
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import Session
+    from database import Base
+    import models
+    import dossier_storage
+
+    path = os.path.join(tempfile.mkdtemp(), f"{mode}.db")
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    dossier_storage.SNAPSHOT_EVERY = 1 if mode == 'zlib' else snapshot_every
+    dossier_storage._snapshot_cache.clear()  # ids repeat across the scratch DBs
+
+    with Session(engine) as db:
+        for e, history in enumerate(corpus):
+            entity = models.Entity(name=f"Bench Co {e}", entity_type='competitor')
+            db.add(entity)
+            db.flush()
+            for v, sections in enumerate(history):
+                d = models.Dossier(entity_id=entity.id, version=v + 1, generation_status='completed',
+                                   **{col: sections[k] for k, col in models.DOSSIER_SECTION_COLUMNS.items()})
+                db.add(d)
+                db.flush()
+                if mode != 'plain':
+                    dossier_storage.pack_dossier(db, d)
+        db.commit()
+    with engine.connect() as conn:
+        conn.exec_driver_sql("VACUUM")
+    return engine, path
+
+
+def _stored_bytes(engine):
+    import models
+    from sqlalchemy import func
+    from sqlalchemy.orm import Session
+    with Session(engine) as db:
+        text_bytes = sum(func.coalesce(func.length(getattr(models.Dossier, col)), 0)
+                         for col in models.DOSSIER_SECTION_COLUMNS.values())
+        blob_bytes = func.coalesce(func.length(models.Dossier.sections_blob), 0)
+        return db.query(func.sum(text_bytes + blob_bytes)).scalar() or 0
+
+
+def _time_reads(engine, reads, rng):
+    """Median ms to load one random version and build its to_dict (fresh session per read)."""
+    import models
+    import dossier_storage
+    from sqlalchemy.orm import Session
+
+    latest, any_version = [], []
+    with Session(engine) as db:
+        ids = [i for (i,) in db.query(models.Dossier.id).all()]
+        latest_ids = [db.query(models.Dossier.id).filter(models.Dossier.entity_id == e.id)
+                      .order_by(models.Dossier.version.desc()).limit(1).scalar()
+                      for e in db.query(models.Entity).all()]
+    dossier_storage._snapshot_cache.clear()
+    for bucket, pool in ((latest, latest_ids), (any_version, ids)):
+        for _ in range(reads):
+            dossier_id = rng.choice(pool)
+            started = time.perf_counter()
+            with Session(engine) as db:
+                db.query(models.Dossier).filter(models.Dossier.id == dossier_id).first().to_dict()
+            bucket.append((time.perf_counter() - started) * 1000)
+    return statistics.median(latest), statistics.median(any_version), max(any_version)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--entities', type=int, default=20)
+    parser.add_argument('--versions', type=int, default=12)
+    parser.add_argument('--churn', type=float, default=0.3, help='fraction of sections rewritten per version')
+    parser.add_argument('--reads', type=int, default=300)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    os.environ.setdefault('DATABASE_URL', f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'unused.db')}")
+    import dossier_storage
+    snapshot_every = dossier_storage.SNAPSHOT_EVERY
+
+    corpus = _corpus(args.entities, args.versions, args.churn, args.seed)
+    raw = sum(len(t.encode('utf-8')) for history in corpus for v in history for t in v.values())
+    print(f"🧪 Storage benchmark — {args.entities} entities × {args.versions} versions, churn {args.churn}, "
+          f"{raw / 1e6:.1f} MB of section text")
+    print(f"  {'mode':<8} {'section bytes':>14} {'ratio':>7} {'db file':>10} "
+          f"{'latest p50':>11} {'any p50':>9} {'any max':>9}")
+
+    for mode in ('plain', 'zlib', 'delta'):
+        engine, path = _load(mode, corpus, snapshot_every)
+        stored = _stored_bytes(engine)
+        p50_latest, p50_any, worst = _time_reads(engine, args.reads, random.Random(args.seed))
+        print(f"  {mode:<8} {stored:>14,} {raw / max(stored, 1):>6.1f}x {os.path.getsize(path) / 1e6:>8.1f}MB "
+              f"{p50_latest:>9.2f}ms {p50_any:>7.2f}ms {worst:>7.2f}ms")
+        engine.dispose()
+
+
+if __name__ == '__main__':
+    main()
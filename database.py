@@ -40,9 +40,24 @@ SessionLocal = scoped_session(sessionmaker(autocommit=False, autoflush=False, bi
 Base = declarative_base()
 
 def init_db():
-    """Initialize database - create all tables"""
+    """Initialize database - create all tables, then apply column migrations to existing ones"""
     Base.metadata.create_all(bind=engine)
     print("Database tables created/verified")
+    run_migrations()
+
+
+def run_migrations():
+    """alembic upgrade head. Revisions are idempotent so they are safe on freshly created tables.
+    A failure is raised: the code expects the migrated schema, so it must not start without it."""
+    try:
+        from alembic import command
+        from alembic.config import Config
+        cfg = Config(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'alembic.ini'))
+        command.upgrade(cfg, 'head')
+        print("Database migrations applied")
+    except Exception as e:
+        print(f"❌ Database migrations failed: {e}")
+        raise
 
 @contextmanager
 def get_db():
@@ -0,0 +1,165 @@
+"""
+Compressed storage for completed dossier sections A–K.
+
+storage_format on a Dossier row:
+  plain   sections live in the section_* Text columns (in-progress rows, and anything not yet packed)
+  packed  a snapshot: every section zlib-compressed into sections_blob
+  delta   each section compressed with the same section of a packed base version
+          (delta_base_id) as the zlib preset dictionary; unchanged sections are stored as a
+          reference. Reading one is always snapshot + one delta — never a chain.
+
+A fresh snapshot is written every SNAPSHOT_EVERY versions of an entity, or whenever a delta
+would save too little over a snapshot (the base has drifted too far).
+"""
+import os
+import struct
+import threading
+import zlib
+from collections import OrderedDict
+
+SNAPSHOT_EVERY = int(os.getenv('DOSSIER_SNAPSHOT_EVERY', 8))
+# Fall back to a snapshot when the delta is more than this fraction of one
+DELTA_MAX_RATIO = float(os.getenv('DOSSIER_DELTA_MAX_RATIO', 0.6))
+
+MAGIC = b'DS1'
+SAME, ZLIB, ZDICT, EMPTY = 0, 1, 2, 3
+_ENTRY = struct.Struct('>cBI')  # section key, mode, payload length
+
+# zlib's window is 32KB, so that is all of a base section the dictionary can use
+_ZDICT_LIMIT = 32 * 1024
+
+_snapshot_cache = OrderedDict()
+_snapshot_cache_lock = threading.Lock()
+_SNAPSHOT_CACHE_SIZE = int(os.getenv('DOSSIER_SNAPSHOT_CACHE', 128))
+
+
+def _section_keys():
+    import models
+    return list(models.DOSSIER_SECTION_COLUMNS)
+
+
+def encode(sections, base=None):
+    """Pack {key: text}. With `base` ({key: text} of a snapshot) sections are delta-coded against it."""
+    out = [MAGIC]
+    for key in _section_keys():
+        text = sections.get(key)
+        if not text:
+            mode, payload = EMPTY, b''
+        elif base is not None and base.get(key) == text:
+            mode, payload = SAME, b''
+        elif base is not None and base.get(key):
+            zdict = base[key].encode('utf-8')[-_ZDICT_LIMIT:]
+            compressor = zlib.compressobj(level=9, zdict=zdict)
+            mode, payload = ZDICT, compressor.compress(text.encode('utf-8')) + compressor.flush()
+        else:
+            mode, payload = ZLIB, zlib.compress(text.encode('utf-8'), 9)
+        out.append(_ENTRY.pack(key.encode('ascii'), mode, len(payload)))
+        out.append(payload)
+    return b''.join(out)
+
+
+def decode(blob, base=None):
+    blob = bytes(blob)
+    if not blob.startswith(MAGIC):
+        raise ValueError("Not a packed dossier blob")
+    sections = {}
+    pos = len(MAGIC)
+    while pos < len(blob):
+        key, mode, length = _ENTRY.unpack_from(blob, pos)
+        pos += _ENTRY.size
+        payload = blob[pos:pos + length]
+        pos += length
+        key = key.decode('ascii')
+        if mode == EMPTY:
+            sections[key] = None
+        elif mode == SAME:
+            sections[key] = base[key]
+        elif mode == ZDICT:
+            zdict = base[key].encode('utf-8')[-_ZDICT_LIMIT:]
+            decompressor = zlib.decompressobj(zdict=zdict)
+            sections[key] = (decompressor.decompress(payload) + decompressor.flush()).decode('utf-8')
+        else:
+            sections[key] = zlib.decompress(payload).decode('utf-8')
+    return sections
+
+
+def plan_pack(sections, base_sections=None, deltas_on_base=0):
+    """Choose the storage for one version. Returns (storage_format, blob)."""
+    snapshot = encode(sections)
+    if base_sections is None or deltas_on_base >= SNAPSHOT_EVERY - 1:
+        return 'packed', snapshot
+    delta = encode(sections, base_sections)
+    if len(delta) > DELTA_MAX_RATIO * len(snapshot):
+        return 'packed', snapshot
+    return 'delta', delta
+
+
+def _cached_snapshot(dossier_id, blob_loader):
+    # Snapshots never change once written, so decoded ones are shared across requests
+    with _snapshot_cache_lock:
+        if dossier_id in _snapshot_cache:
+            _snapshot_cache.move_to_end(dossier_id)
+            return _snapshot_cache[dossier_id]
+    sections = decode(blob_loader())
+    with _snapshot_cache_lock:
+        _snapshot_cache[dossier_id] = sections
+        while len(_snapshot_cache) > _SNAPSHOT_CACHE_SIZE:
+            _snapshot_cache.popitem(last=False)
+    return sections
+
+
+def _load_base(dossier):
+    from sqlalchemy.orm import object_session
+    import models
+
+    def _blob():
+        session = object_session(dossier)
+        if session is not None:
+            return session.query(models.Dossier.sections_blob).filter(
+                models.Dossier.id == dossier.delta_base_id).scalar()
+        # Detached row: read through a private session so no caller's scoped session is closed
+        from sqlalchemy.orm import Session
+        from database import engine
+        with Session(engine) as s:
+            return s.query(models.Dossier.sections_blob).filter(
+                models.Dossier.id == dossier.delta_base_id).scalar()
+
+    return _cached_snapshot(dossier.delta_base_id, _blob)
+
+
+def read_sections(dossier):
+    """{key: text} for sections A–K, whatever the row's storage format."""
+    import models
+    fmt = dossier.storage_format or 'plain'
+    if fmt == 'plain' or dossier.sections_blob is None:
+        return {k: getattr(dossier, col) for k, col in models.DOSSIER_SECTION_COLUMNS.items()}
+    if fmt == 'packed':
+        return _cached_snapshot(dossier.id, lambda: dossier.sections_blob)
+    return decode(dossier.sections_blob, _load_base(dossier))
+
+
+def pack_dossier(db, dossier):
+    """Move a completed row's section text into sections_blob. Returns size stats for generation_meta."""
+    import models
+
+    sections = read_sections(dossier)
+    raw_bytes = sum(len((t or '').encode('utf-8')) for t in sections.values())
+
+    base = db.query(models.Dossier).filter(
+        models.Dossier.entity_id == dossier.entity_id,
+        models.Dossier.id != dossier.id,
+        models.Dossier.storage_format == 'packed'
+    ).order_by(models.Dossier.id.desc()).first()
+    base_sections, deltas_on_base = None, 0
+    if base:
+        base_sections = read_sections(base)
+        deltas_on_base = db.query(models.Dossier).filter(models.Dossier.delta_base_id == base.id).count()
+
+    fmt, blob = plan_pack(sections, base_sections, deltas_on_base)
+    dossier.storage_format = fmt
+    dossier.sections_blob = blob
+    dossier.delta_base_id = base.id if fmt == 'delta' else None
+    for col in models.DOSSIER_SECTION_COLUMNS.values():
+        setattr(dossier, col, None)
+    return {"format": fmt, "raw_bytes": raw_bytes, "stored_bytes": len(blob),
+            "base_dossier_id": dossier.delta_base_id}
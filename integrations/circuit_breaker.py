@@ -0,0 +1,290 @@
+"""
+Per-upstream circuit breakers — Anthropic, NewsAPI, Perplexity, RSS, Slack.
+
+closed     → calls flow; outcomes recorded in a rolling window
+open       → failure rate (or consecutive failures) crossed the threshold; calls fail fast
+half_open  → cooldown elapsed; a few probe calls are let through.
+             A successful probe closes the breaker, a failed one re-opens it with a longer cooldown.
+"""
+import os
+import threading
+import time
+from collections import deque
+from urllib.parse import urlparse
+
+
+# name → thresholds. Env overrides: CB_<NAME>_<KEY>, e.g. CB_ANTHROPIC_COOLDOWN_SECONDS=120
+UPSTREAM_DEFAULTS = {
+    'anthropic': {'failure_rate': 0.5, 'min_calls': 4, 'consecutive_failures': 3,
+                  'window_seconds': 300, 'cooldown_seconds': 60, 'max_cooldown_seconds': 900},
+    'newsapi': {'failure_rate': 0.5, 'min_calls': 5, 'consecutive_failures': 3,
+                'window_seconds': 120, 'cooldown_seconds': 60, 'max_cooldown_seconds': 1800},
+    'perplexity': {'failure_rate': 0.5, 'min_calls': 5, 'consecutive_failures': 3,
+                   'window_seconds': 120, 'cooldown_seconds': 60, 'max_cooldown_seconds': 1800},
+    'rss': {'failure_rate': 0.6, 'min_calls': 3, 'consecutive_failures': 3,
+            'window_seconds': 600, 'cooldown_seconds': 300, 'max_cooldown_seconds': 3600},
+    'slack': {'failure_rate': 0.5, 'min_calls': 5, 'consecutive_failures': 5,
+              'window_seconds': 60, 'cooldown_seconds': 30, 'max_cooldown_seconds': 600},
+}
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is rejected because the upstream's breaker is open."""
+
+    def __init__(self, name, retry_in):
+        self.name = name
+        self.retry_in = retry_in
+        super().__init__(f"Circuit open for {name} — retry in {retry_in:.0f}s")
+
+
+def is_failure_status(status_code):
+    """Upstream-health failures: rate limiting and server errors. Other 4xx are caller errors."""
+    return status_code == 429 or status_code >= 500
+
+
+class CircuitBreaker:
+
+    def __init__(self, name, failure_rate=0.5, min_calls=5, consecutive_failures=3,
+                 window_seconds=120, cooldown_seconds=60, max_cooldown_seconds=1800,
+                 half_open_max_calls=1):
+        self.name = name
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.consecutive_failures = consecutive_failures
+        self.window_seconds = window_seconds
+        self.cooldown_seconds = cooldown_seconds
+        self.max_cooldown_seconds = max_cooldown_seconds
+        self.half_open_max_calls = half_open_max_calls
+
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._outcomes = deque()  # (timestamp, ok)
+        self._consecutive = 0
+        self._opened_at = None
+        self._current_cooldown = cooldown_seconds
+        self._half_open_in_flight = 0
+        self._last_error = None
+        self._last_change = time.time()
+        self._rejected = 0
+        self._total_calls = 0
+        self._total_failures = 0
+
+    # ── state machine ─────────────────────────────────────────────
+
+    def _prune(self, now):
+        cutoff = now - self.window_seconds
+        while self._outcomes and self._outcomes[0][0] < cutoff:
+            self._outcomes.popleft()
+
+    def _transition(self, state, now):
+        if state != self._state:
+            print(f"  🔌 Circuit {self.name}: {self._state} → {state}")
+            self._state = state
+            self._last_change = now
+
+    def _maybe_half_open(self, now):
+        if self._state == OPEN and now - self._opened_at >= self._current_cooldown:
+            self._transition(HALF_OPEN, now)
+            self._half_open_in_flight = 0
+
+    def reserve(self):
+        """Reserve a call slot: an Attempt to record the call's outcome on, or None (counting a
+        rejection) when failing fast. Use the Attempt as a context manager — leaving the block without
+        an outcome (our own error, a rate limit, a cancelled call) gives a half-open probe slot back."""
+        now = time.time()
+        with self._lock:
+            self._maybe_half_open(now)
+            if self._state == CLOSED:
+                return Attempt(self, probe=False)
+            if self._state == HALF_OPEN and self._half_open_in_flight < self.half_open_max_calls:
+                self._half_open_in_flight += 1
+                return Attempt(self, probe=True)
+            self._rejected += 1
+            return None
+
+    def _release(self):
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._half_open_in_flight = max(0, self._half_open_in_flight - 1)
+
+    def retry_in(self):
+        with self._lock:
+            if self._state != OPEN:
+                return 0.0
+            return max(0.0, self._current_cooldown - (time.time() - self._opened_at))
+
+    def record_success(self):
+        now = time.time()
+        with self._lock:
+            self._total_calls += 1
+            self._consecutive = 0
+            self._outcomes.append((now, True))
+            self._prune(now)
+            if self._state == HALF_OPEN:
+                self._half_open_in_flight = max(0, self._half_open_in_flight - 1)
+                self._outcomes.clear()
+                self._current_cooldown = self.cooldown_seconds
+                self._transition(CLOSED, now)
+
+    def record_failure(self, error=None):
+        now = time.time()
+        with self._lock:
+            self._total_calls += 1
+            self._total_failures += 1
+            self._consecutive += 1
+            self._last_error = str(error)[:300] if error else None
+            self._outcomes.append((now, False))
+            self._prune(now)
+
+            if self._state == HALF_OPEN:
+                self._half_open_in_flight = max(0, self._half_open_in_flight - 1)
+                self._current_cooldown = min(self._current_cooldown * 2, self.max_cooldown_seconds)
+                self._opened_at = now
+                self._transition(OPEN, now)
+                return
+
+            if self._state == CLOSED and self._should_trip():
+                self._opened_at = now
+                self._transition(OPEN, now)
+
+    def _should_trip(self):
+        if self._consecutive >= self.consecutive_failures:
+            return True
+        total = len(self._outcomes)
+        if total < self.min_calls:
+            return False
+        failures = sum(1 for _, ok in self._outcomes if not ok)
+        return failures / total >= self.failure_rate
+
+    def call(self, fn, *args, **kwargs):
+        """Run fn through the breaker. Exceptions count as failures and are re-raised."""
+        attempt = self.reserve()
+        if not attempt:
+            raise CircuitOpenError(self.name, self.retry_in())
+        with attempt:
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                attempt.failure(e)
+                raise
+            attempt.success()
+            return result
+
+    def reset(self):
+        with self._lock:
+            self._outcomes.clear()
+            self._consecutive = 0
+            self._half_open_in_flight = 0
+            self._current_cooldown = self.cooldown_seconds
+            self._transition(CLOSED, time.time())
+
+    @property
+    def state(self):
+        with self._lock:
+            self._maybe_half_open(time.time())
+            return self._state
+
+    def snapshot(self):
+        now = time.time()
+        with self._lock:
+            self._maybe_half_open(now)
+            self._prune(now)
+            total = len(self._outcomes)
+            failures = sum(1 for _, ok in self._outcomes if not ok)
+            return {
+                "name": self.name,
+                "state": self._state,
+                "window_calls": total,
+                "window_failure_rate": round(failures / total, 3) if total else 0.0,
+                "consecutive_failures": self._consecutive,
+                "retry_in_seconds": round(max(0.0, self._current_cooldown - (now - self._opened_at)), 1)
+                                    if self._state == OPEN else 0,
+                "cooldown_seconds": self._current_cooldown,
+                "rejected_calls": self._rejected,
+                "total_calls": self._total_calls,
+                "total_failures": self._total_failures,
+                "last_error": self._last_error,
+                "state_since": time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(self._last_change)),
+            }
+
+
+class Attempt:
+    """One reserved call. Record success() or failure() once; release() (or leaving the with-block)
+    without an outcome frees a half-open probe slot instead of holding it forever."""
+
+    def __init__(self, breaker, probe):
+        self.breaker = breaker
+        self.probe = probe
+        self._done = False
+        self._lock = threading.Lock()
+
+    def _finish(self):
+        with self._lock:
+            done, self._done = self._done, True
+        return not done
+
+    def success(self):
+        if self._finish():
+            self.breaker.record_success()
+
+    def failure(self, error=None):
+        if self._finish():
+            self.breaker.record_failure(error)
+
+    def release(self):
+        if self._finish() and self.probe:
+            self.breaker._release()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+        return False
+
+
+_breakers = {}
+_registry_lock = threading.Lock()
+
+
+def _config_for(upstream):
+    config = dict(UPSTREAM_DEFAULTS.get(upstream, UPSTREAM_DEFAULTS['rss']))
+    for key, default in list(config.items()):
+        override = os.getenv(f"CB_{upstream.upper()}_{key.upper()}")
+        if override:
+            config[key] = type(default)(override)
+    return config
+
+
+def get_breaker(name):
+    """Get (or lazily create) the breaker for an upstream. 'rss:<host>' uses the rss thresholds."""
+    with _registry_lock:
+        breaker = _breakers.get(name)
+        if not breaker:
+            breaker = CircuitBreaker(name, **_config_for(name.split(':', 1)[0]))
+            _breakers[name] = breaker
+        return breaker
+
+
+def rss_breaker(feed_url):
+    """One breaker per feed host so a single dead publisher doesn't block the others."""
+    return get_breaker(f"rss:{urlparse(feed_url).netloc or feed_url}")
+
+
+def all_breakers():
+    with _registry_lock:
+        breakers = list(_breakers.values())
+    return [b.snapshot() for b in sorted(breakers, key=lambda b: b.name)]
+
+
+def reset_breaker(name):
+    with _registry_lock:
+        breaker = _breakers.get(name)
+    if not breaker:
+        return False
+    breaker.reset()
+    return True
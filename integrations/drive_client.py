@@ -33,3 +33,24 @@ def get_file_text(access_token: str, file_id: str, mime_type: str) -> str:
         while not done:
             _, done = downloader.next_chunk()
         return fh.getvalue().decode('utf-8', errors='replace')[:10000]
+
+
+def scan_folder_mentions(access_token: str, folder_id: str) -> List[Dict]:
+    """Files in the folder whose name or text mentions tracked entities, each with its entity_ids."""
+    from integrations.entity_matcher import get_matcher
+    matcher = get_matcher()
+    if not matcher:
+        return []
+    found = []
+    for f in list_files_in_folder(access_token, folder_id):
+        if f.get('mimeType') == 'application/vnd.google-apps.folder':
+            continue
+        try:
+            text = get_file_text(access_token, f['id'], f.get('mimeType', ''))
+        except Exception as e:
+            print(f"Drive file read error ({f.get('name')}): {e}")
+            continue
+        entity_ids = matcher.match(f.get('name', ''), text)
+        if entity_ids:
+            found.append({**f, "entity_ids": sorted(entity_ids)})
+    return found
@@ -0,0 +1,116 @@
+"""
+Match text against every tracked entity name and alias in one pass.
+
+All names are compiled into a single case-insensitive regex with word boundaries. The names are
+factored into a character trie first ("cohere", "cohere health" → "cohere(?:\\s+health)?"), so
+the regex engine follows one branch per text position instead of retrying every name, and the
+longest name still wins: "Cohere Health" over "Cohere", while "Glean" does not match "gleaned".
+A space in a name matches any run of whitespace.
+
+get_matcher() is the shared matcher over all active entities (name + Entity.aliases), used by RSS,
+Gmail, Drive and Slack. It is rebuilt only when the entities table changes.
+"""
+import os
+import re
+import threading
+import time
+
+# How often get_matcher() checks the entities table for changes
+RECHECK_SECONDS = int(os.getenv('ENTITY_MATCHER_RECHECK_SECONDS', 60))
+
+_END = ''  # trie key marking that a name ends at this node
+
+_shared = None       # (entities fingerprint, EntityMatcher)
+_checked_at = 0.0
+_shared_lock = threading.Lock()
+
+
+def _key(name):
+    return re.sub(r'\s+', ' ', (name or '').strip()).casefold()
+
+
+def _trie_pattern(keys):
+    trie = {}
+    for key in keys:
+        node = trie
+        for ch in key:
+            node = node.setdefault(ch, {})
+        node[_END] = {}
+
+    def render(node):
+        branches = [(r'\s+' if ch == ' ' else re.escape(ch)) + render(child)
+                    for ch, child in sorted(node.items()) if ch != _END]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if _END in node:
+            # a name ends here but longer ones continue: try them first, greedily
+            return body + '?' if len(branches) == 1 and len(body) == 1 else f'(?:{body})?'
+        return body
+
+    return render(trie)
+
+
+class EntityMatcher:
+
+    def __init__(self, names, aliases=None):
+        """names: {entity_id: name}; aliases: {entity_id: [alias, ...]}, matched like the name."""
+        self._ids_by_name = {}
+        for entity_id, name in names.items():
+            for term in [name] + list((aliases or {}).get(entity_id) or []):
+                key = _key(term)
+                if key:
+                    self._ids_by_name.setdefault(key, set()).add(entity_id)
+        pattern = _trie_pattern(self._ids_by_name)
+        # \b fails next to names that start or end with punctuation ("C3.ai", "Abridge, Inc."), so
+        # boundaries are "not a word character" instead
+        self._pattern = re.compile(rf"(?<!\w)(?:{pattern})(?!\w)", re.I) if pattern else None
+
+    def __len__(self):
+        return len(self._ids_by_name)
+
+    def match(self, *texts):
+        """Entity ids whose name or an alias appears in any of the texts."""
+        if self._pattern is None:
+            return set()
+        found = set()
+        for text in texts:
+            for m in self._pattern.finditer(text or ''):
+                found |= self._ids_by_name.get(_key(m.group(0)), set())
+        return found
+
+
+def _fingerprint(db):
+    from sqlalchemy import func
+    import models
+    return db.query(func.count(models.Entity.id), func.max(models.Entity.updated_at)).one()
+
+
+def get_matcher():
+    """The shared matcher over active entities, or None if it could never be built (no database).
+    A failed recheck keeps serving the last matcher."""
+    global _shared, _checked_at
+    with _shared_lock:
+        if _shared and time.time() - _checked_at < RECHECK_SECONDS:
+            return _shared[1]
+        try:
+            from database import get_db
+            import models
+            with get_db() as db:
+                fingerprint = tuple(_fingerprint(db))
+                if not _shared or _shared[0] != fingerprint:
+                    rows = db.query(models.Entity.id, models.Entity.name, models.Entity.aliases).filter(
+                        models.Entity.status == 'active').all()
+                    _shared = (fingerprint, EntityMatcher({eid: name for eid, name, _ in rows},
+                                                          {eid: aliases for eid, _, aliases in rows if aliases}))
+            _checked_at = time.time()
+        except Exception as e:
+            print(f"  ⚠️  Entity matcher refresh failed: {e}")
+        return _shared[1] if _shared else None
+
+
+def invalidate():
+    """Rebuild on the next get_matcher() call — for writers that just changed an entity."""
+    global _checked_at
+    with _shared_lock:
+        _checked_at = 0.0
@@ -0,0 +1,191 @@
+"""
+Streaming RSS / Atom parser.
+
+Feeds are parsed incrementally from the response body with an expat-backed XMLParser and a
+target that keeps only the entry being read, so memory stays flat however large the feed is.
+Entries come out lazily as normalized dicts:
+
+    {"id", "title", "link", "summary", "published"}   published is a naive UTC datetime or None
+
+Feeds list newest first, so iteration stops once it runs into entries that were already seen
+or are older than the cutoff — the rest of an archive feed is never downloaded.
+"""
+import html.entities
+import re
+import xml.etree.ElementTree as ET
+from collections import deque
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+ENTRY_TAGS = {'item', 'entry'}
+TITLE_TAGS = {'title'}
+ID_TAGS = {'guid', 'id'}
+SUMMARY_TAGS = {'description', 'summary'}
+CONTENT_TAGS = {'encoded', 'content'}  # content:encoded (RSS), content (Atom) — used when there's no summary
+DATE_TAGS = {'pubDate', 'published', 'updated', 'date', 'issued'}
+
+# Entries in a row that must be seen or too old before iteration stops; one stray old entry
+# (a pinned post, an updated story) does not end the feed
+STOP_AFTER = 3
+
+# XML only predefines five entities; feeds routinely use HTML ones like &nbsp; and &mdash;.
+# expat hands undefined entities to XMLParser.entity only when the document has an external
+# DTD, so feeds without a DOCTYPE get a stub one inserted before their root element.
+_HTML_ENTITIES = {name: chr(cp) for name, cp in html.entities.name2codepoint.items()}
+_DOCTYPE_STUB = b'<!DOCTYPE feed SYSTEM "about:legacy-compat">'
+_FIRST_ELEMENT = re.compile(rb'<[A-Za-z_]')
+_PROLOG_LIMIT = 64 * 1024
+
+
+class FeedParseError(Exception):
+    """The body is not well-formed XML (an HTML error page, a truncated download)."""
+
+
+def _local(tag):
+    return tag.rsplit('}', 1)[-1]
+
+
+def parse_date(text):
+    text = (text or '').strip()
+    if not text:
+        return None
+    try:
+        parsed = parsedate_to_datetime(text)
+    except (TypeError, ValueError, IndexError):
+        try:
+            parsed = datetime.fromisoformat(text.replace('Z', '+00:00'))
+        except ValueError:
+            return None
+    if parsed.tzinfo:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+class _EntryTarget:
+    """XMLParser target collecting finished entries into a queue."""
+
+    def __init__(self):
+        self.ready = deque()
+        self._depth = 0
+        self._entry = None
+        self._entry_depth = None
+        self._field = None
+        self._text = []
+
+    def start(self, tag, attrib):
+        self._depth += 1
+        name = _local(tag)
+        if self._entry is None:
+            if name in ENTRY_TAGS:
+                self._entry = {}
+                self._entry_depth = self._depth
+            return
+        if self._depth != self._entry_depth + 1:
+            return  # only direct children of an entry (skips author/name, media groups, …)
+        if name == 'link' and attrib.get('href'):
+            # Atom: prefer rel="alternate" (or no rel) over enclosures and self links
+            if attrib.get('rel', 'alternate') == 'alternate' or 'link' not in self._entry:
+                self._entry['link'] = attrib['href']
+            return
+        self._field = name
+        self._text = []
+
+    def data(self, data):
+        if self._field is not None:
+            self._text.append(data)
+
+    def end(self, tag):
+        name = _local(tag)
+        if self._entry is not None:
+            if self._depth == self._entry_depth:
+                self.ready.append(self._finish(self._entry))
+                self._entry = None
+            elif self._field is not None and self._depth == self._entry_depth + 1:
+                text = ''.join(self._text).strip()
+                if text:
+                    self._entry.setdefault(name, text)  # first occurrence wins (RSS <link>, <guid>, …)
+                self._field = None
+        self._depth -= 1
+
+    def close(self):
+        return None
+
+    @staticmethod
+    def _finish(raw):
+        def first(tags):
+            return next((raw[t] for t in raw if t in tags and raw[t]), None)
+
+        link = raw.get('link')
+        return {
+            "id": first(ID_TAGS) or link or first(TITLE_TAGS),
+            "title": first(TITLE_TAGS) or '',
+            "link": link or '',
+            "summary": first(SUMMARY_TAGS) or first(CONTENT_TAGS) or '',
+            "published": parse_date(first(DATE_TAGS)),
+        }
+
+
+def _with_doctype(chunks):
+    head = b''
+    chunks = iter(chunks)
+    for chunk in chunks:
+        head += chunk
+        m = _FIRST_ELEMENT.search(head)
+        if m or len(head) > _PROLOG_LIMIT:
+            if m and b'<!DOCTYPE' not in head[:m.start()]:
+                head = head[:m.start()] + _DOCTYPE_STUB + head[m.start():]
+            yield head
+            break
+    else:
+        if head:
+            yield head
+        return
+    yield from chunks
+
+
+def iter_entries(chunks, seen_ids=None, since=None, limit=None, stats=None):
+    """Yield normalized entries from an iterable of byte chunks (e.g. resp.iter_content()).
+
+    Entries whose id is in seen_ids, or published before `since`, are skipped; STOP_AFTER of
+    them in a row end the iteration. Closing the generator early stops reading `chunks`.
+    `stats`, if given, is filled with {"skipped", "stopped_early"}."""
+    target = _EntryTarget()
+    parser = ET.XMLParser(target=target)
+    parser.entity.update(_HTML_ENTITIES)
+    seen_ids = seen_ids or set()
+    stats = stats if stats is not None else {}
+    stats.update(skipped=0, stopped_early=False)
+    yielded = 0
+    stale_run = 0
+
+    def _drain():
+        nonlocal yielded, stale_run
+        while target.ready:
+            entry = target.ready.popleft()
+            stale = entry["id"] in seen_ids or (since and entry["published"] and entry["published"] < since)
+            if stale:
+                stats["skipped"] += 1
+                stale_run += 1
+                if stale_run >= STOP_AFTER:
+                    stats["stopped_early"] = True
+                    return False
+                continue
+            stale_run = 0
+            yield entry
+            yielded += 1
+            if limit and yielded >= limit:
+                stats["stopped_early"] = True
+                return False
+        return True
+
+    try:
+        for chunk in _with_doctype(chunks):
+            if not chunk:
+                continue
+            parser.feed(chunk)
+            if not (yield from _drain()):
+                return
+        parser.close()
+    except ET.ParseError as e:
+        raise FeedParseError(str(e)) from e
+    yield from _drain()
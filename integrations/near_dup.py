@@ -0,0 +1,141 @@
+"""
+Near-duplicate news detection across sources and time, per entity.
+
+Each stored news item gets a 64-bit SimHash of its headline and the start of its summary
+(news_fingerprints). The hash is split into BANDS 16-bit bands, each an indexed column, so
+candidates are the items sharing any band — by pigeonhole every item within MAX_DISTANCE < BANDS
+differing bits shares at least one. Candidates of the same entity from the last WINDOW_DAYS are
+then compared by Hamming distance; a match is recorded in news_duplicates against the canonical
+item instead of becoming a second news_items row. A story covering two entities stays a news item
+for each, so both get scored.
+"""
+import hashlib
+import os
+import re
+from datetime import datetime, timedelta
+
+BITS = 64
+BANDS = 4
+BAND_BITS = BITS // BANDS
+MAX_DISTANCE = min(int(os.getenv('NEAR_DUP_MAX_DISTANCE', 3)), BANDS - 1)
+WINDOW_DAYS = int(os.getenv('NEAR_DUP_WINDOW_DAYS', 7))
+# Syndicated copies share the lede and diverge later, so only the start of the summary counts
+SUMMARY_CHARS = 300
+# Too few features and unrelated short headlines collide
+MIN_FEATURES = 4
+
+_WORD_RE = re.compile(r"[a-z0-9][a-z0-9'&.-]*[a-z0-9]|[a-z0-9]")
+_STOPWORDS = frozenset("a an and are as at be by for from has have in is it its of on or that the this "
+                       "to was were will with".split())
+
+
+def _words(text):
+    return [w for w in _WORD_RE.findall((text or '').lower()) if w not in _STOPWORDS]
+
+
+def features(headline, summary):
+    """{feature: weight} — headline words and word pairs count double."""
+    weights = {}
+    head = _words(headline)
+    for w in head:
+        weights[w] = weights.get(w, 0) + 2
+    for a, b in zip(head, head[1:]):
+        weights[f"{a} {b}"] = weights.get(f"{a} {b}", 0) + 2
+    for w in _words(re.sub(r'<[^>]+>', ' ', summary or '')[:SUMMARY_CHARS]):
+        weights[w] = weights.get(w, 0) + 1
+    return weights
+
+
+def simhash(weights):
+    totals = [0] * BITS
+    for feature, weight in weights.items():
+        h = int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest(), 'big')
+        for i in range(BITS):
+            totals[i] += weight if (h >> i) & 1 else -weight
+    return sum(1 << i for i in range(BITS) if totals[i] > 0)
+
+
+def fingerprint(headline, summary):
+    """64-bit SimHash, or None when the text is too short to fingerprint reliably."""
+    weights = features(headline, summary)
+    if len(weights) < MIN_FEATURES:
+        return None
+    return simhash(weights)
+
+
+def bands(h):
+    return [(h >> (BAND_BITS * i)) & ((1 << BAND_BITS) - 1) for i in range(BANDS)]
+
+
+def distance(a, b):
+    return bin(a ^ b).count('1')
+
+
+def _signed(h):
+    # BigInteger is signed 64-bit
+    return h - (1 << BITS) if h >= 1 << (BITS - 1) else h
+
+
+def _unsigned(h):
+    return h + (1 << BITS) if h < 0 else h
+
+
+def find_duplicate(db, h, entity_id, since=None):
+    """(news_item_id, distance) of the closest recent indexed item of the entity within MAX_DISTANCE,
+    or None."""
+    import models
+    from sqlalchemy import or_
+
+    since = since or datetime.utcnow() - timedelta(days=WINDOW_DAYS)
+    band_filter = or_(*[getattr(models.NewsFingerprint, f"band_{i}") == b for i, b in enumerate(bands(h))])
+    best = None
+    for news_item_id, stored in db.query(models.NewsFingerprint.news_item_id, models.NewsFingerprint.simhash).join(
+        models.NewsItem, models.NewsItem.id == models.NewsFingerprint.news_item_id
+    ).filter(
+        band_filter,
+        models.NewsItem.entity_id == entity_id,
+        models.NewsFingerprint.created_at >= since
+    ).order_by(models.NewsFingerprint.created_at.desc()).limit(500):
+        d = distance(h, _unsigned(stored))
+        if d <= MAX_DISTANCE and (best is None or d < best[1]):
+            best = (news_item_id, d)
+    return best
+
+
+def index_item(db, news_item_id, h, created_at=None):
+    import models
+    db.add(models.NewsFingerprint(
+        news_item_id=news_item_id,
+        simhash=_signed(h),
+        created_at=created_at or datetime.utcnow(),
+        **{f"band_{i}": b for i, b in enumerate(bands(h))}
+    ))
+
+
+def backfill(days=WINDOW_DAYS, batch_size=500):
+    """Fingerprint news items from the window that predate the index. Returns how many were indexed."""
+    from database import get_db
+    import models
+
+    since = datetime.utcnow() - timedelta(days=days)
+    indexed = 0
+    last_id = 0
+    while True:
+        with get_db() as db:
+            rows = db.query(models.NewsItem.id, models.NewsItem.headline, models.NewsItem.summary,
+                            models.NewsItem.fetched_at).outerjoin(
+                models.NewsFingerprint, models.NewsFingerprint.news_item_id == models.NewsItem.id
+            ).filter(
+                models.NewsFingerprint.id.is_(None),
+                models.NewsItem.fetched_at >= since,
+                models.NewsItem.id > last_id
+            ).order_by(models.NewsItem.id).limit(batch_size).all()
+            if not rows:
+                return indexed
+            for news_item_id, headline, summary, fetched_at in rows:
+                h = fingerprint(headline, summary)
+                if h is not None:
+                    index_item(db, news_item_id, h, fetched_at)
+                    indexed += 1
+            last_id = rows[-1][0]
+            db.commit()
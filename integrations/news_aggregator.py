@@ -1,211 +1,207 @@
 """
-Unified news aggregator — NewsAPI + Perplexity + RSS + Claude web search
+Unified news aggregator — runs every enabled source adapter in integrations/news_sources
+(NewsAPI + Perplexity + RSS + Claude web search) for an entity and merges what they return.
 """
 import os
-import json
+import time
+import threading
+import statistics
 import requests
-import feedparser
-from datetime import datetime, timedelta
-from dataclasses import dataclass, field
-from typing import List, Optional
-
-
-@dataclass
-class NewsItem:
-    entity_id: int
-    headline: str
-    summary: str
-    url: str
-    source_name: str
-    source_type: str
-    published_at: Optional[datetime] = None
-
-
-HEALTHCARE_RSS_FEEDS = [
-    ("TechCrunch AI", "https://techcrunch.com/category/artificial-intelligence/feed/"),
-    ("Fierce Healthcare", "https://www.fiercehealthcare.com/rss/xml"),
-    ("STAT News", "https://www.statnews.com/feed/"),
-    ("Modern Healthcare", "https://www.modernhealthcare.com/section/technology/rss"),
-    ("VentureBeat AI", "https://venturebeat.com/category/ai/feed/"),
-    ("Healthcare IT News", "https://www.healthcareitnews.com/rss.xml"),
-    ("Becker's Health IT", "https://www.beckershospitalreview.com/rss/health-it.rss"),
-]
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from contextlib import nullcontext
+from dataclasses import replace
+from typing import List
+from integrations.circuit_breaker import get_breaker
+from integrations.news_sources import NewsItem, UpstreamError, RateLimited, create_sources
+from integrations.transport import get_transport
+
+
+# (source label, entity_id) → (stored_at, items). Used to serve explicit degraded results while a breaker is open.
+LAST_GOOD_TTL_SECONDS = int(os.getenv('NEWS_LAST_GOOD_TTL_SECONDS', 24 * 3600))
+_last_good = {}
+_last_good_lock = threading.Lock()
+
+# Source calls for all entities share one pool; a timed-out call finishes here in the background.
+# Each source's own concurrency, rate limit and timeout are declared on its adapter.
+_source_pool = ThreadPoolExecutor(max_workers=int(os.getenv('NEWS_SOURCE_WORKERS', 32)),
+                                  thread_name_prefix='news-source')
 
 
 class NewsAggregator:
 
-    def __init__(self):
-        self.newsapi_key = os.getenv('NEWSAPI_KEY')
-        self.perplexity_key = os.getenv('PERPLEXITY_API_KEY')
-        self.anthropic_key = os.getenv('ANTHROPIC_API_KEY')
+    def __init__(self, transport=None, sources=None):
+        self.transport = transport or get_transport()
+        self.degraded_sources = []  # (label, entity_name) pairs served from cache in this aggregator's lifetime
+        self._stats_lock = threading.Lock()
+        self._source_stats = {}
+        self.sources = sources if sources is not None else create_sources(self.transport, self._record_source)
+        self._label_by_type = {s.source_type: s.label for s in self.sources}
+
+    @property
+    def rss_stats(self):
+        """Conditional-GET outcome of the last RSS feed fetch, if the RSS source is enabled."""
+        return next((s.stats for s in self.sources if s.name == 'rss'), None)
+
+    def set_entities(self, names):
+        """Register every entity of this refresh cycle ({entity_id: name}) with sources that batch
+        across entities. Can be called again as entities come and go."""
+        for source in self.sources:
+            source.set_entities(names)
 
     def fetch_all(self, entity_id: int, entity_name: str, entity_type: str = 'competitor',
                   use_cases: list = None) -> List[NewsItem]:
+        """Query every source concurrently; each gets its adapter's timeout_seconds of wall clock."""
         results = []
+        started = time.time()
+        pending = []
+
+        for source in self.sources:
+            attempt = get_breaker(source.upstream).reserve() if source.upstream else None
+            if source.upstream and not attempt:
+                cached = self._cached_results(source.label, entity_id)
+                self.degraded_sources.append((source.label, entity_name))
+                self._record_source(source.label, degraded=True)
+                print(f"  🔌 {source.label} circuit open for {entity_name} — serving {len(cached)} cached items")
+                results += cached
+                continue
+            call = {"lock": threading.Lock(), "abandoned": False, "delivered": False}
+            future = _source_pool.submit(self._run_source, source, attempt, entity_id, entity_name, call)
+            pending.append((source, attempt, call, future))
 
-        for fn, label in [(self.fetch_newsapi, 'NewsAPI'), (self.fetch_perplexity, 'Perplexity'),
-                          (self.fetch_rss, 'RSS'), (self.fetch_claude_search, 'Claude')]:
+        for source, attempt, call, future in pending:
+            remaining = source.timeout_seconds - (time.time() - started)
             try:
-                results += fn(entity_id, entity_name)
+                results += future.result(timeout=max(0.0, remaining))
+            except FutureTimeout:
+                with call["lock"]:
+                    call["abandoned"] = True
+                    delivered = call["delivered"]
+                if delivered:
+                    results += future.result()  # finished just as we gave up: it is returning now
+                    continue
+                if future.cancel() and attempt:
+                    attempt.release()  # never ran, so it will not record an outcome
+                self._record_source(source.label, timed_out=True)
+                print(f"  ⏱️  {source.label} timed out for {entity_name} after {source.timeout_seconds:.0f}s")
+            except RateLimited as e:
+                print(f"  🚦 {e} — skipped for {entity_name}")
             except Exception as e:
-                print(f"  ⚠️  {label} error for {entity_name}: {e}")
+                print(f"  ⚠️  {source.label} error for {entity_name}: {e}")
 
         return self._deduplicate(results)
 
-    def fetch_newsapi(self, entity_id: int, entity_name: str) -> List[NewsItem]:
-        if not self.newsapi_key:
-            return []
-
-        resp = requests.get("https://newsapi.org/v2/everything", params={
-            "q": f'"{entity_name}"',
-            "sortBy": "publishedAt",
-            "pageSize": 10,
-            "language": "en",
-            "from": (datetime.utcnow() - timedelta(days=7)).strftime('%Y-%m-%d'),
-            "apiKey": self.newsapi_key
-        }, timeout=15)
-
-        if resp.status_code != 200:
-            return []
-
-        items = []
-        for a in resp.json().get('articles', []):
-            if not a.get('url') or a['url'] == '[Removed]':
-                continue
-            items.append(NewsItem(
-                entity_id=entity_id,
-                headline=a.get('title', '')[:500],
-                summary=(a.get('description') or '')[:1000],
-                url=a['url'],
-                source_name=a.get('source', {}).get('name', 'NewsAPI'),
-                source_type='newsapi',
-                published_at=self._parse_date(a.get('publishedAt'))
-            ))
-        return items
-
-    def fetch_perplexity(self, entity_id: int, entity_name: str) -> List[NewsItem]:
-        if not self.perplexity_key:
-            return []
-
-        resp = requests.post(
-            "https://api.perplexity.ai/chat/completions",
-            json={
-                "model": "llama-3.1-sonar-small-128k-online",
-                "messages": [{"role": "user", "content": f"Latest news about {entity_name} in the last 7 days. Include specific announcements, partnerships, funding, product launches."}]
-            },
-            headers={"Authorization": f"Bearer {self.perplexity_key}", "Content-Type": "application/json"},
-            timeout=30
-        )
-
-        if resp.status_code != 200:
-            return []
-
-        data = resp.json()
-        content = data.get('choices', [{}])[0].get('message', {}).get('content', '')
-        citations = data.get('citations', [])
-
-        if not content or len(content) < 50:
-            return []
-
-        return [NewsItem(
-            entity_id=entity_id,
-            headline=f"{entity_name} — Recent Developments (Perplexity)",
-            summary=content[:1500],
-            url=citations[0] if citations else f"https://perplexity.ai/search?q={entity_name.replace(' ', '+')}",
-            source_name="Perplexity AI",
-            source_type='perplexity',
-            published_at=datetime.utcnow()
-        )]
-
-    def fetch_rss(self, entity_id: int, entity_name: str) -> List[NewsItem]:
-        items = []
-        entity_lower = entity_name.lower()
-
-        for feed_name, feed_url in HEALTHCARE_RSS_FEEDS:
+    def _run_source(self, source, attempt, entity_id, entity_name, call):
+        """attempt is the source's reserved breaker slot (None without a breaker). Every exit records
+        an outcome on it or releases it. Items that come back after fetch_all stopped waiting are
+        given back to the source instead of being dropped."""
+        t0 = time.time()
+        with attempt or nullcontext():
             try:
-                feed = feedparser.parse(feed_url)
-                for entry in feed.entries[:20]:
-                    title = entry.get('title', '')
-                    summary = entry.get('summary', '') or entry.get('description', '')
-                    link = entry.get('link', '')
-
-                    if entity_lower not in title.lower() and entity_lower not in summary.lower():
-                        continue
-
-                    published = None
-                    if hasattr(entry, 'published_parsed') and entry.published_parsed:
-                        published = datetime(*entry.published_parsed[:6])
-
-                    items.append(NewsItem(
-                        entity_id=entity_id,
-                        headline=title[:500],
-                        summary=summary[:1000],
-                        url=link,
-                        source_name=feed_name,
-                        source_type='rss',
-                        published_at=published
-                    ))
-            except Exception:
-                continue
-
+                items = source.fetch(entity_id, entity_name)
+            except RateLimited:
+                raise  # our own limit, not the upstream's health: the slot is released, no outcome
+            except Exception as e:
+                if attempt and isinstance(e, (UpstreamError, requests.RequestException)):
+                    attempt.failure(e)
+                elif attempt:
+                    attempt.success()  # a parsing bug on our side is not an upstream outage
+                self._record_source(source.label, seconds=time.time() - t0, error=True)
+                raise
+            if attempt:
+                attempt.success()
+        self._remember_results(source.label, entity_id, items)
+        self._record_source(source.label, seconds=time.time() - t0, items=len(items))
+        with call["lock"]:
+            if call["abandoned"]:
+                source.give_back(entity_id, items)
+                return []
+            call["delivered"] = True
         return items
 
-    def fetch_claude_search(self, entity_id: int, entity_name: str) -> List[NewsItem]:
-        if not self.anthropic_key:
-            return []
+    def give_back(self, entity_id, items):
+        """Storing what fetch_all returned for the entity failed: each source takes its own items
+        back (and does not move its marks), so the next fetch returns them again."""
+        for source in self.sources:
+            try:
+                source.give_back(entity_id, [item for item in items if item.source_type == source.source_type])
+            except Exception as e:
+                print(f"  ⚠️  {source.label}: give back failed for entity {entity_id}: {e}")
 
-        resp = requests.post(
-            "https://api.anthropic.com/v1/messages",
-            json={
-                "model": "claude-sonnet-4-20250514",
-                "max_tokens": 1000,
-                "tools": [{"type": "web_search_20250305", "name": "web_search"}],
-                "messages": [{"role": "user", "content": f"Find the latest news, announcements, and developments from {entity_name} in 2026. Focus on healthcare AI, partnerships, product launches, funding. Return 3-5 items as JSON: [{{\"headline\": \"...\", \"summary\": \"...\", \"url\": \"...\", \"date\": \"...\"}}]"}]
-            },
-            headers={
-                "Content-Type": "application/json",
-                "x-api-key": self.anthropic_key,
-                "anthropic-version": "2023-06-01"
-            },
-            timeout=60
-        )
-
-        if resp.status_code != 200:
+    def commit(self, entity_id):
+        """Everything fetch_all returned for the entity is stored; sources may advance their marks."""
+        for source in self.sources:
+            try:
+                source.commit(entity_id)
+            except Exception as e:
+                print(f"  ⚠️  {source.label}: commit failed for entity {entity_id}: {e}")
+
+    def _record_source(self, label, seconds=None, items=0, error=False, timed_out=False, degraded=False, **counters):
+        """Counters beyond the common ones (e.g. NewsAPI requests) are summed into the label's report."""
+        with self._stats_lock:
+            stats = self._source_stats.setdefault(label, {
+                "calls": 0, "items": 0, "errors": 0, "timeouts": 0, "degraded": 0, "latencies": []})
+            for key, value in counters.items():
+                stats[key] = stats.get(key, 0) + value
+            if seconds is not None:
+                stats["calls"] += 1
+                stats["latencies"].append(seconds)
+            stats["items"] += items
+            stats["errors"] += int(error)
+            stats["timeouts"] += int(timed_out)
+            stats["degraded"] += int(degraded)
+
+    def record_outcomes(self, items, outcomes):
+        """What storage made of each returned item ('new', 'duplicate', 'known'), for dedupe rates."""
+        for item, outcome in zip(items, outcomes):
+            label = self._label_by_type.get(item.source_type)
+            if label:
+                self._record_source(label, **{f"stored_{outcome}": 1})
+
+    def source_report(self, reset=False):
+        """Per-source calls, items, latency, yield, error rate and dedupe rate since this aggregator was
+        created, or since the last report with reset=True. A timed-out call is counted under timeouts,
+        and under calls once it finishes in the background.
+
+          yield         items per completed call
+          error_rate    (errors + timeouts) / attempts
+          dedupe_rate   share of returned items dropped as same-fetch duplicates or found already
+                        stored (same canonical URL or a near-duplicate)"""
+        with self._stats_lock:
+            report = {}
+            for label, stats in self._source_stats.items():
+                latencies = sorted(stats["latencies"])
+                report[label] = entry = {k: v for k, v in stats.items() if k != "latencies"}
+                if latencies:
+                    entry.update({
+                        "p50_ms": round(statistics.median(latencies) * 1000),
+                        "p95_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000),
+                        "max_ms": round(latencies[-1] * 1000),
+                    })
+                attempts = stats["calls"] + stats["timeouts"]
+                entry["yield"] = round(stats["items"] / stats["calls"], 2) if stats["calls"] else None
+                entry["error_rate"] = round((stats["errors"] + stats["timeouts"]) / attempts, 3) if attempts else None
+                deduped = stats.get("deduped", 0) + stats.get("stored_known", 0) + stats.get("stored_duplicate", 0)
+                entry["dedupe_rate"] = round(deduped / stats["items"], 3) if stats["items"] else None
+            if reset:
+                self._source_stats = {}
+            return report
+
+    def _remember_results(self, label, entity_id, items):
+        if not items:
+            return
+        with _last_good_lock:
+            _last_good[(label, entity_id)] = (time.time(), list(items))
+
+    def _cached_results(self, label, entity_id) -> List[NewsItem]:
+        with _last_good_lock:
+            entry = _last_good.get((label, entity_id))
+        if not entry or time.time() - entry[0] > LAST_GOOD_TTL_SECONDS:
             return []
-
-        data = resp.json()
-        text_content = next((c['text'] for c in data.get('content', []) if c.get('type') == 'text'), '')
-
-        items = []
-        try:
-            import re
-            m = re.search(r'\[[\s\S]*\]', text_content)
-            if m:
-                for item in json.loads(m.group())[:5]:
-                    items.append(NewsItem(
-                        entity_id=entity_id,
-                        headline=item.get('headline', '')[:500],
-                        summary=item.get('summary', '')[:1000],
-                        url=item.get('url', f"https://claude.ai/search/{entity_name.replace(' ', '+')}"),
-                        source_name="Claude Web Search",
-                        source_type='claude_search',
-                        published_at=self._parse_date(item.get('date'))
-                    ))
-        except Exception:
-            if text_content:
-                items.append(NewsItem(
-                    entity_id=entity_id,
-                    headline=f"{entity_name} — Latest Developments",
-                    summary=text_content[:1000],
-                    url=f"https://claude.ai/search/{entity_name.replace(' ', '+')}",
-                    source_name="Claude Web Search",
-                    source_type='claude_search',
-                    published_at=datetime.utcnow()
-                ))
-
-        return items
+        return [replace(item, degraded=True) for item in entry[1]]
 
     def _deduplicate(self, items: List[NewsItem]) -> List[NewsItem]:
+        from integrations.url_canon import canonical_url
+
         seen_urls = set()
         seen_headlines = set()
         result = []
@@ -213,10 +209,13 @@ class NewsAggregator:
         for item in items:
             if not item.url or not item.headline:
                 continue
-            url_key = item.url.split('?')[0].rstrip('/')
+            url_key = canonical_url(item.url)
             headline_key = item.headline[:60].lower().strip()
 
             if url_key in seen_urls or headline_key in seen_headlines:
+                label = self._label_by_type.get(item.source_type)
+                if label:
+                    self._record_source(label, deduped=1)
                 continue
 
             seen_urls.add(url_key)
@@ -224,15 +223,3 @@ class NewsAggregator:
             result.append(item)
 
         return result
-
-    def _parse_date(self, date_str) -> Optional[datetime]:
-        if not date_str:
-            return None
-        try:
-            from dateutil import parser as dp
-            return dp.parse(date_str)
-        except Exception:
-            try:
-                return datetime.fromisoformat(str(date_str).replace('Z', '').replace('+00:00', ''))
-            except Exception:
-                return None
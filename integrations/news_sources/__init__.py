@@ -0,0 +1,22 @@
+"""
+News source adapters.
+
+Each module registers one NewsSource subclass; NewsAggregator runs every enabled and configured
+source for an entity concurrently. Adding a source is a new module here plus its import below.
+"""
+from integrations.news_sources.base import (
+    SOURCES, NewsItem, NewsSource, RateLimited, RateLimiter, UpstreamError, register,
+)
+from integrations.news_sources import newsapi, perplexity, rss, claude_search  # noqa: F401  (registration)
+
+
+def create_sources(transport, record=None):
+    """Instances of every enabled source whose credentials are present, in registration order."""
+    sources = []
+    for cls in SOURCES.values():
+        if not cls.enabled():
+            continue
+        source = cls(transport, record)
+        if source.configured():
+            sources.append(source)
+    return sources
@@ -0,0 +1,154 @@
+"""
+Source adapter interface, registry and the shared request limits.
+
+An adapter declares how hard its upstream may be hit — concurrent requests, requests per minute,
+and a wall-clock budget per entity — and every setting can be overridden from the environment:
+
+    NEWS_<NAME>_ENABLED=false          leave the source out
+    NEWS_<NAME>_CONCURRENCY=4          requests in flight across every entity being refreshed
+    NEWS_<NAME>_RATE_PER_MINUTE=60     token bucket; unset or 0 = unlimited
+    NEWS_<NAME>_TIMEOUT_SECONDS=30     budget for one entity, waiting for a slot included
+"""
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Optional
+
+from integrations.circuit_breaker import is_failure_status
+
+SOURCES = {}  # name → adapter class, in registration order (earlier sources win URL ties)
+
+_limits = {}
+_limits_lock = threading.Lock()
+
+
+@dataclass
+class NewsItem:
+    entity_id: int
+    headline: str
+    summary: str
+    url: str
+    source_name: str
+    source_type: str
+    published_at: Optional[datetime] = None
+    degraded: bool = False  # served from the last-good cache because the upstream's circuit is open
+
+
+class UpstreamError(Exception):
+    """Upstream returned a health failure (429 / 5xx) — counts against its circuit breaker."""
+
+
+class RateLimited(Exception):
+    """No request token became available within the adapter's budget."""
+
+
+def register(cls):
+    SOURCES[cls.name] = cls
+    return cls
+
+
+def _env(name, key, default, cast):
+    raw = os.getenv(f'NEWS_{name.upper()}_{key}')
+    return cast(raw) if raw not in (None, '') else default
+
+
+class RateLimiter:
+    """Token bucket refilling `per_minute` tokens a minute, holding at most `burst`."""
+
+    def __init__(self, per_minute, burst=None):
+        self.rate = per_minute / 60.0
+        self.burst = burst or max(1, per_minute // 2)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, timeout=None):
+        """Take one token, waiting up to `timeout` seconds. Returns False if none came in time."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+            time.sleep(wait)
+
+
+def _shared_limits(name, concurrency, rate_per_minute):
+    """One semaphore and rate limiter per source for the whole process, like the breakers."""
+    with _limits_lock:
+        if name not in _limits:
+            _limits[name] = (threading.BoundedSemaphore(concurrency),
+                             RateLimiter(rate_per_minute) if rate_per_minute else None)
+        return _limits[name]
+
+
+class NewsSource:
+    """Base adapter. Subclasses set the class attributes and implement fetch()."""
+
+    name = None            # registry key and env prefix
+    label = None           # name in source reports and logs
+    source_type = None     # NewsItem.source_type of the items it returns
+    upstream = None        # circuit breaker checked by the aggregator; None = the adapter handles its own
+    concurrency = 4
+    rate_per_minute = None
+    timeout_seconds = 30
+
+    def __init__(self, transport, record=None):
+        self.transport = transport
+        self._record = record or (lambda label, **counters: None)
+        self.concurrency = _env(self.name, 'CONCURRENCY', self.concurrency, int)
+        self.rate_per_minute = _env(self.name, 'RATE_PER_MINUTE', self.rate_per_minute, int) or None
+        self.timeout_seconds = _env(self.name, 'TIMEOUT_SECONDS', self.timeout_seconds, float)
+        self._slots, self._limiter = _shared_limits(self.name, self.concurrency, self.rate_per_minute)
+
+    @classmethod
+    def enabled(cls):
+        return _env(cls.name, 'ENABLED', 'true', str).lower() not in ('0', 'false', 'no', 'off')
+
+    def configured(self):
+        """False when the source can't run here (e.g. no API key); it is then left out."""
+        return True
+
+    def set_entities(self, names):
+        """Every entity of the refresh cycle ({entity_id: name}), for sources that batch across them."""
+
+    def fetch(self, entity_id: int, entity_name: str) -> List[NewsItem]:
+        raise NotImplementedError
+
+    def give_back(self, entity_id, items):
+        """Items a fetch returned after its caller stopped waiting (timeout). Sources that hand each
+        item out only once re-queue them for the entity's next fetch; the others find them again."""
+
+    def commit(self, entity_id):
+        """The items last handed out for the entity are stored. Sources that remember what was seen
+        (watermarks, feed state) move it forward here, not when the items are handed out."""
+
+    @contextmanager
+    def request(self):
+        """Hold one request's worth of this source's rate and concurrency limits."""
+        if self._limiter and not self._limiter.acquire(timeout=self.timeout_seconds):
+            self.record(rate_limited=1)
+            raise RateLimited(f"{self.label}: over {self.rate_per_minute} requests/minute")
+        with self._slots:
+            yield
+
+    def record(self, **counters):
+        self._record(self.label, **counters)
+
+    def check_response(self, resp):
+        """Raise on upstream-health failures; other non-200s just yield no items."""
+        if is_failure_status(resp.status_code):
+            raise UpstreamError(f"{self.label} HTTP {resp.status_code}")
+        return resp.status_code == 200
@@ -0,0 +1,98 @@
+"""Claude with the web_search tool, asked for 3-5 recent items per entity as JSON."""
+import json
+import os
+import re
+from datetime import datetime
+from typing import List, Optional
+
+from integrations.news_sources.base import NewsItem, NewsSource, register
+
+
+def _parse_date(date_str) -> Optional[datetime]:
+    if not date_str:
+        return None
+    try:
+        from dateutil import parser as dp
+        return dp.parse(date_str)
+    except Exception:
+        try:
+            return datetime.fromisoformat(str(date_str).replace('Z', '').replace('+00:00', ''))
+        except Exception:
+            return None
+
+
+@register
+class ClaudeSearchSource(NewsSource):
+    name = 'claude'
+    label = 'Claude'
+    source_type = 'claude_search'
+    upstream = 'anthropic'
+    concurrency = 3
+    rate_per_minute = 50
+    timeout_seconds = 90
+
+    def __init__(self, transport, record=None):
+        super().__init__(transport, record)
+        self.api_key = os.getenv('ANTHROPIC_API_KEY')
+
+    def configured(self):
+        return bool(self.api_key)
+
+    def fetch(self, entity_id: int, entity_name: str) -> List[NewsItem]:
+        from ai import search_cache
+        tool, search_context, used_search_cache = search_cache.prepare(entity_name)
+        prompt = f"Find the latest news, announcements, and developments from {entity_name} in 2026. Focus on healthcare AI, partnerships, product launches, funding. Return 3-5 items as JSON: [{{\"headline\": \"...\", \"summary\": \"...\", \"url\": \"...\", \"date\": \"...\"}}]"
+        if search_context:
+            prompt = f"{search_context}\n\n{prompt}"
+
+        with self.request():
+            resp = self.transport.post(
+                "https://api.anthropic.com/v1/messages",
+                json={
+                    "model": "claude-sonnet-4-20250514",
+                    "max_tokens": 1000,
+                    "tools": [tool],
+                    "messages": [{"role": "user", "content": prompt}]
+                },
+                headers={
+                    "Content-Type": "application/json",
+                    "x-api-key": self.api_key,
+                    "anthropic-version": "2023-06-01"
+                },
+                timeout=60
+            )
+
+        if not self.check_response(resp):
+            return []
+
+        data = resp.json()
+        search_cache.record(data, used_search_cache)
+        text_content = next((c['text'] for c in data.get('content', []) if c.get('type') == 'text'), '')
+
+        items = []
+        try:
+            m = re.search(r'\[[\s\S]*\]', text_content)
+            if m:
+                for item in json.loads(m.group())[:5]:
+                    items.append(NewsItem(
+                        entity_id=entity_id,
+                        headline=item.get('headline', '')[:500],
+                        summary=item.get('summary', '')[:1000],
+                        url=item.get('url', f"https://claude.ai/search/{entity_name.replace(' ', '+')}"),
+                        source_name="Claude Web Search",
+                        source_type=self.source_type,
+                        published_at=_parse_date(item.get('date'))
+                    ))
+        except Exception:
+            if text_content:
+                items.append(NewsItem(
+                    entity_id=entity_id,
+                    headline=f"{entity_name} — Latest Developments",
+                    summary=text_content[:1000],
+                    url=f"https://claude.ai/search/{entity_name.replace(' ', '+')}",
+                    source_name="Claude Web Search",
+                    source_type=self.source_type,
+                    published_at=datetime.utcnow()
+                ))
+
+        return items
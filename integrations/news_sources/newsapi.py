@@ -0,0 +1,213 @@
+"""
+NewsAPI /v2/everything, queried incrementally.
+
+Entity names are OR-ed into one query per batch (the API caps q at 500 characters) and paged
+newest first until every entity's watermark in news_watermarks is reached. Results are attributed
+back to entities locally and shared by the batch for NEWSAPI_CYCLE_SECONDS. The first fetch for an
+entity looks back NEWSAPI_LOOKBACK_DAYS. A watermark moves only once the entity's items are stored
+(commit), and not at all when paging stopped at NEWSAPI_MAX_PAGES before reaching it.
+"""
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+from integrations.entity_matcher import EntityMatcher
+from integrations.feed_stream import parse_date
+from integrations.news_sources.base import NewsItem, NewsSource, register
+
+NEWSAPI_BATCH_SIZE = int(os.getenv('NEWSAPI_BATCH_SIZE', 8))
+NEWSAPI_QUERY_MAX_CHARS = 500
+NEWSAPI_PAGE_SIZE = int(os.getenv('NEWSAPI_PAGE_SIZE', 100))
+NEWSAPI_MAX_PAGES = int(os.getenv('NEWSAPI_MAX_PAGES', 5))
+NEWSAPI_CYCLE_SECONDS = int(os.getenv('NEWSAPI_CYCLE_SECONDS', 15 * 60))
+NEWSAPI_LOOKBACK_DAYS = 7
+
+
+def _term(name):
+    return f'"{name.replace(chr(34), "")}"'
+
+
+@register
+class NewsAPISource(NewsSource):
+    name = 'newsapi'
+    label = 'NewsAPI'
+    source_type = 'newsapi'
+    upstream = 'newsapi'
+    concurrency = 4
+    rate_per_minute = 30
+    timeout_seconds = 30
+
+    def __init__(self, transport, record=None):
+        super().__init__(transport, record)
+        self.api_key = os.getenv('NEWSAPI_KEY')
+        # tuple of (entity_id, name) → {"lock", "fetched_at"}, entity_id → its batch, and
+        # entity_id → (items, watermark) waiting for the entity's next fetch, and entity_id → the
+        # watermark of items handed out but not yet stored
+        self._lock = threading.Lock()
+        self._batches = {}
+        self._batch_of = {}
+        self._pending = {}
+        self._handed = {}
+
+    def configured(self):
+        return bool(self.api_key)
+
+    def set_entities(self, names):
+        with self._lock:
+            batches = self.batches_for(names)
+            self._batch_of = {eid: batch for batch in batches for eid, _ in batch}
+            self._batches = {batch: self._batches.get(batch) or {"lock": threading.Lock(), "fetched_at": None}
+                             for batch in batches}
+
+    def fetch(self, entity_id: int, entity_name: str) -> List[NewsItem]:
+        """Articles newer than this entity's watermark, from the OR query of its batch."""
+        with self._lock:
+            batch = self._batch_of.get(entity_id) or ((entity_id, entity_name),)
+            state = self._batches.setdefault(batch, {"lock": threading.Lock(), "fetched_at": None})
+        with state["lock"]:
+            if not state["fetched_at"] or time.time() - state["fetched_at"] >= NEWSAPI_CYCLE_SECONDS:
+                self._query_batch(batch)
+                state["fetched_at"] = time.time()
+        with self._lock:
+            items, watermark = self._pending.pop(entity_id, ([], None))
+            # Only what this fetch hands out may be committed: a mark left by an earlier fetch whose
+            # items were never stored must not be saved on the back of this one
+            self._handed.pop(entity_id, None)
+            if watermark:
+                self._handed[entity_id] = watermark
+        return items
+
+    def give_back(self, entity_id, items):
+        """The items wait for the next fetch again. Their watermark is dropped rather than re-queued:
+        items given back may be incomplete (some were deduplicated against other sources), so the
+        next query starts from the saved watermark and finds anything missing again."""
+        with self._lock:
+            self._handed.pop(entity_id, None)
+            pending_items, pending_mark = self._pending.get(entity_id, ([], None))
+            if items or pending_mark:
+                self._pending[entity_id] = (list(items) + pending_items, pending_mark)
+
+    def commit(self, entity_id):
+        with self._lock:
+            watermark = self._handed.pop(entity_id, None)
+        if watermark:
+            _save_watermark(entity_id, self.name, watermark)
+
+    @staticmethod
+    def batches_for(names):
+        """Split {entity_id: name} into batches whose OR query fits NewsAPI's q limit."""
+        batches, batch, length = [], [], 0
+        for eid, name in sorted(names.items()):
+            extra = len(_term(name)) + (4 if batch else 0)  # " OR "
+            if batch and (len(batch) >= NEWSAPI_BATCH_SIZE or length + extra > NEWSAPI_QUERY_MAX_CHARS):
+                batches.append(tuple(batch))
+                batch, length, extra = [], 0, len(_term(name))
+            batch.append((eid, name))
+            length += extra
+        if batch:
+            batches.append(tuple(batch))
+        return batches
+
+    def _query_batch(self, batch):
+        """One paged OR query for the batch. Matching articles newer than each entity's watermark
+        wait in _pending with the batch's newest publish time as the entity's new watermark. If
+        paging stopped before reaching the watermark, articles between it and the oldest page fetched
+        were never seen, so the watermark stays where it was and the next query covers them again."""
+        names = dict(batch)
+        floor = datetime.utcnow() - timedelta(days=NEWSAPI_LOOKBACK_DAYS)
+        stored = _load_watermarks(list(names), self.name)
+        with self._lock:
+            marks = {eid: max(filter(None, [stored.get(eid), (self._pending.get(eid) or ([], None))[1], floor]))
+                     for eid in names}
+        since = min(marks.values())
+        matcher = EntityMatcher(names) if len(names) > 1 else None
+        query = " OR ".join(_term(name) for name in names.values())
+
+        found = {eid: [] for eid in names}
+        newest = None
+        requests_made, reached = 0, False
+        try:
+            for page in range(1, NEWSAPI_MAX_PAGES + 1):
+                with self.request():
+                    resp = self.transport.get("https://newsapi.org/v2/everything", params={
+                        "q": query,
+                        "sortBy": "publishedAt",
+                        "pageSize": NEWSAPI_PAGE_SIZE,
+                        "page": page,
+                        "language": "en",
+                        "from": since.strftime('%Y-%m-%dT%H:%M:%S'),
+                        "apiKey": self.api_key
+                    }, timeout=15)
+                requests_made += 1
+                if not self.check_response(resp):
+                    break
+                data = resp.json()
+                articles = data.get('articles') or []
+                for a in articles:
+                    published = parse_date(a.get('publishedAt'))
+                    if published and published <= since:
+                        reached = True
+                        break
+                    if published and (newest is None or published > newest):
+                        newest = published
+                    if not a.get('url') or a['url'] == '[Removed]':
+                        continue
+                    title, description = a.get('title') or '', a.get('description') or ''
+                    # NewsAPI also matches article bodies; with several names only those in the title or
+                    # description can be attributed, a single-entity query keeps everything
+                    for eid in (matcher.match(title, description) if matcher else names):
+                        if published is None or published > marks[eid]:
+                            found[eid].append(NewsItem(
+                                entity_id=eid,
+                                headline=title[:500],
+                                summary=description[:1000],
+                                url=a['url'],
+                                source_name=(a.get('source') or {}).get('name', 'NewsAPI'),
+                                source_type=self.source_type,
+                                published_at=published
+                            ))
+                if reached or len(articles) < NEWSAPI_PAGE_SIZE or page * NEWSAPI_PAGE_SIZE >= (data.get('totalResults') or 0):
+                    reached = True
+                    break
+        finally:
+            self.record(requests=requests_made, batches=1, entities_queried=len(names), truncated=int(not reached))
+        with self._lock:
+            for eid, items in found.items():
+                pending_items, pending_mark = self._pending.get(eid, ([], None))
+                mark = max(filter(None, [pending_mark, newest if reached else None]), default=None)
+                if items or mark:
+                    self._pending[eid] = (pending_items + items, mark)
+
+
+def _load_watermarks(entity_ids, source):
+    try:
+        from database import get_db
+        import models
+        with get_db() as db:
+            return dict(db.query(models.NewsWatermark.entity_id, models.NewsWatermark.last_seen_published_at).filter(
+                models.NewsWatermark.source == source,
+                models.NewsWatermark.entity_id.in_(entity_ids)
+            ).all())
+    except Exception as e:
+        print(f"  ⚠️  news_watermarks unavailable, using the {NEWSAPI_LOOKBACK_DAYS}-day window: {e}")
+        return {}
+
+
+def _save_watermark(entity_id, source, published_at):
+    try:
+        from database import get_db
+        import models
+        with get_db() as db:
+            mark = db.query(models.NewsWatermark).filter(
+                models.NewsWatermark.entity_id == entity_id,
+                models.NewsWatermark.source == source
+            ).first()
+            if not mark:
+                db.add(models.NewsWatermark(entity_id=entity_id, source=source, last_seen_published_at=published_at))
+            elif published_at > mark.last_seen_published_at:
+                mark.last_seen_published_at = published_at
+            db.commit()
+    except Exception as e:
+        print(f"  ⚠️  Could not save {source} watermark: {e}")
@@ -0,0 +1,56 @@
+"""Perplexity online model: one summary item of the last week's developments per entity."""
+import os
+from datetime import datetime
+from typing import List
+
+from integrations.news_sources.base import NewsItem, NewsSource, register
+
+
+@register
+class PerplexitySource(NewsSource):
+    name = 'perplexity'
+    label = 'Perplexity'
+    source_type = 'perplexity'
+    upstream = 'perplexity'
+    concurrency = 2
+    rate_per_minute = 50
+    timeout_seconds = 45
+
+    def __init__(self, transport, record=None):
+        super().__init__(transport, record)
+        self.api_key = os.getenv('PERPLEXITY_API_KEY')
+
+    def configured(self):
+        return bool(self.api_key)
+
+    def fetch(self, entity_id: int, entity_name: str) -> List[NewsItem]:
+        with self.request():
+            resp = self.transport.post(
+                "https://api.perplexity.ai/chat/completions",
+                json={
+                    "model": "llama-3.1-sonar-small-128k-online",
+                    "messages": [{"role": "user", "content": f"Latest news about {entity_name} in the last 7 days. Include specific announcements, partnerships, funding, product launches."}]
+                },
+                headers={"Authorization": f"Bearer {self.api_key}", "Content-Type": "application/json"},
+                timeout=30
+            )
+
+        if not self.check_response(resp):
+            return []
+
+        data = resp.json()
+        content = data.get('choices', [{}])[0].get('message', {}).get('content', '')
+        citations = data.get('citations', [])
+
+        if not content or len(content) < 50:
+            return []
+
+        return [NewsItem(
+            entity_id=entity_id,
+            headline=f"{entity_name} — Recent Developments (Perplexity)",
+            summary=content[:1500],
+            url=citations[0] if citations else f"https://perplexity.ai/search?q={entity_name.replace(' ', '+')}",
+            source_name="Perplexity AI",
+            source_type=self.source_type,
+            published_at=datetime.utcnow()
+        )]
@@ -0,0 +1,366 @@
+"""
+Curated healthcare / AI RSS feeds, shared by every entity.
+
+Each feed is fetched at most once per RSS_CYCLE_SECONDS and every entry is matched against all
+registered entities in one pass. In a full cycle (set_entities was called) requests are
+conditional on the validators in feed_state and parsing streams, stopping at entries already
+seen or too old; matches wait per entity until its next fetch. A feed's new state is saved only once
+every entity it matched has had its items stored (commit), so a crash in between re-reads them.
+"""
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import List
+
+import feedparser
+import requests
+
+from integrations.circuit_breaker import rss_breaker, is_failure_status
+from integrations.entity_matcher import EntityMatcher, get_matcher
+from integrations.feed_stream import iter_entries, FeedParseError
+from integrations.news_sources.base import NewsItem, NewsSource, register
+
+HEALTHCARE_RSS_FEEDS = [
+    ("TechCrunch AI", "https://techcrunch.com/category/artificial-intelligence/feed/"),
+    ("Fierce Healthcare", "https://www.fiercehealthcare.com/rss/xml"),
+    ("STAT News", "https://www.statnews.com/feed/"),
+    ("Modern Healthcare", "https://www.modernhealthcare.com/section/technology/rss"),
+    ("VentureBeat AI", "https://venturebeat.com/category/ai/feed/"),
+    ("Healthcare IT News", "https://www.healthcareitnews.com/rss.xml"),
+    ("Becker's Health IT", "https://www.beckershospitalreview.com/rss/health-it.rss"),
+]
+_FEED_URLS = dict(HEALTHCARE_RSS_FEEDS)
+# Parsed feed entries are reused by every entity fetched within this window
+RSS_CYCLE_SECONDS = int(os.getenv('RSS_CYCLE_SECONDS', 15 * 60))
+# Entry ids remembered per feed in feed_state, to skip entries already ingested
+FEED_SEEN_IDS_MAX = 200
+# Streaming parse stops at this many new entries, or at entries older than RSS_MAX_AGE_DAYS
+RSS_MAX_ENTRIES = int(os.getenv('RSS_MAX_ENTRIES', 50))
+RSS_MAX_AGE_DAYS = int(os.getenv('RSS_MAX_AGE_DAYS', 7))
+RSS_CHUNK_BYTES = 64 * 1024
+
+
+def _unique(items):
+    """Items in order, without repeats of an entry (same link) — a feed can be matched twice."""
+    seen = set()
+    return [item for item in items if not (item.url in seen or seen.add(item.url))]
+
+
+def _counted(chunks, tally):
+    for chunk in chunks:
+        tally[0] += len(chunk)
+        yield chunk
+
+
+@register
+class RssSource(NewsSource):
+    name = 'rss'
+    label = 'RSS'
+    source_type = 'rss'
+    upstream = None  # one breaker per feed host
+    concurrency = 6
+    timeout_seconds = 90
+
+    def __init__(self, transport, record=None):
+        super().__init__(transport, record)
+        # (fetched_at, [(feed_name, entry)]) for this cycle, and entity_id → matching items.
+        # In a full cycle matches wait in _pending until the entity is next fetched.
+        self._lock = threading.Lock()
+        self._entries = None
+        self._index = None
+        self._pending = {}
+        # feed_url → {"update", "awaiting": entity ids whose matches are not stored yet}, and
+        # entity_id → feed urls of the matches last handed to it
+        self._uncommitted = {}
+        self._handed = {}
+        self._entity_names = {}
+        self._full_cycle = False
+        self.stats = None  # conditional-GET outcome of the last feed fetch
+
+    def set_entities(self, names):
+        """Register every entity of this refresh cycle ({entity_id: name}), so each feed entry is
+        matched against all of them in a single pass. Can be called again as entities come and go."""
+        ready = {}
+        with self._lock:
+            added = {eid: name for eid, name in names.items() if eid not in self._entity_names}
+            for eid in set(self._entity_names) - set(names):
+                self._handed.pop(eid, None)
+                ready.update(self._release(eid, list(self._uncommitted)))
+            self._entity_names = dict(names)
+            self._full_cycle = True
+            self._index = None
+            self._pending = {eid: items for eid, items in self._pending.items() if eid in names}
+            if added and self._entries:
+                index = self._match_entries(self._entries[1], added)
+                self._queue_matches(index)
+                for url, eids in self._feeds_matched(index).items():
+                    if url in self._uncommitted:
+                        self._uncommitted[url]["awaiting"] |= eids
+        self._save_feed_states(ready)
+
+    def fetch(self, entity_id: int, entity_name: str) -> List[NewsItem]:
+        """Entries mentioning this entity, from feeds fetched at most once per RSS_CYCLE_SECONDS.
+
+        In a full cycle each match is handed out once: entities polled less often than the feeds
+        are fetched get everything that mentioned them since their last fetch. Matches handed to a
+        caller that had already timed out come back through give_back."""
+        ready = {}
+        with self._lock:
+            if entity_id not in self._entity_names:
+                self._entity_names[entity_id] = entity_name
+                self._index = None
+            fresh = self._entries is not None and time.time() - self._entries[0] < RSS_CYCLE_SECONDS
+            if not fresh:
+                entries, updates = self._fetch_feeds()
+                self._entries = (time.time(), entries)
+                self._index = None
+                if self._full_cycle:
+                    index = self._match_entries(entries)
+                    self._queue_matches(index)
+                    ready = self._hold(updates, index)
+            if self._full_cycle:
+                items = self._pending.pop(entity_id, [])
+                if items:
+                    self._handed.setdefault(entity_id, set()).update(_FEED_URLS.get(i.source_name) for i in items)
+            else:
+                if self._index is None:
+                    self._index = self._match_entries(self._entries[1])
+                items = list(self._index.get(entity_id, []))
+        self._save_feed_states(ready)
+        return items
+
+    def give_back(self, entity_id, items):
+        """The caller timed out or storing failed: the matches wait for the entity's next fetch
+        again, ahead of newer ones. Held feeds are not re-read, so nothing else would bring them back."""
+        with self._lock:
+            self._handed.pop(entity_id, None)  # its feeds stay uncommitted
+            if self._full_cycle and entity_id in self._entity_names:
+                self._pending[entity_id] = _unique(list(items) + self._pending.get(entity_id, []))
+
+    def commit(self, entity_id):
+        """The entity's matches are stored: save the state of every feed no other entity is waiting on."""
+        with self._lock:
+            handed = self._handed.pop(entity_id, set())
+            still_pending = self._feeds_matched({entity_id: self._pending.get(entity_id, [])})
+            ready = self._release(entity_id, handed - set(still_pending))
+        self._save_feed_states(ready)
+
+    def _hold(self, updates, index):
+        """Keep the new state of feeds that matched entities until those are committed. Returns the
+        updates that can be saved now: 304s and feeds nobody is waiting on. A feed downloaded again
+        before it was committed keeps waiting on both downloads' entities."""
+        matched = self._feeds_matched(index)
+        ready = {}
+        for url, update in updates.items():
+            held = self._uncommitted.get(url)
+            awaiting = matched.get(url, set()) | (held["awaiting"] if held else set())
+            if update["status"] == 304 or not awaiting:
+                ready[url] = update
+            else:
+                self._uncommitted[url] = {"update": update, "awaiting": awaiting}
+        return ready
+
+    def _release(self, entity_id, urls):
+        """Stop waiting on the entity for these feeds; returns the updates nobody waits on any more."""
+        ready = {}
+        for url in urls:
+            held = self._uncommitted.get(url)
+            if held:
+                held["awaiting"].discard(entity_id)
+                if not held["awaiting"]:
+                    ready[url] = self._uncommitted.pop(url)["update"]
+        return ready
+
+    @staticmethod
+    def _feeds_matched(index):
+        """{feed_url: entity ids} for an {entity_id: [NewsItem]} index."""
+        feeds = {}
+        for entity_id, items in index.items():
+            for item in items:
+                feeds.setdefault(_FEED_URLS.get(item.source_name), set()).add(entity_id)
+        return feeds
+
+    def _queue_matches(self, index):
+        for entity_id, items in index.items():
+            self._pending[entity_id] = _unique(self._pending.get(entity_id, []) + items)
+
+    def _fetch_feeds(self):
+        """Download and parse every feed once. Returns ([(feed_name, entry)], {feed_url: new state}).
+
+        In a full cycle (set_entities was called) requests are conditional on the validators in
+        feed_state: a 304 yields nothing, and entries already seen last time are skipped.
+        A feed whose new state is still held (_uncommitted) is fetched against that state, not the
+        saved one, so its held entries are neither downloaded nor matched again. The caller saves
+        the new states once the matches are stored. A one-off fetch for a single entity reads whole
+        feeds and leaves feed_state alone, since entries it marked seen would be lost to every other
+        entity."""
+        conditional = self._full_cycle
+        states = self._load_feed_states() if conditional else {}
+        if conditional:
+            for url, held in self._uncommitted.items():
+                update = held["update"]
+                states[url] = dict(states.get(url) or {}, etag=update["etag"], last_modified=update["last_modified"],
+                                   last_entry_ids=update["entry_ids"], last_body_bytes=update["body_bytes"])
+        stats = {"feeds": len(HEALTHCARE_RSS_FEEDS), "changed": 0, "unchanged": 0, "failed": 0,
+                 "bytes_downloaded": 0, "bytes_saved": 0, "entries_new": 0, "entries_skipped": 0,
+                 "stopped_early": 0}
+        updates = {}
+
+        def _one(feed):
+            """(new entries, stat increments) for one feed; updates[feed_url] gets its new state."""
+            feed_name, feed_url = feed
+            attempt = rss_breaker(feed_url).reserve()
+            if not attempt:
+                return [], {"failed": 1}
+            with attempt:  # a rate limit or parse error releases the slot without an outcome
+                return _fetch_one(feed_name, feed_url, attempt)
+
+        def _fetch_one(feed_name, feed_url, attempt):
+            state = states.get(feed_url) or {}
+            headers = {}
+            if state.get('etag'):
+                headers['If-None-Match'] = state['etag']
+            if state.get('last_modified'):
+                headers['If-Modified-Since'] = state['last_modified']
+            try:
+                try:
+                    with self.request():
+                        resp = self.transport.get(feed_url, headers=headers or None, timeout=20, stream=True)
+                except requests.RequestException as e:
+                    attempt.failure(e)
+                    return [], {"failed": 1}
+                if is_failure_status(resp.status_code):
+                    attempt.failure(f"HTTP {resp.status_code}")
+                    return [], {"failed": 1}
+                attempt.success()
+                if resp.status_code == 304:
+                    updates[feed_url] = {"status": 304}
+                    return [], {"unchanged": 1, "bytes_saved": state.get('last_body_bytes') or 0}
+                if resp.status_code != 200:
+                    return [], {"failed": 1}
+
+                seen = set(state.get('last_entry_ids') or [])
+                body_bytes = [0]
+                parse_stats = {}
+                try:
+                    fresh = list(iter_entries(_counted(resp.iter_content(RSS_CHUNK_BYTES), body_bytes),
+                                              seen_ids=seen, since=datetime.utcnow() - timedelta(days=RSS_MAX_AGE_DAYS),
+                                              limit=RSS_MAX_ENTRIES, stats=parse_stats))
+                except FeedParseError as e:
+                    print(f"  ⚠️  {feed_name}: not well-formed XML ({e}), re-reading with feedparser")
+                    fresh = self._parse_loose(feed_url, seen)
+                finally:
+                    resp.close()
+
+                ids = [entry["id"] for entry in fresh]
+                full_size = resp.headers.get('Content-Length')
+                updates[feed_url] = {
+                    "status": 200,
+                    "etag": resp.headers.get('ETag'),
+                    "last_modified": resp.headers.get('Last-Modified'),
+                    "entry_ids": list(dict.fromkeys(ids + list(state.get('last_entry_ids') or [])))[:FEED_SEEN_IDS_MAX],
+                    "body_bytes": int(full_size) if full_size and full_size.isdigit() else body_bytes[0],
+                    "changed": bool(fresh),
+                }
+                return [(feed_name, entry) for entry in fresh], {
+                    "changed": 1, "bytes_downloaded": body_bytes[0], "entries_new": len(fresh),
+                    "entries_skipped": parse_stats.get("skipped", 0),
+                    "stopped_early": int(bool(parse_stats.get("stopped_early")))}
+            except Exception:
+                return [], {"failed": 1}
+
+        entries = []
+        with ThreadPoolExecutor(max_workers=len(HEALTHCARE_RSS_FEEDS), thread_name_prefix='rss-feed') as pool:
+            for feed_entries, increments in pool.map(_one, HEALTHCARE_RSS_FEEDS):
+                entries += feed_entries
+                for key, value in increments.items():
+                    stats[key] += value
+
+        self.stats = stats
+        print(f"  📡 RSS: {stats['changed']} feeds changed, {stats['unchanged']} unchanged (304), "
+              f"{stats['failed']} failed — {stats['entries_new']} new entries, {stats['entries_skipped']} seen or too old "
+              f"({stats['stopped_early']} feeds stopped early), "
+              f"{stats['bytes_downloaded'] / 1024:.0f}KB downloaded, ~{stats['bytes_saved'] / 1024:.0f}KB saved")
+        return entries, updates if conditional else {}
+
+    def _load_feed_states(self):
+        try:
+            from database import get_db
+            import models
+            with get_db() as db:
+                return {fs.url: {"etag": fs.etag, "last_modified": fs.last_modified,
+                                 "last_entry_ids": fs.last_entry_ids, "last_body_bytes": fs.last_body_bytes}
+                        for fs in db.query(models.FeedState).all()}
+        except Exception as e:
+            print(f"  ⚠️  feed_state unavailable, fetching feeds unconditionally: {e}")
+            return {}
+
+    def _save_feed_states(self, updates):
+        if not updates:
+            return
+        try:
+            from database import get_db
+            import models
+            now = datetime.utcnow()
+            with get_db() as db:
+                existing = {fs.url: fs for fs in db.query(models.FeedState).filter(
+                    models.FeedState.url.in_(list(updates))).all()}
+                for url, update in updates.items():
+                    fs = existing.get(url)
+                    if not fs:
+                        fs = models.FeedState(url=url, fetch_count=0, not_modified_count=0)
+                        db.add(fs)
+                    fs.last_fetched_at = now
+                    fs.last_status = update["status"]
+                    fs.fetch_count = (fs.fetch_count or 0) + 1
+                    if update["status"] == 304:
+                        fs.not_modified_count = (fs.not_modified_count or 0) + 1
+                        continue
+                    fs.etag = update["etag"]
+                    fs.last_modified = update["last_modified"]
+                    fs.last_entry_ids = update["entry_ids"]
+                    fs.last_body_bytes = update["body_bytes"]
+                    if update["changed"]:
+                        fs.last_changed_at = now
+                db.commit()
+        except Exception as e:
+            print(f"  ⚠️  Could not save feed_state: {e}")
+
+    def _parse_loose(self, feed_url, seen):
+        """Fallback for feeds the strict parser rejects: whole body through feedparser, same entry shape."""
+        with self.request():
+            resp = self.transport.get(feed_url, timeout=20)
+        entries = []
+        for entry in feedparser.parse(resp.content).entries[:RSS_MAX_ENTRIES]:
+            entry_id = entry.get('id') or entry.get('link') or entry.get('title', '')
+            if entry_id in seen:
+                continue
+            published = None
+            if entry.get('published_parsed'):
+                published = datetime(*entry.published_parsed[:6])
+            entries.append({"id": entry_id, "title": entry.get('title', ''), "link": entry.get('link', ''),
+                            "summary": entry.get('summary', '') or entry.get('description', ''),
+                            "published": published})
+        return entries
+
+    def _match_entries(self, entries, names=None):
+        """{entity_id: [NewsItem]} for every registered entity (or every one of `names`) an entry mentions,
+        by name or alias."""
+        wanted = names if names is not None else self._entity_names
+        matcher = get_matcher() or EntityMatcher(wanted)
+        index = {}
+        for feed_name, entry in entries:
+            matched = matcher.match(entry["title"], entry["summary"]) & wanted.keys()
+            for entity_id in matched:
+                index.setdefault(entity_id, []).append(NewsItem(
+                    entity_id=entity_id,
+                    headline=entry["title"][:500],
+                    summary=entry["summary"][:1000],
+                    url=entry["link"],
+                    source_name=feed_name,
+                    source_type=self.source_type,
+                    published_at=entry["published"]
+                ))
+        return index
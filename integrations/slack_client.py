@@ -1,5 +1,6 @@
 """Slack Web API client"""
 import os
+from integrations.circuit_breaker import get_breaker, is_failure_status
 
 
 class SlackClient:
@@ -18,15 +19,26 @@ class SlackClient:
         if not self.client:
             print(f"[SLACK MOCK] {channel}: {text[:100]}")
             return None
-        try:
-            kwargs = {"channel": channel, "text": text}
-            if blocks:
-                kwargs["blocks"] = blocks
-            resp = self.client.chat_postMessage(**kwargs)
-            return resp.get("ts")
-        except Exception as e:
-            print(f"Slack error: {e}")
+        attempt = get_breaker('slack').reserve()
+        if not attempt:
+            print(f"[SLACK DEGRADED] circuit open, dropped {channel}: {text[:100]}")
             return None
+        with attempt:
+            try:
+                kwargs = {"channel": channel, "text": text}
+                if blocks:
+                    kwargs["blocks"] = blocks
+                resp = self.client.chat_postMessage(**kwargs)
+                attempt.success()
+                return resp.get("ts")
+            except Exception as e:
+                status = getattr(getattr(e, 'response', None), 'status_code', None)
+                if status is None or is_failure_status(status):
+                    attempt.failure(e)
+                else:
+                    attempt.success()  # channel_not_found etc. — our problem, not Slack's
+                print(f"Slack error: {e}")
+                return None
 
     def send_dm(self, user_id: str, text: str, blocks=None):
         if not self.client:
@@ -0,0 +1,255 @@
+"""
+Pluggable HTTP transport for agents and news sources.
+
+INTEL_TRANSPORT selects the backend:
+  live     — plain requests (default)
+  record   — live calls, every request/response appended to a cassette in INTEL_CASSETTE_DIR
+             (through the stand-in when INTEL_STANDIN_URL is set)
+  replay   — served from cassettes, no network; latency drawn from INTEL_REPLAY_LATENCY
+  standin  — live HTTP, but every upstream URL is rewritten to the local stand-in server at
+             INTEL_STANDIN_URL (see benchmarks/standin_server.py)
+
+Latency specs: "recorded" (default, scaled by INTEL_REPLAY_LATENCY_SCALE), "none", "fixed:0.8",
+"uniform:0.2,1.5", "lognormal:<mu>,<sigma>" (seconds, underlying normal).
+"""
+import os
+import json
+import math
+import time
+import random
+import base64
+import hashlib
+import threading
+from urllib.parse import urlparse, parse_qsl
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+# Never written to cassettes or used in match keys
+SECRET_PARAMS = {'apikey', 'api_key', 'key', 'token'}
+SECRET_HEADERS = {'x-api-key', 'authorization'}
+# requests has already decoded the body, so these would lie about the stored bytes
+HOP_HEADERS = {'content-encoding', 'transfer-encoding', 'content-length', 'connection'}
+
+
+class CassetteMiss(Exception):
+    """Replay mode found no recorded response for a request. Not an upstream failure."""
+
+
+class CassetteResponse:
+    """Minimal requests.Response stand-in built from a cassette entry."""
+
+    def __init__(self, status_code, headers, content, url):
+        self.status_code = status_code
+        self.headers = CaseInsensitiveDict(headers or {})
+        self.content = content
+        self.url = url
+
+    @property
+    def text(self):
+        return self.content.decode('utf-8', errors='replace')
+
+    def json(self):
+        return json.loads(self.text)
+
+    def iter_content(self, chunk_size=65536):
+        for i in range(0, len(self.content), chunk_size):
+            yield self.content[i:i + chunk_size]
+
+    def close(self):
+        pass
+
+
+def _clean_params(params):
+    return sorted((k, str(v)) for k, v in (params or {}).items() if k.lower() not in SECRET_PARAMS)
+
+
+def _request_key(method, url, params=None, body=None, loose=False):
+    parsed = urlparse(url)
+    base = f"{method.upper()} {parsed.netloc}{parsed.path}"
+    if loose:
+        return base
+    query = _clean_params(dict(parse_qsl(parsed.query), **(params or {})))
+    raw = json.dumps([base, query, body], sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def sample_latency(spec, rng, recorded=None):
+    """Draw one delay (seconds) from a latency spec — see module docstring."""
+    kind, _, args = (spec or 'recorded').partition(':')
+    values = [float(a) for a in args.split(',') if a]
+    if kind == 'none':
+        return 0.0
+    if kind == 'fixed':
+        return values[0]
+    if kind == 'uniform':
+        return rng.uniform(values[0], values[1])
+    if kind == 'lognormal':
+        return math.exp(rng.gauss(values[0], values[1]))
+    return recorded or 0.0
+
+
+def _cassette_name(url):
+    return (urlparse(url).netloc or 'local').replace(':', '_')
+
+
+class HttpTransport:
+    """Live transport. Subclasses hook _send to record, replay or rewrite."""
+
+    def get(self, url, params=None, headers=None, timeout=None, stream=False):
+        return self._send('GET', url, params=params, headers=headers, timeout=timeout, stream=stream)
+
+    def post(self, url, json=None, headers=None, timeout=None):
+        return self._send('POST', url, json_body=json, headers=headers, timeout=timeout)
+
+    def _send(self, method, url, params=None, json_body=None, headers=None, timeout=None, stream=False):
+        if method == 'GET':
+            return requests.get(url, params=params, headers=headers, timeout=timeout, stream=stream)
+        return requests.post(url, json=json_body, headers=headers, timeout=timeout)
+
+
+class RecordingTransport(HttpTransport):
+
+    def __init__(self, cassette_dir, inner=None):
+        self.cassette_dir = cassette_dir
+        self.inner = inner or HttpTransport()
+        os.makedirs(cassette_dir, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def _send(self, method, url, params=None, json_body=None, headers=None, timeout=None, stream=False):
+        started = time.time()
+        # Cassettes need the whole body, so streaming is resolved here
+        resp = self.inner._send(method, url, params=params, json_body=json_body, headers=headers, timeout=timeout)
+        latency = time.time() - started
+
+        entry = {
+            "key": _request_key(method, url, params, json_body),
+            "loose_key": _request_key(method, url, loose=True),
+            "request": {"method": method, "url": url, "params": _clean_params(params), "body": json_body},
+            "response": {
+                "status": resp.status_code,
+                "headers": {k: v for k, v in resp.headers.items() if k.lower() not in SECRET_HEADERS | HOP_HEADERS},
+                "body_b64": base64.b64encode(resp.content).decode('ascii'),
+            },
+            "latency": round(latency, 4),
+            "recorded_at": time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        }
+        path = os.path.join(self.cassette_dir, f"{_cassette_name(url)}.jsonl")
+        with self._lock:
+            with open(path, 'a') as f:
+                f.write(json.dumps(entry) + "\n")
+        return resp
+
+
+class ReplayTransport(HttpTransport):
+
+    def __init__(self, cassette_dir, latency_spec='recorded', latency_scale=1.0, seed=None):
+        self.cassette_dir = cassette_dir
+        self.latency_spec = latency_spec or 'recorded'
+        self.latency_scale = latency_scale
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._exact = {}
+        self._loose = {}
+        self._cursor = {}
+        self._load()
+
+    def _load(self):
+        if not os.path.isdir(self.cassette_dir):
+            raise ValueError(f"Cassette dir not found: {self.cassette_dir}")
+        for fname in sorted(os.listdir(self.cassette_dir)):
+            if not fname.endswith('.jsonl'):
+                continue
+            with open(os.path.join(self.cassette_dir, fname)) as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    entry = json.loads(line)
+                    self._exact.setdefault(entry['key'], []).append(entry)
+                    self._loose.setdefault(entry['loose_key'], []).append(entry)
+
+    def _next(self, bucket, key):
+        # Round-robin over repeated recordings of the same request
+        entries = bucket.get(key)
+        if not entries:
+            return None
+        with self._lock:
+            i = self._cursor.get(key, 0)
+            self._cursor[key] = i + 1
+        return entries[i % len(entries)]
+
+    def _sample_latency(self, recorded):
+        with self._lock:
+            delay = sample_latency(self.latency_spec, self._rng, recorded)
+        return delay * self.latency_scale
+
+    def _send(self, method, url, params=None, json_body=None, headers=None, timeout=None, stream=False):
+        # Dates and other per-run values in queries rarely match exactly; fall back to method+host+path
+        entry = (self._next(self._exact, _request_key(method, url, params, json_body))
+                 or self._next(self._loose, _request_key(method, url, loose=True)))
+        if not entry:
+            raise CassetteMiss(f"No cassette entry for {method} {url}")
+
+        delay = self._sample_latency(entry.get('latency'))
+        if timeout and delay > timeout:
+            time.sleep(timeout)
+            raise requests.Timeout(f"Replay latency {delay:.1f}s exceeded timeout {timeout}s")
+        time.sleep(delay)
+
+        r = entry['response']
+        return CassetteResponse(r['status'], r.get('headers'), base64.b64decode(r['body_b64']), url)
+
+
+class StandinTransport(HttpTransport):
+    """Rewrites https://host/path?q → {standin}/host/path?q so one local server can emulate every upstream."""
+
+    def __init__(self, standin_url):
+        self.standin_url = standin_url.rstrip('/')
+
+    def _rewrite(self, url):
+        parsed = urlparse(url)
+        rewritten = f"{self.standin_url}/{parsed.netloc}{parsed.path or '/'}"
+        return f"{rewritten}?{parsed.query}" if parsed.query else rewritten
+
+    def _send(self, method, url, params=None, json_body=None, headers=None, timeout=None, stream=False):
+        return super()._send(method, self._rewrite(url), params=params, json_body=json_body,
+                             headers=headers, timeout=timeout, stream=stream)
+
+
+_transport = None
+_transport_lock = threading.Lock()
+
+
+def build_transport(mode=None):
+    mode = (mode or os.getenv('INTEL_TRANSPORT', 'live')).lower()
+    cassette_dir = os.getenv('INTEL_CASSETTE_DIR', 'cassettes')
+    if mode == 'record':
+        # Recording through the stand-in is how synthetic cassettes are produced
+        standin = os.getenv('INTEL_STANDIN_URL')
+        return RecordingTransport(cassette_dir, StandinTransport(standin) if standin else None)
+    if mode == 'replay':
+        seed = os.getenv('INTEL_REPLAY_SEED')
+        return ReplayTransport(
+            cassette_dir,
+            latency_spec=os.getenv('INTEL_REPLAY_LATENCY', 'recorded'),
+            latency_scale=float(os.getenv('INTEL_REPLAY_LATENCY_SCALE', '1.0')),
+            seed=int(seed) if seed else None,
+        )
+    if mode == 'standin':
+        return StandinTransport(os.getenv('INTEL_STANDIN_URL', 'http://127.0.0.1:8765'))
+    return HttpTransport()
+
+
+def get_transport():
+    global _transport
+    with _transport_lock:
+        if _transport is None:
+            _transport = build_transport()
+        return _transport
+
+
+def set_transport(transport):
+    """Swap the process-wide transport (benchmarks and scripts)."""
+    global _transport
+    with _transport_lock:
+        _transport = transport
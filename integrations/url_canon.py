@@ -0,0 +1,90 @@
+"""
+Canonical form of article URLs, for deduplicating news items and signals.
+
+The same story arrives as many URLs: with utm_/fbclid tracking, as an AMP page, wrapped in a
+Google or Facebook redirect, over http and https, with or without www. or a trailing slash.
+canonical_url() folds those into one string, and url_hash() gives its fixed-width SHA-1 — the
+indexed dedup key on news_items.url_hash and signals.source_url_hash.
+"""
+import hashlib
+import re
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode, unquote
+
+HASH_LENGTH = 40
+
+TRACKING_PARAMS = re.compile(
+    r'^(utm_\w+|fbclid|gclid|gclsrc|dclid|msclkid|yclid|igshid|mc_cid|mc_eid|_ga|_gl|ref|ref_src|ref_url|'
+    r'cmpid|ocid|smid|sr_share|spm|s_kwcid|__twitter_impression|guccounter|guce_\w+|'
+    r'amp|outputtype|amp_\w+)$', re.I
+)
+# Redirect wrappers and the parameter holding the real target
+REDIRECTS = {
+    '/url': ('q', 'url'),             # google.com/url?q=…
+    '/l.php': ('u',),                 # l.facebook.com/l.php?u=…
+    '/redirect': ('url', 'q'),
+}
+REDIRECT_HOSTS = re.compile(r'^(.+\.)?(google\.[a-z.]+|facebook\.com|linkedin\.com|youtube\.com)$')
+# Google AMP viewer and AMP cache paths carrying the publisher's host: /amp/s/host/path, /c/s/host/path
+AMP_PROXY_PATH = re.compile(r'^/(?:amp|c|v)/(?:s/)?(?P<rest>[^/]+\..+)$')
+AMP_PATH_SUFFIX = re.compile(r'(/amp/?|\.amp)$', re.I)
+MAX_UNWRAP = 3
+
+
+def _unwrap(parts):
+    """The URL a redirect or AMP-proxy link points at, or None if it isn't one."""
+    host = (parts.hostname or '').lower()
+    if REDIRECT_HOSTS.match(host):
+        for path, keys in REDIRECTS.items():
+            if parts.path == path or parts.path.endswith(path):
+                query = dict(parse_qsl(parts.query))
+                for key in keys:
+                    if (query.get(key) or '').startswith(('http://', 'https://')):
+                        return query[key]
+    if host.endswith('.cdn.ampproject.org') or (host.startswith(('google.', 'www.google.')) and parts.path.startswith('/amp/')):
+        m = AMP_PROXY_PATH.match(parts.path)
+        if m:
+            query = f"?{parts.query}" if parts.query else ''
+            return f"https://{unquote(m.group('rest'))}{query}"
+    return None
+
+
+def canonical_url(url):
+    """Canonical form of url, or None when there is nothing to canonicalize."""
+    if not url:
+        return None
+    url = url.strip()
+    parts = urlsplit(url)
+    for _ in range(MAX_UNWRAP):
+        target = _unwrap(parts)
+        if not target:
+            break
+        parts = urlsplit(target.strip())
+
+    scheme = (parts.scheme or 'https').lower()
+    if scheme == 'http':
+        scheme = 'https'
+    host = (parts.hostname or '').lower().rstrip('.')
+    if host.startswith('www.'):
+        host = host[4:]
+    if host.startswith('amp.'):
+        host = host[4:]
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+
+    path = re.sub(r'/{2,}', '/', parts.path)
+    path = AMP_PATH_SUFFIX.sub('', path) if path not in ('/amp', '/amp/') else path
+    if path.endswith('.amp.html'):
+        path = path[:-len('.amp.html')] + '.html'
+    path = path.rstrip('/')
+
+    query = urlencode(sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                             if not TRACKING_PARAMS.match(k)))
+    return urlunsplit((scheme, host, path, query, ''))
+
+
+def url_hash(url):
+    """SHA-1 hex of the canonical URL — HASH_LENGTH characters, or None for an empty URL."""
+    canonical = canonical_url(url)
+    if not canonical:
+        return None
+    return hashlib.sha1(canonical.encode('utf-8')).hexdigest()
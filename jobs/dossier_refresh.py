@@ -0,0 +1,262 @@
+"""Nightly: refresh the stalest, highest-stakes dossiers within a token and time budget"""
+import math
+import os
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from datetime import datetime, timedelta
+
+TOKEN_BUDGET = int(os.getenv('DOSSIER_REFRESH_TOKEN_BUDGET', 2000000))
+TIME_BUDGET_MINUTES = int(os.getenv('DOSSIER_REFRESH_TIME_BUDGET_MINUTES', 90))
+MAX_REFRESHES = int(os.getenv('DOSSIER_REFRESH_MAX', 10))
+CONCURRENCY = int(os.getenv('DOSSIER_REFRESH_CONCURRENCY', 2))
+# Anything enriched more recently than this is never picked, however high it ranks
+MIN_AGE_HOURS = int(os.getenv('DOSSIER_REFRESH_MIN_AGE_HOURS', 24))
+# How often a refresh checks on the generation task it queued
+WAIT_POLL_SECONDS = 5
+
+# Used until enough dossiers have recorded their own usage in generation_meta
+DEFAULT_TOKENS_PER_DOSSIER = 120000
+DEFAULT_SECONDS_PER_DOSSIER = 300
+
+THREAT_WEIGHT = {'critical': 8, 'high': 5, 'medium': 3, 'low': 1, 'monitor': 0.5}
+VELOCITY_WINDOW_DAYS = 30
+
+
+def run_dossier_refresh():
+    """Scheduler entry point — the refresh itself runs on the task queue so a redeploy doesn't lose it."""
+    print(f"🌙 Dossier refresh: {datetime.utcnow().isoformat()}")
+    try:
+        from jobs.task_queue import enqueue
+        task_id, created = enqueue('dossier.bulk_refresh', dedupe_key='dossier.bulk_refresh')
+        print(f"  → {'Queued' if created else 'Already queued as'} task {task_id}")
+    except Exception as e:
+        print(f"❌ Dossier refresh error: {e}")
+
+
+def rank_entities(now=None):
+    """Active entities by refresh priority, highest first, with the score broken down.
+
+    score = threat weight × (1 + staleness) + 3 × deal exposure + 4 × signal velocity
+      staleness       weeks since the last completed dossier, capped at 4 (never generated = 4)
+      deal exposure   open deals the entity competes in + log(1 + open value / $100k)
+      signal velocity signals per day since last enrichment, capped at 5
+    """
+    from sqlalchemy import func
+    from database import get_db
+    import models
+
+    now = now or datetime.utcnow()
+    with get_db() as db:
+        entities = db.query(models.Entity.id, models.Entity.name, models.Entity.threat_level,
+                            models.Entity.last_enriched_at).filter(models.Entity.status == 'active').all()
+
+        last_generated = dict(db.query(models.Dossier.entity_id, func.max(models.Dossier.generated_at)).filter(
+            models.Dossier.generation_status == 'completed'
+        ).group_by(models.Dossier.entity_id).all())
+
+        busy = {eid for (eid,) in db.query(models.Dossier.entity_id).filter(
+            models.Dossier.generation_status.in_(['pending', 'in_progress'])
+        ).distinct().all()}
+
+        deal_rows = db.query(
+            models.DealCompetitor.entity_id,
+            func.count(func.distinct(models.Deal.id)),
+            func.coalesce(func.sum(models.Deal.value_usd), 0)
+        ).join(models.Deal, models.Deal.id == models.DealCompetitor.deal_id).filter(
+            models.Deal.stage.notin_(['closed_won', 'closed_lost'])
+        ).group_by(models.DealCompetitor.entity_id).all()
+        deals = {eid: (count, value) for eid, count, value in deal_rows}
+
+        window_start = now - timedelta(days=VELOCITY_WINDOW_DAYS)
+        recent_signals = db.query(models.Signal.entity_id, models.Signal.created_at).filter(
+            models.Signal.created_at >= window_start
+        ).all()
+
+    signals_by_entity = {}
+    for eid, created_at in recent_signals:
+        signals_by_entity.setdefault(eid, []).append(created_at)
+
+    ranked = []
+    for eid, name, threat_level, last_enriched_at in entities:
+        generated_at = last_generated.get(eid)
+        enriched_at = last_enriched_at or generated_at
+        age_days = (now - generated_at).total_seconds() / 86400 if generated_at else None
+        staleness = min(age_days / 7, 4.0) if age_days is not None else 4.0
+
+        open_deals, open_value = deals.get(eid, (0, 0))
+        deal_exposure = open_deals + math.log1p((open_value or 0) / 100000)
+
+        since = max(enriched_at, window_start) if enriched_at else window_start
+        new_signals = sum(1 for ts in signals_by_entity.get(eid, []) if ts and ts > since)
+        velocity = min(new_signals / max(1.0, (now - since).total_seconds() / 86400), 5.0)
+
+        threat = THREAT_WEIGHT.get(threat_level or 'monitor', 0.5)
+        score = threat * (1 + staleness) + 3 * deal_exposure + 4 * velocity
+
+        skip = None
+        if eid in busy:
+            skip = 'generation in progress'
+        elif enriched_at and now - enriched_at < timedelta(hours=MIN_AGE_HOURS):
+            skip = f'enriched within {MIN_AGE_HOURS}h'
+
+        ranked.append({
+            "entity_id": eid,
+            "name": name,
+            "score": round(score, 2),
+            "threat_level": threat_level,
+            "dossier_age_days": round(age_days, 1) if age_days is not None else None,
+            "open_deals": open_deals,
+            "open_deal_value": open_value or 0,
+            "signals_since_enriched": new_signals,
+            "signal_velocity": round(velocity, 2),
+            "skip": skip,
+        })
+
+    ranked.sort(key=lambda r: r["score"], reverse=True)
+    return ranked
+
+
+def estimate_cost():
+    """(tokens, seconds) per refresh — medians over recent dossiers that recorded usage,
+    preferring incremental runs since that is what the nightly refresh does."""
+    from database import get_db
+    import models
+
+    with get_db() as db:
+        metas = [m for (m,) in db.query(models.Dossier.generation_meta).filter(
+            models.Dossier.generation_status == 'completed',
+            models.Dossier.generation_meta.isnot(None)
+        ).order_by(models.Dossier.generated_at.desc()).limit(50).all() if m]
+
+    samples = [m for m in metas if (m.get('usage') or {}).get('total_tokens')]
+    incremental = [m for m in samples if m.get('mode') == 'incremental']
+    if len(incremental) >= 3:
+        samples = incremental
+    if len(samples) < 3:
+        return DEFAULT_TOKENS_PER_DOSSIER, DEFAULT_SECONDS_PER_DOSSIER
+
+    tokens = statistics.median(m['usage']['total_tokens'] for m in samples)
+    seconds = statistics.median(m.get('wall_clock_seconds') or DEFAULT_SECONDS_PER_DOSSIER for m in samples)
+    return int(tokens), float(seconds)
+
+
+def _refresh_one(entity_id, deadline):
+    """Create the next dossier version and queue its incremental generation under the entity's
+    dossier:{entity_id} key, so it never runs alongside a user-triggered one; then wait for it
+    (until deadline) to account its tokens. Returns a result row."""
+    from database import get_db
+    import models
+    from jobs.task_queue import enqueue, ACTIVE_STATUSES
+
+    with get_db() as db:
+        latest = db.query(models.Dossier).filter(
+            models.Dossier.entity_id == entity_id
+        ).order_by(models.Dossier.version.desc()).first()
+        dossier = models.Dossier(
+            entity_id=entity_id,
+            version=(latest.version + 1) if latest else 1,
+            generation_status='pending',
+            prompt_version='v1.0',
+        )
+        db.add(dossier)
+        db.commit()
+        dossier_id = dossier.id
+
+    started = time.time()
+    task_id, created = enqueue('dossier.generate',
+                               {"dossier_id": dossier_id, "entity_id": entity_id, "mode": 'incremental'},
+                               dedupe_key=f"dossier:{entity_id}")
+    if not created:
+        with get_db() as db:
+            db.query(models.Dossier).filter(models.Dossier.id == dossier_id).delete()
+            db.commit()
+        return {"entity_id": entity_id, "status": "skipped", "reason": "generation already queued",
+                "task_id": task_id, "tokens": 0}
+
+    while True:
+        with get_db() as db:
+            task_status = db.query(models.Task.status).filter(models.Task.id == task_id).scalar()
+            status, meta = db.query(models.Dossier.generation_status, models.Dossier.generation_meta).filter(
+                models.Dossier.id == dossier_id).first()
+        if task_status not in ACTIVE_STATUSES or time.time() >= deadline:
+            break
+        time.sleep(WAIT_POLL_SECONDS)
+
+    return {
+        "entity_id": entity_id,
+        "dossier_id": dossier_id,
+        "task_id": task_id,
+        "status": status if task_status not in ACTIVE_STATUSES else 'queued',
+        "tokens": ((meta or {}).get('usage') or {}).get('total_tokens') or 0,
+        "seconds": round(time.time() - started, 1),
+    }
+
+
+def refresh_stale_dossiers(token_budget=None, time_budget_minutes=None, max_refreshes=None, concurrency=None):
+    """Refresh the top-ranked entities until the count, token or time budget runs out.
+
+    A refresh only starts if the tokens already spent, the estimates for refreshes still
+    running and its own estimate all fit in the token budget, and its estimated duration
+    fits in the time left."""
+    token_budget = token_budget or TOKEN_BUDGET
+    time_budget = (time_budget_minutes or TIME_BUDGET_MINUTES) * 60
+    max_refreshes = max_refreshes or MAX_REFRESHES
+    concurrency = concurrency or CONCURRENCY
+
+    started = time.time()
+    candidates = [r for r in rank_entities() if not r["skip"]][:max_refreshes]
+    est_tokens, est_seconds = estimate_cost()
+    print(f"  → {len(candidates)} candidates, ~{est_tokens} tokens / ~{est_seconds:.0f}s each, "
+          f"budget {token_budget} tokens / {time_budget / 60:.0f} min")
+
+    spent = 0
+    results = []
+    stop_reason = None
+    in_flight = {}
+    queue = list(candidates)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        while queue or in_flight:
+            while queue and len(in_flight) < concurrency and not stop_reason:
+                if spent + est_tokens * (len(in_flight) + 1) > token_budget:
+                    stop_reason = 'token_budget'
+                elif time.time() - started + est_seconds > time_budget:
+                    stop_reason = 'time_budget'
+                else:
+                    candidate = queue.pop(0)
+                    in_flight[pool.submit(_refresh_one, candidate["entity_id"], started + time_budget)] = candidate
+            if stop_reason:
+                queue = []
+            if not in_flight:
+                break
+
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                candidate = in_flight.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    result = {"entity_id": candidate["entity_id"], "status": "failed", "error": str(e), "tokens": 0}
+                result.update(name=candidate["name"], score=candidate["score"])
+                spent += result.get("tokens") or 0
+                results.append(result)
+                print(f"  → {candidate['name']}: {result['status']} ({result.get('tokens', 0)} tokens)")
+
+    summary = {
+        "refreshed": sum(1 for r in results if r["status"] == 'completed'),
+        "failed": sum(1 for r in results if r["status"] == 'failed'),
+        "skipped": sum(1 for r in results if r["status"] == 'skipped'),
+        "still_queued": sum(1 for r in results if r["status"] == 'queued'),
+        "not_started": len(candidates) - len(results),
+        "stop_reason": stop_reason,
+        "tokens_spent": spent,
+        "token_budget": token_budget,
+        "elapsed_seconds": round(time.time() - started, 1),
+        "time_budget_seconds": time_budget,
+        "estimate": {"tokens": est_tokens, "seconds": est_seconds},
+        "results": results,
+    }
+    print(f"✅ Dossier refresh: {summary['refreshed']} refreshed, {spent} tokens, "
+          f"{summary['elapsed_seconds']:.0f}s{f', stopped on {stop_reason}' if stop_reason else ''}")
+    return summary
@@ -0,0 +1,74 @@
+"""Every 5 min: reap dossiers stuck in pending/in_progress and resume them from their checkpoints"""
+import os
+from datetime import datetime, timedelta
+
+# A single section call can take up to 180s; no checkpoint for this long means the worker is gone
+STALE_MINUTES = int(os.getenv('DOSSIER_STALE_MINUTES', 20))
+MAX_ATTEMPTS = int(os.getenv('DOSSIER_MAX_ATTEMPTS', 3))
+
+
+def run_dossier_watchdog():
+    print(f"🐕 Dossier watchdog: {datetime.utcnow().isoformat()}")
+    try:
+        from sqlalchemy import func
+        from database import get_db
+        import models
+
+        now = datetime.utcnow()
+        cutoff = now - timedelta(minutes=STALE_MINUTES)
+        to_resume = []
+        failed = 0
+
+        with get_db() as db:
+            stuck = db.query(models.Dossier).filter(
+                models.Dossier.generation_status.in_(['pending', 'in_progress']),
+                func.coalesce(models.Dossier.last_progress_at, models.Dossier.created_at) < cutoff
+            ).all()
+
+            for d in stuck:
+                meta = dict(d.generation_meta or {})
+                if meta.get('attempts', 0) >= MAX_ATTEMPTS:
+                    meta['reaped_at'] = now.isoformat()
+                    d.generation_meta = meta
+                    d.generation_status = 'failed'
+                    failed += 1
+                    continue
+
+                # Compare-and-set on the heartbeat so two watchdogs never resume the same row
+                heartbeat = models.Dossier.last_progress_at
+                claimed = db.query(models.Dossier).filter(
+                    models.Dossier.id == d.id,
+                    heartbeat == d.last_progress_at if d.last_progress_at else heartbeat.is_(None)
+                ).update({heartbeat: now}, synchronize_session=False)
+                if claimed:
+                    to_resume.append((d.id, d.entity_id))
+            db.commit()
+
+        for dossier_id, entity_id in to_resume:
+            resume_dossier(dossier_id, entity_id)
+
+        print(f"  → {len(to_resume)} resumed, {failed} marked failed after {MAX_ATTEMPTS} attempts")
+    except Exception as e:
+        print(f"❌ Dossier watchdog error: {e}")
+
+
+def is_stale(dossier, now=None):
+    """A pending/in_progress dossier with no checkpoint for STALE_MINUTES: its worker is gone."""
+    last = dossier.last_progress_at or dossier.created_at
+    return (dossier.generation_status in ('pending', 'in_progress') and last is not None
+            and last < (now or datetime.utcnow()) - timedelta(minutes=STALE_MINUTES))
+
+
+def resume_dossier(dossier_id, entity_id):
+    """Queue generation to continue in the mode it was started with; completed sections are read
+    back from the row. Returns (task_id, created) — created is False if the entity already has a
+    dossier task queued."""
+    from database import get_db
+    import models
+    from jobs.task_queue import enqueue
+
+    with get_db() as db:
+        meta = db.query(models.Dossier.generation_meta).filter(models.Dossier.id == dossier_id).scalar()
+    return enqueue('dossier.generate',
+                   {"dossier_id": dossier_id, "entity_id": entity_id, "mode": (meta or {}).get('mode', 'full')},
+                   dedupe_key=f"dossier:{entity_id}")
@@ -0,0 +1,337 @@
+"""
+Streaming ingest: fetch → normalize → dedupe + persist → score, each stage on its own threads,
+linked by bounded queues.
+
+A full queue blocks the stage feeding it, so a slow scorer holds back persistence, then fetching,
+then submit() — the dispatcher stops handing out entities instead of items piling up in memory.
+Persistence stores whatever entity batches are waiting in one transaction. New items are scored in
+micro-batches: SCORE_BATCH_SIZE items, or whatever has accumulated SCORE_MAX_WAIT_SECONDS after
+the first one arrived. Obvious noise is scored locally by the relevance pre-filter
+(ai/relevance_filter.py) before it reaches the scorer. A story is a scored signal minutes after it
+is fetched instead of at the next signal sweep, which now only picks up what scoring here missed.
+"""
+import os
+import queue
+import threading
+import time
+
+from ai import relevance_filter
+from ai.signal_agent import MAX_ITEMS_PER_CALL
+from jobs.news_refresh import ENTITY_CONCURRENCY, normalize_items, store_rows
+
+# Entity batches waiting between fetch, normalize and persist
+QUEUE_SIZE = int(os.getenv('INGEST_QUEUE_SIZE', 16))
+# New item ids waiting to be scored
+SCORE_QUEUE_SIZE = int(os.getenv('INGEST_SCORE_QUEUE_SIZE', 200))
+# Rows stored per transaction, at most (a single entity batch is never split)
+PERSIST_BATCH_ROWS = int(os.getenv('INGEST_PERSIST_BATCH_ROWS', 200))
+SCORE_BATCH_SIZE = MAX_ITEMS_PER_CALL  # one scoring call per micro-batch
+SCORE_MAX_WAIT_SECONDS = float(os.getenv('INGEST_SCORE_MAX_WAIT_SECONDS', 30))
+
+_STOP = object()   # worker exits
+_FLUSH = object()  # scorer scores its partial batch now (drain)
+
+
+class Stage:
+    """A stage's inbox and throughput counters.
+
+      in / out      taken from the inbox / handed on (entities → items for fetch, items → new
+                    items for persist, items → promoted signals for score)
+      busy          share of worker time spent working rather than waiting for input
+      blocked_s     seconds spent waiting on the next stage's full inbox (backpressure)
+    """
+
+    def __init__(self, name, maxsize, workers=1):
+        self.name = name
+        self.inbox = queue.Queue(maxsize=maxsize)
+        self.workers = workers
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._since = time.time()
+            self._counts = {"in": 0, "out": 0, "busy": 0.0, "blocked": 0.0, "max_queue": self.inbox.qsize()}
+
+    def count(self, items_in=0, items_out=0, busy=0.0, blocked=0.0):
+        with self._lock:
+            self._counts["in"] += items_in
+            self._counts["out"] += items_out
+            self._counts["busy"] += busy
+            self._counts["blocked"] += blocked
+            self._counts["max_queue"] = max(self._counts["max_queue"], self.inbox.qsize())
+
+    def hand_off(self, next_stage, job):
+        """Put a job in the next stage's inbox, waiting while it is full."""
+        t0 = time.time()
+        next_stage.inbox.put(job)
+        self.count(blocked=time.time() - t0)
+
+    def report(self, reset=False):
+        with self._lock:
+            elapsed = max(time.time() - self._since, 1e-6)
+            c = self._counts
+            entry = {
+                "in": c["in"], "out": c["out"],
+                "per_second": round(c["in"] / elapsed, 2),
+                "busy": round(min(1.0, c["busy"] / (elapsed * self.workers)), 3),
+                "blocked_s": round(c["blocked"], 1),
+                "queue": self.inbox.qsize(), "max_queue": c["max_queue"],
+            }
+        if reset:
+            self.reset()
+        return entry
+
+
+class IngestPipeline:
+    """submit() an entity to refresh; on_done(entity_id, new_items) is called once its items are
+    stored, before they are scored. The dispatcher keeps one running; run_news_refresh starts one
+    per pass and stop()s it."""
+
+    def __init__(self, aggregator=None, score=True):
+        from integrations.news_aggregator import NewsAggregator
+        self.aggregator = aggregator or NewsAggregator()
+        self.score = score
+        self.fetch = Stage('fetch', QUEUE_SIZE, workers=ENTITY_CONCURRENCY)
+        self.normalize = Stage('normalize', QUEUE_SIZE)
+        self.persist = Stage('persist', QUEUE_SIZE)
+        self.scorer = Stage('score', SCORE_QUEUE_SIZE)
+        self.stages = [self.fetch, self.normalize, self.persist, self.scorer]
+        self._threads = []
+        self._start_lock = threading.Lock()
+        self._results = {"scored": 0, "promoted": 0, "score_batches": 0}
+
+    def start(self):
+        with self._start_lock:
+            if self._threads:
+                return self
+            for stage, work in ((self.fetch, self._fetch_worker), (self.normalize, self._normalize_worker),
+                                (self.persist, self._persist_worker), (self.scorer, self._score_worker)):
+                for n in range(stage.workers):
+                    t = threading.Thread(target=work, name=f'ingest-{stage.name}-{n}', daemon=True)
+                    t.start()
+                    self._threads.append(t)
+        return self
+
+    def submit(self, entity, on_done=None):
+        """Queue (entity_id, name, entity_type, use_cases) for a refresh. Blocks while fetch is backed up."""
+        self.start()
+        self.fetch.inbox.put((entity, on_done))
+
+    def drain(self):
+        """Wait until everything submitted so far is stored and scored."""
+        for stage in self.stages[:-1]:
+            stage.inbox.join()
+        self.scorer.inbox.put(_FLUSH)
+        self.scorer.inbox.join()
+
+    def stop(self):
+        """Drain, then end the worker threads."""
+        self.drain()
+        for stage in self.stages:
+            for _ in range(stage.workers):
+                stage.inbox.put(_STOP)
+        for t in self._threads:
+            t.join()
+        self._threads = []
+
+    def report(self, reset=False):
+        """{stage name: counters} plus the scoring outcome under "signals"."""
+        report = {stage.name: stage.report(reset) for stage in self.stages}
+        with self._start_lock:
+            report["signals"] = dict(self._results)
+            if reset:
+                self._results = dict.fromkeys(self._results, 0)
+        return report
+
+    def print_report(self, reset=False):
+        report = self.report(reset)
+        for stage in self.stages:
+            s = report[stage.name]
+            print(f"  🚰 {stage.name}: {s['in']} in, {s['out']} out, {s['per_second']}/s, busy {s['busy']:.0%}, "
+                  f"blocked {s['blocked_s']}s, queue {s['queue']} (max {s['max_queue']})")
+        signals = report["signals"]
+        if signals["score_batches"]:
+            print(f"  🚰 scored {signals['scored']} items in {signals['score_batches']} batches, "
+                  f"{signals['promoted']} promoted to signals")
+        prefilter = relevance_filter.stats(reset)
+        if prefilter["local"]:
+            agreement = f"{prefilter['agreement_rate']:.0%}" if prefilter['agreement_rate'] is not None else "-"
+            print(f"  🧮 pre-filter: {prefilter['local']} noise items scored locally (~{prefilter['calls_avoided']} "
+                  f"model calls avoided), audit agreement {agreement} over {prefilter['audited']} items")
+        report["prefilter"] = prefilter
+        return report
+
+    # ── stages ──
+
+    def _fetch_worker(self):
+        stage = self.fetch
+        while True:
+            job = stage.inbox.get()
+            if job is _STOP:
+                stage.inbox.task_done()
+                return
+            entity, on_done = job
+            try:
+                eid, name, etype, use_cases = entity
+                t0 = time.time()
+                try:
+                    items = self.aggregator.fetch_all(eid, name, etype or 'competitor', use_cases or [])
+                except Exception as e:
+                    # Whatever the sources handed out is lost: nothing to store, nothing to commit
+                    print(f"  ⚠️  {name}: fetch failed: {e}")
+                    stage.count(items_in=1, busy=time.time() - t0)
+                    self.aggregator.give_back(eid, [])
+                    self._notify([(entity, on_done, [], [])], {})
+                    continue
+                stage.count(items_in=1, items_out=len(items), busy=time.time() - t0)
+                stage.hand_off(self.normalize, (entity, on_done, items))
+            except Exception as e:
+                print(f"  ⚠️  Fetch stage failed for {entity!r}: {e}")
+                self._notify([(entity, on_done, [], [])], {})
+            finally:
+                stage.inbox.task_done()
+
+    def _normalize_worker(self):
+        stage = self.normalize
+        while True:
+            job = stage.inbox.get()
+            if job is _STOP:
+                stage.inbox.task_done()
+                return
+            entity, on_done, items = job
+            try:
+                t0 = time.time()
+                try:
+                    rows = normalize_items(entity[0], items)
+                except Exception as e:
+                    print(f"  ⚠️  {entity[1]}: normalize failed: {e}")
+                    rows = []  # items without rows: nothing is stored, and the sources are not committed
+                stage.count(items_in=len(items), items_out=len(rows), busy=time.time() - t0)
+                stage.hand_off(self.persist, (entity, on_done, items, rows))
+            except Exception as e:
+                print(f"  ⚠️  Normalize stage failed for {entity!r}: {e}")
+                self._notify([(entity, on_done, items, [])], {})
+            finally:
+                stage.inbox.task_done()
+
+    def _persist_worker(self):
+        stage = self.persist
+        while True:
+            job = stage.inbox.get()
+            if job is _STOP:
+                stage.inbox.task_done()
+                return
+            # Take whatever else is already waiting into the same transaction
+            jobs, stop = [job], False
+            while sum(len(j[3]) for j in jobs) < PERSIST_BATCH_ROWS:
+                try:
+                    job = stage.inbox.get_nowait()
+                except queue.Empty:
+                    break
+                if job is _STOP:
+                    stop = True
+                    break
+                jobs.append(job)
+
+            counts = {}  # job index → new items stored
+            try:
+                t0 = time.time()
+                rows = [row for j in jobs for row in j[3]]
+                try:
+                    stored = store_rows(rows)
+                except Exception as e:
+                    print(f"  ⚠️  Storing {len(rows)} news items failed: {e}")
+                    stored = [('error', None)] * len(rows)
+                new = [dict(row, id=nid) for row, (outcome, nid) in zip(rows, stored) if outcome == 'new']
+                stage.count(items_in=len(rows), items_out=len(new), busy=time.time() - t0)
+
+                offset = 0
+                for n, ((eid, name, _, _), _, items, entity_rows) in enumerate(jobs):
+                    outcomes = [outcome for outcome, _ in stored[offset:offset + len(entity_rows)]]
+                    offset += len(entity_rows)
+                    counts[n] = outcomes.count('new')
+                    self.aggregator.record_outcomes(items, outcomes)
+                    if len(entity_rows) == len(items) and 'error' not in outcomes:
+                        self.aggregator.commit(eid)  # stored: sources may now move their watermarks
+                    else:
+                        self.aggregator.give_back(eid, items)  # not stored: fetched again next time
+                    duplicates = outcomes.count('duplicate')
+                    if duplicates:
+                        print(f"  ↳ {name}: {duplicates} near-duplicates linked to existing items")
+                self._notify(jobs, counts)
+
+                if self.score and new:
+                    try:
+                        new = relevance_filter.prefilter(new)
+                    except Exception as e:
+                        print(f"  ⚠️  Relevance pre-filter failed, sending everything to the model: {e}")
+                    for item in new:
+                        stage.hand_off(self.scorer, item['id'])
+            except Exception as e:
+                print(f"  ⚠️  Persist stage failed for {len(jobs)} entities: {e}")
+            finally:
+                self._notify(jobs, counts)
+                for _ in range(len(jobs) + int(stop)):
+                    stage.inbox.task_done()
+            if stop:
+                return
+
+    def _score_worker(self):
+        from jobs.signal_sweep import score_and_promote
+
+        stage = self.scorer
+        while True:
+            nid = stage.inbox.get()
+            if nid is _STOP:
+                stage.inbox.task_done()
+                return
+            batch, taken, stop = [], 1, False
+            if nid is not _FLUSH:
+                batch.append(nid)
+                deadline = time.time() + SCORE_MAX_WAIT_SECONDS
+                while len(batch) < SCORE_BATCH_SIZE:
+                    try:
+                        nid = stage.inbox.get(timeout=max(0.0, deadline - time.time()))
+                    except queue.Empty:
+                        break
+                    taken += 1
+                    if nid is _STOP:
+                        stop = True
+                    if nid is _STOP or nid is _FLUSH:
+                        break
+                    batch.append(nid)
+
+            try:
+                if batch:
+                    t0 = time.time()
+                    try:
+                        result = score_and_promote(batch)
+                    except Exception as e:
+                        print(f"  ⚠️  Scoring {len(batch)} news items failed: {e}")
+                        result = {"scored": 0, "promoted": 0}
+                    stage.count(items_in=len(batch), items_out=result["promoted"], busy=time.time() - t0)
+                    with self._start_lock:
+                        self._results["scored"] += result["scored"]
+                        self._results["promoted"] += result["promoted"]
+                        self._results["score_batches"] += 1
+            except Exception as e:
+                print(f"  ⚠️  Score stage failed for {len(batch)} news items: {e}")
+            finally:
+                for _ in range(taken):
+                    stage.inbox.task_done()
+            if stop:
+                return
+
+    @staticmethod
+    def _notify(jobs, counts):
+        """Call each job's on_done once, with its new item count (0 if it never got stored).
+        A worker calls this on every exit path, so the dispatcher always hears back."""
+        for n, (entity, on_done, items, rows) in enumerate(jobs):
+            if on_done:
+                jobs[n] = (entity, None, items, rows)
+                try:
+                    on_done(entity[0], counts.get(n, 0))
+                except Exception as e:
+                    print(f"  ⚠️  {entity[1]}: completion callback failed: {e}")
+
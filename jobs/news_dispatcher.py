@@ -0,0 +1,229 @@
+"""Every minute: poll news for the entities that are due, each on its own adaptive cadence, through
+the streaming ingest pipeline (jobs/ingest_pipeline.py)"""
+import heapq
+import os
+import random
+import threading
+from datetime import datetime, timedelta
+
+# Base interval per threat level, before yield and deal exposure adjust it
+THREAT_BASE_MINUTES = {'critical': 30, 'high': 60, 'medium': 120, 'low': 240, 'monitor': 480}
+MIN_INTERVAL_MINUTES = int(os.getenv('NEWS_POLL_MIN_MINUTES', 20))
+MAX_INTERVAL_MINUTES = int(os.getenv('NEWS_POLL_MAX_MINUTES', 720))
+# Each next poll lands uniformly within ±JITTER of the interval, so entities drift apart
+JITTER = float(os.getenv('NEWS_POLL_JITTER', 0.2))
+# New items per poll at which yield neither speeds up nor slows the cadence
+YIELD_PIVOT = 2.0
+# Weight of the latest poll in the moving average of new items per poll
+YIELD_ALPHA = 0.3
+TICK_SECONDS = int(os.getenv('NEWS_DISPATCH_TICK_SECONDS', 60))
+# Entities, threat levels and open deals are reloaded this often
+RESYNC_MINUTES = 10
+
+_dispatcher = None
+_dispatcher_lock = threading.Lock()
+
+
+def cadence_minutes(threat_level, yield_avg, open_deals):
+    """Minutes until the next poll, before jitter.
+
+    interval = threat base × yield factor × deal factor, clamped to [MIN, MAX]
+      yield factor  2 / (1 + new items per poll / YIELD_PIVOT), within [0.5, 2]
+      deal factor   1 / (1 + 0.5 × open deals the entity competes in), at least 1/3
+    """
+    base = THREAT_BASE_MINUTES.get(threat_level or 'monitor', THREAT_BASE_MINUTES['monitor'])
+    yield_factor = min(2.0, max(0.5, 2.0 / (1 + (yield_avg or 0) / YIELD_PIVOT)))
+    deal_factor = max(1 / 3, 1 / (1 + 0.5 * (open_deals or 0)))
+    return min(MAX_INTERVAL_MINUTES, max(MIN_INTERVAL_MINUTES, base * yield_factor * deal_factor))
+
+
+def jittered(minutes, rng=random):
+    return minutes * rng.uniform(1 - JITTER, 1 + JITTER)
+
+
+class PollDispatcher:
+    """Min-heap of (next_poll_at, entity_id) over the active entities.
+
+    Due entities are popped and submitted to the ingest pipeline, and pushed back at their new cadence
+    once their items are stored; until then they are in flight and not rescheduled by sync().
+    The schedule lives in news_poll_state, so a restart resumes it instead of polling everyone at once.
+    Rescheduled or removed entities leave stale heap entries behind; they are skipped when popped.
+    """
+
+    def __init__(self, aggregator=None, pipeline=None):
+        from integrations.news_aggregator import NewsAggregator
+        from jobs.ingest_pipeline import IngestPipeline
+        self.aggregator = aggregator or NewsAggregator()
+        self.pipeline = pipeline or IngestPipeline(self.aggregator)
+        self._lock = threading.RLock()  # the heap is also pushed to from the pipeline's persist thread
+        self._in_flight = set()
+        self._polled = {"entities": 0, "new_items": 0}  # completions since the last tick report
+        self._heap = []
+        self._due_at = {}      # entity_id → next_poll_at of its live heap entry
+        self._entities = {}    # entity_id → (name, entity_type, use_cases, threat_level)
+        self._open_deals = {}
+        self._synced_at = None
+
+    def sync(self, now=None):
+        """Reload active entities and their poll state. Entities seen for the first time get a
+        first poll spread at random over their interval."""
+        from sqlalchemy import func
+        from database import get_db
+        import models
+
+        now = now or datetime.utcnow()
+        with self._lock:  # against reschedule() committing and pushing an in-flight entity meanwhile
+            with get_db() as db:
+                entities = db.query(models.Entity.id, models.Entity.name, models.Entity.entity_type,
+                                    models.Entity.primary_use_cases, models.Entity.threat_level).filter(
+                    models.Entity.status == 'active').all()
+                self._open_deals = dict(db.query(
+                    models.DealCompetitor.entity_id, func.count(func.distinct(models.Deal.id))
+                ).join(models.Deal, models.Deal.id == models.DealCompetitor.deal_id).filter(
+                    models.Deal.stage.notin_(['closed_won', 'closed_lost'])
+                ).group_by(models.DealCompetitor.entity_id).all())
+                states = {s.entity_id: s for s in db.query(models.NewsPollState).all()}
+
+                self._entities = {eid: (name, etype, use_cases, threat) for eid, name, etype, use_cases, threat in entities}
+                for eid, (_, _, _, threat) in self._entities.items():
+                    state = states.get(eid)
+                    if not state:
+                        interval = cadence_minutes(threat, YIELD_PIVOT, self._open_deals.get(eid, 0))
+                        state = models.NewsPollState(entity_id=eid, interval_minutes=interval, yield_avg=YIELD_PIVOT, poll_count=0,
+                                                     next_poll_at=now + timedelta(minutes=random.uniform(0, interval)))
+                        db.add(state)
+                    elif state.next_poll_at is None:
+                        state.next_poll_at = now
+                    if eid not in self._in_flight and self._due_at.get(eid) != state.next_poll_at:
+                        self._push(eid, state.next_poll_at)
+                for eid in set(self._due_at) - set(self._entities):
+                    del self._due_at[eid]
+                db.commit()
+
+        self.aggregator.set_entities({eid: e[0] for eid, e in self._entities.items()})
+        self._synced_at = now
+
+    def _push(self, entity_id, when):
+        with self._lock:
+            self._due_at[entity_id] = when
+            heapq.heappush(self._heap, (when, entity_id))
+
+    def pop_due(self, now=None):
+        """Entity ids whose poll time has come, earliest first."""
+        now = now or datetime.utcnow()
+        due = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                when, eid = heapq.heappop(self._heap)
+                if self._due_at.get(eid) == when:
+                    del self._due_at[eid]
+                    due.append(eid)
+        return due
+
+    def next_due_at(self):
+        with self._lock:
+            return min(self._due_at.values()) if self._due_at else None
+
+    def reschedule(self, entity_id, new_items, now=None):
+        """Fold this poll's yield into the entity's cadence and push its next poll. An entity's first
+        poll picks up its whole backlog, so it starts from a neutral yield instead. If the poll state
+        can't be saved the entity is still pushed, MIN_INTERVAL_MINUTES out."""
+        from database import get_db
+        import models
+
+        now = now or datetime.utcnow()
+        with self._lock:
+            threat = self._entities[entity_id][3] if entity_id in self._entities else None
+            open_deals = self._open_deals.get(entity_id, 0)
+        next_poll_at = now + timedelta(minutes=MIN_INTERVAL_MINUTES)
+        try:
+            with get_db() as db:
+                state = db.query(models.NewsPollState).filter(models.NewsPollState.entity_id == entity_id).first()
+                if not state:
+                    state = models.NewsPollState(entity_id=entity_id, yield_avg=YIELD_PIVOT, poll_count=0)
+                    db.add(state)
+                if state.poll_count:
+                    state.yield_avg = (1 - YIELD_ALPHA) * (state.yield_avg or 0) + YIELD_ALPHA * new_items
+                else:
+                    state.yield_avg = YIELD_PIVOT
+                state.interval_minutes = cadence_minutes(threat, state.yield_avg, open_deals)
+                state.next_poll_at = now + timedelta(minutes=jittered(state.interval_minutes))
+                state.last_polled_at = now
+                state.last_new_items = new_items
+                state.poll_count = (state.poll_count or 0) + 1
+                polled_next = state.next_poll_at
+                db.commit()
+            next_poll_at = polled_next
+        except Exception as e:
+            print(f"  ⚠️  Could not save poll state for entity {entity_id}, polling again in "
+                  f"{MIN_INTERVAL_MINUTES}m: {e}")
+        finally:
+            with self._lock:
+                self._in_flight.discard(entity_id)
+                if entity_id in self._entities:
+                    self._push(entity_id, next_poll_at)
+        return next_poll_at
+
+    def tick(self, now=None):
+        """Submit everything due to the ingest pipeline and report what completed since the last
+        tick. Blocks while the pipeline is backed up. Returns {"submitted", "polled", "new_items", ...}."""
+        now = now or datetime.utcnow()
+        if not self._synced_at or now - self._synced_at >= timedelta(minutes=RESYNC_MINUTES):
+            from integrations import near_dup
+            backfilled = near_dup.backfill()
+            if backfilled:
+                print(f"  → Near-duplicate index: fingerprinted {backfilled} existing items")
+            self.sync(now)
+
+        with self._lock:
+            due = [eid for eid in self.pop_due(now) if eid in self._entities]
+            self._in_flight.update(due)
+        for eid in due:
+            name, etype, use_cases, _ = self._entities[eid]
+            self.pipeline.submit((eid, name, etype, use_cases), self._on_polled)
+
+        with self._lock:
+            polled, self._polled = self._polled, {"entities": 0, "new_items": 0}
+        if not due and not polled["entities"]:
+            return {"submitted": 0, "polled": 0, "new_items": 0}
+
+        report = self.aggregator.source_report(reset=True)
+        calls = sum(stats['calls'] for stats in report.values())
+        newsapi_requests = (report.get('NewsAPI') or {}).get('requests', 0)
+        print(f"✅ News dispatch: {len(due)} entities submitted, {polled['entities']} polled with "
+              f"{polled['new_items']} new items, {len(self._in_flight)} in flight, {calls} source calls "
+              f"({newsapi_requests} NewsAPI requests)")
+        stages = self.pipeline.print_report(reset=True)
+        return {"submitted": len(due), "polled": polled["entities"], "new_items": polled["new_items"],
+                "sources": report, "stages": stages}
+
+    def _on_polled(self, entity_id, new_items):
+        """Pipeline callback once an entity's items are stored."""
+        next_poll_at = self.reschedule(entity_id, new_items)
+        with self._lock:
+            self._polled["entities"] += 1
+            self._polled["new_items"] += new_items
+        name = self._entities.get(entity_id, (entity_id,))[0]
+        print(f"  → {name}: {new_items} new items, next poll in "
+              f"{(next_poll_at - datetime.utcnow()).total_seconds() / 60:.0f}m")
+
+    def schedule(self):
+        """[(entity_id, name, next_poll_at)] soonest first."""
+        with self._lock:
+            return sorted(((eid, self._entities[eid][0], when) for eid, when in self._due_at.items()
+                           if eid in self._entities), key=lambda row: row[2])
+
+
+def get_dispatcher():
+    global _dispatcher
+    with _dispatcher_lock:
+        if _dispatcher is None:
+            _dispatcher = PollDispatcher()
+        return _dispatcher
+
+
+def run_news_dispatch():
+    try:
+        get_dispatcher().tick()
+    except Exception as e:
+        print(f"❌ News dispatch error: {e}")
@@ -1,26 +1,64 @@
-"""Every 2h: fetch news for all active entities"""
+"""Fetch, store and score news for all active entities in one pass through the ingest pipeline
+(on demand; the scheduler uses jobs/news_dispatcher.py)"""
+import os
 from datetime import datetime
 
+# Entities fetched at once. Each one's sources run concurrently too, within the per-source
+# limits declared by the adapters in integrations/news_sources, so this mainly bounds DB writers
+# and queued work.
+ENTITY_CONCURRENCY = int(os.getenv('NEWS_REFRESH_CONCURRENCY', 8))
+
 
 def run_news_refresh():
     print(f"📰 News refresh: {datetime.utcnow().isoformat()}")
     try:
+        import time
         from database import get_db
         import models
         from integrations.news_aggregator import NewsAggregator
+        from jobs.ingest_pipeline import IngestPipeline
 
         with get_db() as db:
             entities = db.query(models.Entity).filter(models.Entity.status == 'active').all()
             entities_data = [(e.id, e.name, e.entity_type, e.primary_use_cases) for e in entities]
 
+        from integrations import near_dup
+        backfilled = near_dup.backfill()
+        if backfilled:
+            print(f"  → Near-duplicate index: fingerprinted {backfilled} existing items")
+
+        names = {eid: ename for eid, ename, _, _ in entities_data}
         aggregator = NewsAggregator()
-        total_new = 0
-        for eid, ename, etype, use_cases in entities_data:
-            count = refresh_entity_news(eid, ename, etype, use_cases, aggregator)
-            total_new += count
-            print(f"  → {ename}: {count} new items")
+        aggregator.set_entities(names)
+        pipeline = IngestPipeline(aggregator)
+        started = time.time()
+        counts = []
+
+        def _done(eid, count):
+            counts.append(count)
+            print(f"  → {names[eid]}: {count} new items")
 
-        print(f"✅ News refresh complete: {total_new} new items")
+        for entity in entities_data:
+            pipeline.submit(entity, _done)
+        pipeline.stop()
+        total_new = sum(counts)
+
+        report = aggregator.source_report()
+        for label, stats in sorted(report.items()):
+            print(f"  📊 {label}: {stats['calls']} calls, {stats['items']} items, "
+                  f"p50 {stats.get('p50_ms', '-')}ms, p95 {stats.get('p95_ms', '-')}ms, "
+                  f"{stats['errors']} errors, {stats['timeouts']} timeouts, {stats['degraded']} degraded, "
+                  f"error rate {stats['error_rate'] if stats['error_rate'] is not None else '-'}, "
+                  f"dedupe rate {stats['dedupe_rate'] if stats['dedupe_rate'] is not None else '-'}")
+        newsapi = report.get('NewsAPI') or {}
+        if newsapi.get('requests'):
+            print(f"  📊 NewsAPI quota: {newsapi['requests']} requests for {newsapi['entities_queried']} entities "
+                  f"in {newsapi['batches']} batches ({newsapi['truncated']} stopped at the page limit)")
+        stages = pipeline.print_report()
+        print(f"✅ News refresh complete: {total_new} new items from {len(entities_data)} entities "
+              f"in {time.time() - started:.0f}s")
+        return {"new_items": total_new, "entities": len(entities_data), "seconds": round(time.time() - started, 1),
+                "sources": report, "stages": stages, "rss": aggregator.rss_stats}
     except Exception as e:
         print(f"❌ News refresh error: {e}")
 
@@ -45,25 +83,89 @@ def refresh_entity_news(entity_id, entity_name=None, entity_type=None,
             use_cases = e.primary_use_cases
 
     items = aggregator.fetch_all(entity_id, entity_name, entity_type or 'competitor', use_cases or [])
+    try:
+        outcomes = [outcome for outcome, _ in store_rows(normalize_items(entity_id, items))]
+    except Exception:
+        aggregator.give_back(entity_id, items)
+        raise
+    aggregator.commit(entity_id)
+
+    aggregator.record_outcomes(items, outcomes)
+    duplicates = outcomes.count('duplicate')
+    if duplicates:
+        print(f"  ↳ {entity_name}: {duplicates} near-duplicates linked to existing items")
+    return outcomes.count('new')
+
+
+def normalize_items(entity_id, items):
+    """news_items rows for an entity's fetched items, keyed by canonical URL hash."""
+    from integrations.url_canon import url_hash
+    return [dict(
+        entity_id=entity_id,
+        headline=(item.headline or '').strip(),
+        summary=(item.summary or '').strip(),
+        url=item.url,
+        url_hash=url_hash(item.url),
+        source_name=item.source_name,
+        source_type=item.source_type,
+        published_at=item.published_at,
+        fetched_at=datetime.utcnow(),
+    ) for item in items]
+
+
+def store_rows(rows):
+    """Store rows in one transaction. Returns (outcome, news_item_id) per row — see _store_item."""
+    from database import get_db
+    from sqlalchemy.exc import IntegrityError
+
+    try:
+        with get_db() as db:
+            return [_store_item(db, row) for row in rows]
+    except IntegrityError:
+        # Another refresh stored one of these URLs in the meantime; insert one by one, each in its
+        # own transaction (pysqlite does not do SAVEPOINTs without extra engine setup)
+        stored = []
+        for row in rows:
+            try:
+                with get_db() as db:
+                    stored.append(_store_item(db, row))
+            except IntegrityError:
+                stored.append(('known', None))
+        return stored
+
+
+def _store_item(db, row):
+    """Insert one fetched item unless its canonical URL is known or it near-duplicates a recent item.
+    Returns ('new', news_item_id), ('duplicate', None) or ('known', None)."""
+    import models
+    from integrations import near_dup
+
+    if db.query(models.NewsItem.id).filter(models.NewsItem.url_hash == row['url_hash']).first() or \
+            db.query(models.NewsDuplicate.id).filter(models.NewsDuplicate.url_hash == row['url_hash']).first():
+        return 'known', None
+
+    h = near_dup.fingerprint(row['headline'], row['summary'])
+    match = near_dup.find_duplicate(db, h, row['entity_id']) if h is not None else None
+    if match:
+        canonical_id, distance = match
+        db.add(models.NewsDuplicate(
+            canonical_id=canonical_id,
+            entity_id=row['entity_id'],
+            url=row['url'],
+            url_hash=row['url_hash'],
+            headline=row['headline'],
+            source_name=row['source_name'],
+            source_type=row['source_type'],
+            published_at=row['published_at'],
+            distance=distance,
+        ))
+        db.flush()
+        return 'duplicate', None
 
-    count = 0
-    with get_db() as db:
-        for item in items:
-            existing = db.query(models.NewsItem).filter(models.NewsItem.url == item.url).first()
-            if existing:
-                continue
-            ni = models.NewsItem(
-                entity_id=entity_id,
-                headline=item.headline,
-                summary=item.summary,
-                url=item.url,
-                source_name=item.source_name,
-                source_type=item.source_type,
-                published_at=item.published_at,
-                fetched_at=datetime.utcnow(),
-            )
-            db.add(ni)
-            count += 1
-        db.commit()
-
-    return count
+    ni = models.NewsItem(**row)
+    db.add(ni)
+    db.flush()
+    if h is not None:
+        near_dup.index_item(db, ni.id, h)
+        db.flush()
+    return 'new', ni.id
@@ -0,0 +1,14 @@
+"""Daily 4am: retrain the local relevance pre-filter on the latest model-scored news"""
+from datetime import datetime
+
+
+def run_relevance_training():
+    print(f"🧮 Relevance filter training: {datetime.utcnow().isoformat()}")
+    try:
+        from ai import relevance_filter
+        metrics = relevance_filter.train()
+        if metrics:
+            print(f"✅ Relevance filter: {metrics['items']} items, threshold {metrics['threshold']:.3f}")
+        return metrics
+    except Exception as e:
+        print(f"❌ Relevance filter training error: {e}")
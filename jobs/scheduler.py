@@ -25,11 +25,14 @@ def start_scheduler():
 
     _scheduler = BackgroundScheduler(jobstores=jobstores, timezone='UTC')
 
-    from jobs.news_refresh import run_news_refresh
+    from jobs.news_dispatcher import run_news_dispatch, TICK_SECONDS
     from jobs.signal_sweep import run_signal_sweep
     from jobs.autonomy_loop import run_autonomy_loop
     from jobs.people_sweep import run_people_sweep
     from jobs.digest_builder import run_digest_builder
+    from jobs.dossier_watchdog import run_dossier_watchdog
+    from jobs.dossier_refresh import run_dossier_refresh
+    from jobs.relevance_training import run_relevance_training
 
     # Autonomy loop: every 30 minutes
     _scheduler.add_job(
@@ -38,18 +41,37 @@ def start_scheduler():
         next_run_time=datetime.utcnow()
     )
 
-    # News refresh: every 2 hours
+    # News dispatch: every minute, feeds the entities due on their own adaptive cadence into the
+    # ingest pipeline, which stores and scores their items as they arrive
     _scheduler.add_job(
-        run_news_refresh, 'interval', hours=2,
-        id='news_refresh', replace_existing=True
+        run_news_dispatch, 'interval', seconds=TICK_SECONDS,
+        id='news_dispatch', replace_existing=True, coalesce=True, max_instances=1
     )
 
-    # Signal sweep: every 6 hours
+    # Signal sweep: every 6 hours, scores what the ingest pipeline left unscored
     _scheduler.add_job(
         run_signal_sweep, 'interval', hours=6,
         id='signal_sweep', replace_existing=True
     )
 
+    # Relevance pre-filter retraining: daily 4am UTC, after the night's sweeps have scored more news
+    _scheduler.add_job(
+        run_relevance_training, 'cron', hour=int(os.getenv('RELEVANCE_TRAINING_HOUR', 4)), minute=0,
+        id='relevance_training', replace_existing=True
+    )
+
+    # Dossier watchdog: every 5 minutes
+    _scheduler.add_job(
+        run_dossier_watchdog, 'interval', minutes=5,
+        id='dossier_watchdog', replace_existing=True
+    )
+
+    # Dossier refresh: nightly 3am UTC, within DOSSIER_REFRESH_TOKEN_BUDGET / _TIME_BUDGET_MINUTES
+    _scheduler.add_job(
+        run_dossier_refresh, 'cron', hour=int(os.getenv('DOSSIER_REFRESH_HOUR', 3)), minute=0,
+        id='dossier_refresh', replace_existing=True
+    )
+
     # People sweep: daily 7am UTC
     _scheduler.add_job(
         run_people_sweep, 'cron', hour=7, minute=0,
@@ -63,6 +85,14 @@ def start_scheduler():
     )
 
     _scheduler.start()
+
+    # The fixed 2-hourly news_refresh job this replaces may still be in the persistent job store
+    from apscheduler.jobstores.base import JobLookupError
+    try:
+        _scheduler.remove_job('news_refresh')
+    except JobLookupError:
+        pass
+
     print(f"✅ Scheduler started with {len(_scheduler.get_jobs())} jobs")
     return _scheduler
 
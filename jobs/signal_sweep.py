@@ -1,60 +1,179 @@
-"""Every 6h: AI-score new news items, promote high-scorers to signals"""
+"""Every 6h: AI-score the news items the ingest pipeline left unscored, promote high-scorers to signals.
+
+The backlog is every item without scored_at that has been in fewer than MAX_SCORE_ATTEMPTS scoring
+calls. It is paged through newest first, SWEEP_PAGE_SIZE items at a time. The relevance pre-filter
+(ai/relevance_filter.py) scores each page's confident noise locally, and the rest is scored in
+chunks of one model call each, SWEEP_CONCURRENCY chunks at once. An item the model skips keeps no
+scored_at and is retried by later sweeps until it runs out of attempts.
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+from ai.signal_agent import MAX_ITEMS_PER_CALL
+
+SWEEP_CONCURRENCY = int(os.getenv('SIGNAL_SWEEP_CONCURRENCY', 4))
+SWEEP_PAGE_SIZE = int(os.getenv('SIGNAL_SWEEP_PAGE_SIZE', 200))
+MAX_SCORE_ATTEMPTS = int(os.getenv('SIGNAL_MAX_SCORE_ATTEMPTS', 3))
+
+
+def _backlog_filter(models):
+    return (
+        models.NewsItem.scored_at.is_(None),
+        models.NewsItem.promoted_to_signal == False,
+        (models.NewsItem.score_attempts == None) | (models.NewsItem.score_attempts < MAX_SCORE_ATTEMPTS),
+    )
+
 
 def run_signal_sweep():
     print(f"⚡ Signal sweep: {datetime.utcnow().isoformat()}")
     try:
+        import time
         from database import get_db
         import models
         from ai.signal_agent import SignalAgent
+        from ai import relevance_filter
 
         with get_db() as db:
-            news_items = db.query(models.NewsItem).filter(
-                models.NewsItem.promoted_to_signal == False,
-                models.NewsItem.relevance_score == 0
-            ).order_by(models.NewsItem.created_at.desc()).limit(50).all()
-
-            if not news_items:
-                print("  → No unscored items")
-                return
+            backlog = db.query(models.NewsItem.id).filter(*_backlog_filter(models)).count()
 
-            active_deals = db.query(models.Deal).filter(
-                models.Deal.stage.notin_(['closed_won', 'closed_lost'])
-            ).all()
+        if not backlog:
+            print("  → No unscored items")
+            return {"backlog": 0}
 
+        started = time.time()
         agent = SignalAgent()
-        scores = agent.score_items(news_items, active_deals)
+        totals = {"scored": 0, "promoted": 0, "unscored": 0, "prefiltered": 0}
+        relevance_filter.stats(reset=True)
+        last_id = None
+
+        with ThreadPoolExecutor(max_workers=SWEEP_CONCURRENCY, thread_name_prefix='signal-sweep') as pool:
+            while True:
+                # Keyset paging on id: items that stay unscored are not picked up again this sweep
+                with get_db() as db:
+                    q = db.query(models.NewsItem.id, models.NewsItem.headline, models.NewsItem.summary,
+                                 models.NewsItem.source_name, models.NewsItem.source_type).filter(*_backlog_filter(models))
+                    if last_id is not None:
+                        q = q.filter(models.NewsItem.id < last_id)
+                    page = [dict(row._mapping) for row in q.order_by(models.NewsItem.id.desc()).limit(SWEEP_PAGE_SIZE).all()]
+                if not page:
+                    break
+                last_id = page[-1]['id']
+
+                to_model = [item['id'] for item in relevance_filter.prefilter(page)]
+                totals["prefiltered"] += len(page) - len(to_model)
+                chunks = [to_model[i:i + MAX_ITEMS_PER_CALL] for i in range(0, len(to_model), MAX_ITEMS_PER_CALL)]
+                for result in pool.map(lambda ids: _score_chunk(ids, agent), chunks):
+                    for key in ("scored", "promoted", "unscored"):
+                        totals[key] += result[key]
+                done = totals["scored"] + totals["unscored"] + totals["prefiltered"]
+                print(f"  → {done}/{backlog} items: {totals['scored']} scored, {totals['prefiltered']} pre-filtered, "
+                      f"{totals['promoted']} promoted")
 
-        promoted = 0
         with get_db() as db:
-            for score_data in scores:
-                news_id = score_data.get('id')
-                score = score_data.get('score', 0)
-
-                ni = db.query(models.NewsItem).filter(models.NewsItem.id == news_id).first()
-                if ni:
-                    ni.relevance_score = score
-
-                if score >= 60:
-                    ni_full = db.query(models.NewsItem).filter(models.NewsItem.id == news_id).first()
-                    if ni_full:
-                        sid = agent.promote_to_signal(ni_full, score_data)
-                        promoted += 1
-
-                        if score >= 80:
-                            try:
-                                from integrations.slack_client import SlackClient
-                                entity = db.query(models.Entity).filter(models.Entity.id == ni_full.entity_id).first()
-                                SlackClient().post_signal_alert(
-                                    entity.name if entity else "Unknown",
-                                    ni_full.headline, score, ni_full.url
-                                )
-                            except Exception as e:
-                                print(f"  ⚠️  Slack alert failed: {e}")
-
-            db.commit()
-
-        print(f"✅ Signal sweep: scored {len(scores)}, promoted {promoted}")
+            remaining = db.query(models.NewsItem.id).filter(*_backlog_filter(models)).count()
+        seconds = time.time() - started
+        prefilter = relevance_filter.stats()
+        print(f"✅ Signal sweep: backlog {backlog}, scored {totals['scored']}, promoted {totals['promoted']}, "
+              f"{totals['unscored']} not scored ({remaining} left for a retry) in {seconds:.0f}s "
+              f"({(totals['scored'] + totals['unscored'] + totals['prefiltered']) / max(seconds, 1e-6):.1f} items/s)")
+        if totals["prefiltered"] or prefilter["audited"]:
+            print(f"  🧮 Pre-filter: {totals['prefiltered']} noise items scored locally (~{prefilter['calls_avoided']} "
+                  f"model calls avoided), audit agreement {_rate(prefilter['agreement_rate'])} "
+                  f"over {prefilter['audited']} items")
+        return {"backlog": backlog, "remaining": remaining, "seconds": round(seconds, 1), **totals,
+                "prefilter": prefilter}
     except Exception as e:
         print(f"❌ Signal sweep error: {e}")
+
+
+def _rate(value):
+    return f"{value:.0%}" if value is not None else "-"
+
+
+def _score_chunk(news_ids, agent):
+    try:
+        return score_and_promote(news_ids, agent)
+    except Exception as e:
+        print(f"  ⚠️  Scoring {len(news_ids)} items failed: {e}")
+        return {"scored": 0, "promoted": 0, "unscored": len(news_ids)}
+
+
+def score_and_promote(news_ids, agent=None):
+    """Score news items, store the scores and promote 60+ to signals, clustered into stories (80+
+    also alerts Slack, once per story).
+    Every item counts a scoring attempt; only those the model returned get scored_at.
+    Returns {"scored", "promoted", "unscored"}."""
+    from sqlalchemy import func
+    from database import get_db
+    import models
+    from ai.signal_agent import SignalAgent
+
+    agent = agent or SignalAgent()
+    with get_db() as db:
+        news_items = db.query(models.NewsItem).filter(models.NewsItem.id.in_(news_ids)).all()
+        active_deals = db.query(models.Deal).filter(
+            models.Deal.stage.notin_(['closed_won', 'closed_lost'])
+        ).all()
+        entity_names = dict(db.query(models.Entity.id, models.Entity.name).filter(
+            models.Entity.id.in_({ni.entity_id for ni in news_items})
+        ).all())
+        db.expunge_all()  # keep loaded attributes readable after the session closes
+
+    if not news_items:
+        return {"scored": 0, "promoted": 0, "unscored": 0}
+
+    by_id = {ni.id: ni for ni in news_items}
+    scored = {}
+    for score_data in agent.score_items(news_items, active_deals):
+        try:
+            ni = by_id.get(int(score_data.get('id')))
+        except (TypeError, ValueError):
+            ni = None
+        if ni:
+            scored[ni.id] = (ni, score_data)
+
+    now = datetime.utcnow()
+    with get_db() as db:
+        db.query(models.NewsItem).filter(models.NewsItem.id.in_(list(by_id))).update(
+            {"score_attempts": func.coalesce(models.NewsItem.score_attempts, 0) + 1}, synchronize_session=False)
+        for nid, (_, score_data) in scored.items():
+            db.query(models.NewsItem).filter(models.NewsItem.id == nid).update(
+                {"relevance_score": score_data.get('score', 0), "scored_at": now, "scored_by": 'llm'},
+                synchronize_session=False)
+        db.commit()
+
+    from ai import relevance_filter
+    relevance_filter.record_model_scores({nid: score_data.get('score') for nid, (_, score_data) in scored.items()})
+
+    promoted = []
+    for ni, score_data in scored.values():
+        score = score_data.get('score') or 0
+        if score < 60:
+            continue
+        promoted.append((agent.promote_to_signal(ni, score_data), ni, score))
+    if not promoted:
+        return {"scored": len(scored), "promoted": 0, "unscored": len(news_items) - len(scored)}
+
+    from ai import story_clusterer
+    try:
+        story_clusterer.assign_stories()
+    except Exception as e:
+        print(f"  ⚠️  Story clustering failed: {e}")
+
+    for signal_id, ni, score in promoted:
+        if score < 80:
+            continue
+        try:
+            # One alert per story: the other sources reporting the same event stay quiet
+            if not story_clusterer.claim_alert(signal_id):
+                continue
+            from integrations.slack_client import SlackClient
+            SlackClient().post_signal_alert(
+                entity_names.get(ni.entity_id, "Unknown"),
+                ni.headline, score, ni.url
+            )
+        except Exception as e:
+            print(f"  ⚠️  Slack alert failed: {e}")
+
+    return {"scored": len(scored), "promoted": len(promoted), "unscored": len(news_items) - len(scored)}
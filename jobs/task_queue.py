@@ -0,0 +1,422 @@
+"""
+Durable background tasks on the app database.
+
+Routes enqueue typed tasks; workers (worker.py, or the worker embedded in the web process) claim
+them with SELECT … FOR UPDATE SKIP LOCKED on Postgres, or a compare-and-set UPDATE on SQLite,
+so any number of worker processes on any number of nodes can share one queue.
+
+  queued → running → succeeded
+                   ↘ queued again, run_at pushed out with exponential backoff → … → dead
+
+A running task whose heartbeat stops (worker killed or redeployed mid-task) goes back to
+queued after LEASE_SECONDS. Handlers must therefore be safe to run twice.
+"""
+import os
+import random
+import socket
+import threading
+import time
+import uuid
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+LEASE_SECONDS = int(os.getenv('TASK_LEASE_SECONDS', 300))
+HEARTBEAT_SECONDS = max(5, LEASE_SECONDS // 5)
+POLL_SECONDS = float(os.getenv('TASK_POLL_SECONDS', 2))
+WORKER_CONCURRENCY = int(os.getenv('TASK_WORKER_CONCURRENCY', 4))
+MAX_BACKOFF_SECONDS = 3600
+
+ACTIVE_STATUSES = ('queued', 'running')
+
+TaskType = namedtuple('TaskType', 'name fn concurrency max_attempts backoff_seconds')
+# What a worker holds after claiming — plain values, so nothing is read off a closed session
+ClaimedTask = namedtuple('ClaimedTask', 'id task_type payload attempts max_attempts')
+
+_registry = {}
+_sqlite_claim_lock = threading.Lock()
+# Set on enqueue so an in-process worker picks new work up without waiting out its poll interval
+_wakeup = threading.Event()
+
+
+class PermanentTaskError(Exception):
+    """Raised by a handler when retrying cannot help (e.g. the row it works on is gone)."""
+
+
+def task_handler(name, concurrency=2, max_attempts=3, backoff_seconds=30):
+    """Register fn(payload) -> result as the handler for a task type.
+
+    concurrency caps running tasks of this type across all workers; override it per deploy
+    with TASK_<NAME>_CONCURRENCY (dots become underscores, e.g. TASK_DOSSIER_GENERATE_CONCURRENCY)."""
+    env_key = f"TASK_{name.upper().replace('.', '_')}_CONCURRENCY"
+
+    def decorator(fn):
+        _registry[name] = TaskType(name, fn, int(os.getenv(env_key, concurrency)),
+                                   max_attempts, backoff_seconds)
+        return fn
+    return decorator
+
+
+def get_task_type(name):
+    import jobs.tasks  # noqa: F401 — registers the handlers
+    spec = _registry.get(name)
+    if not spec:
+        raise ValueError(f"Unknown task type: {name}")
+    return spec
+
+
+def task_types():
+    import jobs.tasks  # noqa: F401
+    return dict(_registry)
+
+
+def _is_postgres(db):
+    return db.get_bind().dialect.name == 'postgresql'
+
+
+def _active_task(db, dedupe_key):
+    import models
+    return db.query(models.Task).filter(
+        models.Task.dedupe_key == dedupe_key,
+        models.Task.status.in_(ACTIVE_STATUSES)
+    ).first()
+
+
+def find_active(dedupe_key):
+    """The queued/running task holding a dedupe key, as a dict, or None."""
+    from database import get_db
+    with get_db() as db:
+        task = _active_task(db, dedupe_key)
+        return task.to_dict() if task else None
+
+
+def enqueue(task_type, payload=None, dedupe_key=None, priority=0, delay_seconds=0):
+    """Queue a task. Returns (task_id, created).
+
+    With a dedupe_key, a task already queued or running under that key is returned instead
+    (created=False) — a partial unique index makes this hold across concurrent enqueuers.
+    Must not be called inside another get_db() block: sessions are thread-scoped."""
+    from sqlalchemy.exc import IntegrityError
+    from database import get_db
+    import models
+
+    spec = get_task_type(task_type)
+    dedupe_key = dedupe_key[:255] if dedupe_key else None
+
+    with get_db() as db:
+        if dedupe_key:
+            existing = _active_task(db, dedupe_key)
+            if existing:
+                return existing.id, False
+
+        task = models.Task(
+            task_type=task_type,
+            payload=payload or {},
+            dedupe_key=dedupe_key,
+            priority=priority,
+            max_attempts=spec.max_attempts,
+            run_at=datetime.utcnow() + timedelta(seconds=delay_seconds),
+        )
+        db.add(task)
+        try:
+            db.commit()
+        except IntegrityError:
+            # Lost the race to another enqueuer of the same key
+            db.rollback()
+            existing = _active_task(db, dedupe_key) if dedupe_key else None
+            if existing:
+                return existing.id, False
+            raise
+        task_id = task.id
+
+    _wakeup.set()
+    return task_id, True
+
+
+def _running_counts(db):
+    from sqlalchemy import func
+    import models
+    return dict(db.query(models.Task.task_type, func.count(models.Task.id)).filter(
+        models.Task.status == 'running'
+    ).group_by(models.Task.task_type).all())
+
+
+def claim_task(worker_id, allowed_types=None):
+    """Claim the next runnable task for this worker, or None. Respects per-type concurrency."""
+    from sqlalchemy import text
+    from database import get_db
+    import models
+
+    registry = task_types()
+    names = [t for t in (allowed_types or registry) if t in registry]
+    now = datetime.utcnow()
+
+    with get_db() as db:
+        running = _running_counts(db)
+        open_types = [t for t in names if running.get(t, 0) < registry[t].concurrency]
+        if not open_types:
+            return None
+
+        query = db.query(models.Task).filter(
+            models.Task.status == 'queued',
+            models.Task.run_at <= now,
+            models.Task.task_type.in_(open_types)
+        ).order_by(models.Task.priority.desc(), models.Task.run_at, models.Task.id)
+
+        claim_values = {
+            models.Task.status: 'running',
+            models.Task.locked_by: worker_id,
+            models.Task.locked_at: now,
+            models.Task.heartbeat_at: now,
+            models.Task.attempts: models.Task.attempts + 1,
+        }
+
+        if _is_postgres(db):
+            task = query.with_for_update(skip_locked=True).first()
+            if not task:
+                return None
+            # Serialise claimers of one type so the concurrency cap holds across nodes
+            db.execute(text("SELECT pg_advisory_xact_lock(hashtext(:k))"), {"k": f"task:{task.task_type}"})
+            if _running_counts(db).get(task.task_type, 0) >= registry[task.task_type].concurrency:
+                db.rollback()
+                return None
+            db.query(models.Task).filter(models.Task.id == task.id).update(claim_values, synchronize_session=False)
+            db.commit()
+            claimed_id = task.id
+        else:
+            # SQLite has no row locks: one claimer per process, and the status check in the
+            # UPDATE keeps a second process from claiming the same row
+            claimed_id = None
+            with _sqlite_claim_lock:
+                for candidate_id, in query.with_entities(models.Task.id).limit(10).all():
+                    updated = db.query(models.Task).filter(
+                        models.Task.id == candidate_id,
+                        models.Task.status == 'queued'
+                    ).update(claim_values, synchronize_session=False)
+                    db.commit()
+                    if updated:
+                        claimed_id = candidate_id
+                        break
+            if claimed_id is None:
+                return None
+
+        task = db.query(models.Task).filter(models.Task.id == claimed_id).first()
+        return ClaimedTask(task.id, task.task_type, task.payload or {}, task.attempts, task.max_attempts)
+
+
+def complete_task(task_id, worker_id, result=None):
+    from database import get_db
+    import models
+    with get_db() as db:
+        db.query(models.Task).filter(
+            models.Task.id == task_id,
+            models.Task.locked_by == worker_id,
+            models.Task.status == 'running'
+        ).update({
+            models.Task.status: 'succeeded',
+            models.Task.result: result,
+            models.Task.finished_at: datetime.utcnow(),
+            models.Task.locked_by: None,
+        }, synchronize_session=False)
+        db.commit()
+
+
+def _backoff(spec, attempts):
+    delay = min(spec.backoff_seconds * (2 ** max(0, attempts - 1)), MAX_BACKOFF_SECONDS)
+    return delay * random.uniform(0.8, 1.2)
+
+
+def fail_task(claim, worker_id, error, permanent=False):
+    """Requeue with backoff, or mark dead once attempts are used up. Returns the new status."""
+    from database import get_db
+    import models
+
+    spec = _registry.get(claim.task_type)
+    now = datetime.utcnow()
+    dead = permanent or not spec or claim.attempts >= claim.max_attempts
+    values = {
+        models.Task.status: 'dead' if dead else 'queued',
+        models.Task.last_error: str(error)[:2000],
+        models.Task.locked_by: None,
+    }
+    if dead:
+        values[models.Task.finished_at] = now
+    else:
+        values[models.Task.run_at] = now + timedelta(seconds=_backoff(spec, claim.attempts))
+
+    with get_db() as db:
+        db.query(models.Task).filter(
+            models.Task.id == claim.id,
+            models.Task.locked_by == worker_id,
+            models.Task.status == 'running'
+        ).update(values, synchronize_session=False)
+        db.commit()
+    return 'dead' if dead else 'queued'
+
+
+def heartbeat(task_ids, worker_id):
+    if not task_ids:
+        return
+    from database import get_db
+    import models
+    with get_db() as db:
+        db.query(models.Task).filter(
+            models.Task.id.in_(list(task_ids)),
+            models.Task.locked_by == worker_id,
+            models.Task.status == 'running'
+        ).update({models.Task.heartbeat_at: datetime.utcnow()}, synchronize_session=False)
+        db.commit()
+
+
+def requeue_expired():
+    """Return running tasks whose worker stopped heartbeating to the queue (or bury them)."""
+    from sqlalchemy import func
+    from database import get_db
+    import models
+
+    cutoff = datetime.utcnow() - timedelta(seconds=LEASE_SECONDS)
+    with get_db() as db:
+        expired = db.query(models.Task).filter(
+            models.Task.status == 'running',
+            func.coalesce(models.Task.heartbeat_at, models.Task.locked_at) < cutoff
+        ).all()
+        requeued = 0
+        for task in expired:
+            # Same compare-and-set as claiming: only the worker that still sees it stale wins
+            dead = (task.attempts or 0) >= (task.max_attempts or 1)
+            updated = db.query(models.Task).filter(
+                models.Task.id == task.id,
+                models.Task.status == 'running',
+                models.Task.locked_by == task.locked_by
+            ).update({
+                models.Task.status: 'dead' if dead else 'queued',
+                models.Task.locked_by: None,
+                models.Task.last_error: f"Lease expired (worker {task.locked_by} stopped heartbeating)",
+                models.Task.finished_at: datetime.utcnow() if dead else None,
+            }, synchronize_session=False)
+            requeued += updated if not dead else 0
+        db.commit()
+    if expired:
+        print(f"  ♻️  Task queue: {len(expired)} expired leases ({requeued} requeued)")
+    return requeued
+
+
+def queue_stats():
+    """Counts by type and status, plus the most recent failures — for the admin view."""
+    from sqlalchemy import func
+    from database import get_db
+    import models
+
+    with get_db() as db:
+        rows = db.query(models.Task.task_type, models.Task.status, func.count(models.Task.id)).group_by(
+            models.Task.task_type, models.Task.status
+        ).all()
+        recent_failures = db.query(models.Task).filter(
+            models.Task.last_error.isnot(None)
+        ).order_by(models.Task.id.desc()).limit(20).all()
+
+        by_type = {}
+        for task_type, status, count in rows:
+            by_type.setdefault(task_type, {})[status] = count
+        registry = task_types()
+        return {
+            "types": {
+                name: {"concurrency": spec.concurrency, "max_attempts": spec.max_attempts,
+                       "counts": by_type.get(name, {})}
+                for name, spec in registry.items()
+            },
+            "recent_failures": [t.to_dict() for t in recent_failures],
+        }
+
+
+class TaskWorker:
+    """Claims and runs tasks on a thread pool until stopped."""
+
+    def __init__(self, concurrency=None, allowed_types=None, worker_id=None):
+        self.concurrency = concurrency or WORKER_CONCURRENCY
+        self.allowed_types = allowed_types
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self._pool = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='task')
+        self._in_flight = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Run in a background thread (embedded worker)."""
+        self._thread = threading.Thread(target=self.run, name='task-worker', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, wait=True):
+        """Stop claiming. In-flight tasks finish; anything cut off is requeued by lease expiry."""
+        self._stop.set()
+        _wakeup.set()
+        self._pool.shutdown(wait=wait)
+
+    def run(self):
+        print(f"🛠️  Task worker {self.worker_id} started (concurrency={self.concurrency})")
+        last_maintenance = 0.0
+        while not self._stop.is_set():
+            try:
+                if time.time() - last_maintenance >= HEARTBEAT_SECONDS:
+                    with self._lock:
+                        in_flight = set(self._in_flight)
+                    heartbeat(in_flight, self.worker_id)
+                    requeue_expired()
+                    last_maintenance = time.time()
+
+                claimed = self._fill()
+            except Exception as e:
+                print(f"❌ Task worker error: {e}")
+                claimed = 0
+
+            _wakeup.clear()
+            if not claimed:
+                _wakeup.wait(POLL_SECONDS)
+        print(f"🛠️  Task worker {self.worker_id} stopped")
+
+    def _fill(self):
+        claimed = 0
+        while not self._stop.is_set():
+            with self._lock:
+                if len(self._in_flight) >= self.concurrency:
+                    break
+            claim = claim_task(self.worker_id, self.allowed_types)
+            if not claim:
+                break
+            with self._lock:
+                self._in_flight.add(claim.id)
+            self._pool.submit(self._execute, claim)
+            claimed += 1
+        return claimed
+
+    def _execute(self, claim):
+        spec = _registry[claim.task_type]
+        started = time.time()
+        print(f"  ▶️  Task {claim.id} {claim.task_type} (attempt {claim.attempts}/{claim.max_attempts})")
+        try:
+            result = spec.fn(claim.payload)
+            complete_task(claim.id, self.worker_id, result)
+            print(f"  ✅ Task {claim.id} {claim.task_type} done in {time.time() - started:.1f}s")
+        except Exception as e:
+            try:
+                status = fail_task(claim, self.worker_id, e, permanent=isinstance(e, PermanentTaskError))
+                print(f"  ❌ Task {claim.id} {claim.task_type} failed ({status}): {e}")
+            except Exception as record_err:
+                print(f"  ❌ Task {claim.id} failure not recorded: {record_err}")
+        finally:
+            with self._lock:
+                self._in_flight.discard(claim.id)
+            _wakeup.set()
+
+
+_embedded_worker = None
+
+
+def start_embedded_worker():
+    """Run a worker inside this process. Disable with TASK_WORKER_EMBEDDED=false when worker.py runs separately."""
+    global _embedded_worker
+    if _embedded_worker is None:
+        _embedded_worker = TaskWorker(concurrency=int(os.getenv('TASK_EMBEDDED_CONCURRENCY', 2))).start()
+    return _embedded_worker
@@ -0,0 +1,72 @@
+"""Background task handlers — enqueued by routes, run by worker.py or the embedded worker (see jobs/task_queue.py)"""
+from jobs.task_queue import task_handler, PermanentTaskError
+
+
+@task_handler('dossier.generate', concurrency=2, max_attempts=3, backoff_seconds=60)
+def generate_dossier(payload):
+    """A retry resumes from the sections the previous attempt checkpointed."""
+    from database import get_db
+    import models
+    from ai.dossier_agent import DossierAgent
+
+    dossier_id = payload['dossier_id']
+    with get_db() as db:
+        dossier = db.query(models.Dossier).filter(models.Dossier.id == dossier_id).first()
+        if not dossier:
+            raise PermanentTaskError(f"Dossier {dossier_id} not found")
+        status = dossier.generation_status
+
+    # A redelivered task may find the previous worker finished just before it died
+    if status != 'completed':
+        DossierAgent().generate(dossier_id, payload['entity_id'], mode=payload.get('mode', 'full'))
+        with get_db() as db:
+            status = db.query(models.Dossier.generation_status).filter(models.Dossier.id == dossier_id).scalar()
+    if status != 'completed':
+        raise RuntimeError(f"Dossier {dossier_id} generation ended {status}")
+    return {"dossier_id": dossier_id}
+
+
+@task_handler('dossier.bulk_refresh', concurrency=1, max_attempts=1)
+def bulk_refresh_dossiers(payload):
+    """Nightly staleness-ranked refresh. Not retried — the next night re-ranks anyway."""
+    from jobs.dossier_refresh import refresh_stale_dossiers
+    return refresh_stale_dossiers(**payload)
+
+
+@task_handler('battle_card.generate', concurrency=2, max_attempts=2, backoff_seconds=60)
+def generate_battle_card(payload):
+    from database import get_db
+    import models
+    from ai.battle_card_agent import BattleCardAgent
+
+    entity_id = payload['entity_id']
+    card_content = BattleCardAgent().generate(
+        entity_id, payload.get('dossier_id'),
+        payload.get('use_case'), payload.get('distyl_product')
+    )
+    with get_db() as db:
+        bc = models.BattleCard(
+            entity_id=entity_id,
+            dossier_id=payload.get('dossier_id'),
+            use_case=payload.get('use_case'),
+            distyl_product=payload.get('distyl_product'),
+            content=card_content,
+            status='draft',
+        )
+        db.add(bc)
+        db.commit()
+        return {"battle_card_id": bc.id}
+
+
+@task_handler('digest.generate', concurrency=1, max_attempts=2, backoff_seconds=120)
+def generate_digest(payload):
+    from ai.digest_agent import DigestAgent
+    DigestAgent().generate()
+    return {}
+
+
+@task_handler('gmail.push', concurrency=2, max_attempts=3, backoff_seconds=30)
+def process_gmail_push(payload):
+    from routes.gmail_webhook import _process_gmail_push
+    _process_gmail_push(payload['email'], payload.get('history_id', ''))
+    return {}
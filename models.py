@@ -1,9 +1,11 @@
 """
 Distyl Intel Portal - Database Models
-17 tables: 15 intel tables + users + oauth_tokens
+26 tables: 15 intel tables + users + oauth_tokens + tasks + feed_state
++ news_fingerprints / news_duplicates (near-duplicate index) + news_poll_state / news_watermarks
++ classifier_models + stories + dossier_fact_links
 """
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, Float, JSON, ForeignKey, Enum
+from sqlalchemy import Column, Integer, BigInteger, String, Text, Boolean, DateTime, Float, JSON, ForeignKey, Enum, Index, LargeBinary, text
 from sqlalchemy.orm import relationship
 import enum
 from database import Base
@@ -90,6 +92,7 @@ class Entity(Base):
     primary_use_cases = Column(JSON)
     known_clients = Column(JSON)
     products = Column(JSON)
+    aliases = Column(JSON)  # other names matched as mentions (integrations/entity_matcher.py)
     distyl_exposure = Column(String(20), default="none")
     threat_level = Column(String(20), default="monitor")
     status = Column(String(20), default="active")
@@ -116,6 +119,7 @@ class Entity(Base):
             "primary_use_cases": self.primary_use_cases,
             "known_clients": self.known_clients,
             "products": self.products,
+            "aliases": self.aliases or [],
             "distyl_exposure": self.distyl_exposure,
             "threat_level": self.threat_level,
             "status": self.status,
@@ -125,6 +129,22 @@ class Entity(Base):
         }
 
 
+# Dossier section key → text column (Section L is the JSON appendix)
+DOSSIER_SECTION_COLUMNS = {
+    'a': 'section_a_synopsis',
+    'b': 'section_b_business_model',
+    'c': 'section_c_products',
+    'd': 'section_d_clients',
+    'e': 'section_e_gtm',
+    'f': 'section_f_exec_team',
+    'g': 'section_g_financials',
+    'h': 'section_h_technology',
+    'i': 'section_i_partnerships',
+    'j': 'section_j_competitive',
+    'k': 'section_k_threats',
+}
+
+
 class Dossier(Base):
     __tablename__ = "dossiers"
     id = Column(Integer, primary_key=True)
@@ -141,6 +161,10 @@ class Dossier(Base):
     section_i_partnerships = Column(Text)
     section_j_competitive = Column(Text)
     section_k_threats = Column(Text)
+    # Completed versions move A–K out of the Text columns — see dossier_storage.py
+    storage_format = Column(String(10), default="plain")
+    sections_blob = Column(LargeBinary)
+    delta_base_id = Column(Integer, ForeignKey("dossiers.id"))
     section_l_appendix = Column(JSON)
     ceo_brief = Column(JSON)
     overall_confidence = Column(String(10))
@@ -150,28 +174,41 @@ class Dossier(Base):
     prompt_version = Column(String(50))
     eval_score = Column(Integer)
     generation_status = Column(String(20), default="pending")
+    generation_meta = Column(JSON)
+    last_progress_at = Column(DateTime)
     generated_at = Column(DateTime)
     generated_by = Column(Integer, ForeignKey("users.id"))
     created_at = Column(DateTime, default=datetime.utcnow)
 
     entity = relationship("Entity", back_populates="dossiers")
 
+    def get_sections(self):
+        """{'a': text, …, 'k': text} — read these instead of the section_* columns,
+        which are empty once a version is packed."""
+        from dossier_storage import read_sections
+        return read_sections(self)
+
+    def section(self, key):
+        return self.get_sections().get(key)
+
     def to_dict(self):
+        sections = self.get_sections()
         return {
             "id": self.id,
             "entity_id": self.entity_id,
             "version": self.version,
-            "section_a_synopsis": self.section_a_synopsis,
-            "section_b_business_model": self.section_b_business_model,
-            "section_c_products": self.section_c_products,
-            "section_d_clients": self.section_d_clients,
-            "section_e_gtm": self.section_e_gtm,
-            "section_f_exec_team": self.section_f_exec_team,
-            "section_g_financials": self.section_g_financials,
-            "section_h_technology": self.section_h_technology,
-            "section_i_partnerships": self.section_i_partnerships,
-            "section_j_competitive": self.section_j_competitive,
-            "section_k_threats": self.section_k_threats,
+            "section_a_synopsis": sections['a'],
+            "section_b_business_model": sections['b'],
+            "section_c_products": sections['c'],
+            "section_d_clients": sections['d'],
+            "section_e_gtm": sections['e'],
+            "section_f_exec_team": sections['f'],
+            "section_g_financials": sections['g'],
+            "section_h_technology": sections['h'],
+            "section_i_partnerships": sections['i'],
+            "section_j_competitive": sections['j'],
+            "section_k_threats": sections['k'],
+            "storage_format": self.storage_format,
             "section_l_appendix": self.section_l_appendix,
             "ceo_brief": self.ceo_brief,
             "overall_confidence": self.overall_confidence,
@@ -181,6 +218,8 @@ class Dossier(Base):
             "prompt_version": self.prompt_version,
             "eval_score": self.eval_score,
             "generation_status": self.generation_status,
+            "generation_meta": self.generation_meta,
+            "last_progress_at": self.last_progress_at.isoformat() if self.last_progress_at else None,
             "generated_at": self.generated_at.isoformat() if self.generated_at else None,
             "generated_by": self.generated_by,
             "created_at": self.created_at.isoformat() if self.created_at else None,
@@ -188,13 +227,21 @@ class Dossier(Base):
 
 
 class DossierFact(Base):
+    """One cited claim, extracted by ai/citations.py. Unique per entity by claim_hash;
+    dossier_id is the version it first appeared in, last_seen_dossier_id the latest (section and
+    span are the latest version's). Every version citing it has a DossierFactLink."""
     __tablename__ = "dossier_facts"
     id = Column(Integer, primary_key=True)
     dossier_id = Column(Integer, ForeignKey("dossiers.id"), nullable=False)
+    last_seen_dossier_id = Column(Integer, ForeignKey("dossiers.id"), index=True)
     entity_id = Column(Integer, ForeignKey("entities.id"), nullable=False)
     section = Column(String(5))
     claim = Column(Text)
+    claim_start = Column(Integer)
+    claim_end = Column(Integer)
+    claim_hash = Column(String(40))
     source_url = Column(String(1000))
+    source_label = Column(String(500))
     source_type = Column(String(20))
     source_date = Column(DateTime)
     confidence = Column(String(10))
@@ -203,14 +250,22 @@ class DossierFact(Base):
     is_hallucination = Column(Boolean, default=False)
     created_at = Column(DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        Index("ux_dossier_facts_entity_claim", "entity_id", "claim_hash", unique=True),
+    )
+
     def to_dict(self):
         return {
             "id": self.id,
             "dossier_id": self.dossier_id,
+            "last_seen_dossier_id": self.last_seen_dossier_id,
             "entity_id": self.entity_id,
             "section": self.section,
             "claim": self.claim,
+            "claim_start": self.claim_start,
+            "claim_end": self.claim_end,
             "source_url": self.source_url,
+            "source_label": self.source_label,
             "source_type": self.source_type,
             "source_date": self.source_date.isoformat() if self.source_date else None,
             "confidence": self.confidence,
@@ -220,6 +275,21 @@ class DossierFact(Base):
         }
 
 
+class DossierFactLink(Base):
+    """A dossier version citing a fact, with where the claim sits in that version's text"""
+    __tablename__ = "dossier_fact_links"
+    id = Column(Integer, primary_key=True)
+    dossier_id = Column(Integer, ForeignKey("dossiers.id"), nullable=False)
+    fact_id = Column(Integer, ForeignKey("dossier_facts.id"), nullable=False, index=True)
+    section = Column(String(5))
+    claim_start = Column(Integer)
+    claim_end = Column(Integer)
+
+    __table_args__ = (
+        Index("ux_dossier_fact_links_dossier_fact", "dossier_id", "fact_id", unique=True),
+    )
+
+
 class Signal(Base):
     __tablename__ = "signals"
     id = Column(Integer, primary_key=True)
@@ -228,6 +298,9 @@ class Signal(Base):
     title = Column(String(500))
     summary = Column(Text)
     source_url = Column(String(1000))
+    # integrations/url_canon.url_hash of source_url, set for signals promoted from news so one
+    # article is one signal; other producers (people moves, email) may share a source URL
+    source_url_hash = Column(String(40))
     source_name = Column(String(255))
     source_type = Column(String(50))
     source_date = Column(DateTime)
@@ -239,9 +312,16 @@ class Signal(Base):
     batch_id = Column(String(100))
     status = Column(String(20), default="new")
     created_at = Column(DateTime, default=datetime.utcnow)
+    # the event this signal reports; set by ai/story_clusterer.py
+    story_id = Column(Integer, ForeignKey("stories.id"))
 
     entity = relationship("Entity", back_populates="signals")
 
+    __table_args__ = (
+        Index("ux_signals_source_url_hash", "source_url_hash", unique=True),
+        Index("ix_signals_story_id", "story_id"),
+    )
+
     def to_dict(self):
         return {
             "id": self.id,
@@ -261,6 +341,47 @@ class Signal(Base):
             "batch_id": self.batch_id,
             "status": self.status,
             "created_at": self.created_at.isoformat() if self.created_at else None,
+            "story_id": self.story_id,
+        }
+
+
+class Story(Base):
+    """One event as reported by one or more signals (news, RSS, web search, email) — see
+    ai/story_clusterer.py. Title, summary and score come from the highest-scoring signal."""
+    __tablename__ = "stories"
+    id = Column(Integer, primary_key=True)
+    entity_id = Column(Integer, ForeignKey("entities.id"), nullable=False)
+    title = Column(String(500))
+    summary = Column(Text)
+    lead_signal_id = Column(Integer)
+    signal_type = Column(String(50))
+    max_score = Column(Integer, default=0)
+    signal_count = Column(Integer, default=1)
+    source_types = Column(JSON)  # distinct Signal.source_type values
+    first_seen_at = Column(DateTime, default=datetime.utcnow)
+    last_seen_at = Column(DateTime, default=datetime.utcnow)
+    notified_slack = Column(Boolean, default=False)
+    status = Column(String(20), default="new")  # new → reviewed by the autonomy engine
+
+    __table_args__ = (
+        Index("ix_stories_status_last_seen_at", "status", "last_seen_at"),
+    )
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "entity_id": self.entity_id,
+            "title": self.title,
+            "summary": self.summary,
+            "lead_signal_id": self.lead_signal_id,
+            "signal_type": self.signal_type,
+            "max_score": self.max_score,
+            "signal_count": self.signal_count,
+            "source_types": self.source_types,
+            "first_seen_at": self.first_seen_at.isoformat() if self.first_seen_at else None,
+            "last_seen_at": self.last_seen_at.isoformat() if self.last_seen_at else None,
+            "notified_slack": self.notified_slack,
+            "status": self.status,
         }
 
 
@@ -270,17 +391,26 @@ class NewsItem(Base):
     entity_id = Column(Integer, ForeignKey("entities.id"), nullable=False)
     headline = Column(String(1000))
     summary = Column(Text)
-    url = Column(String(1000), unique=True)
+    url = Column(String(1000))
+    url_hash = Column(String(40))  # integrations/url_canon.url_hash(url) — the dedup key
     source_name = Column(String(255))
     source_type = Column(String(50))
     published_at = Column(DateTime)
     fetched_at = Column(DateTime, default=datetime.utcnow)
     relevance_score = Column(Integer, default=0)
+    scored_at = Column(DateTime)  # set once the model returned a score; NULL = still in the sweep backlog
+    score_attempts = Column(Integer, default=0)  # scoring calls that included this item
+    scored_by = Column(String(20))  # 'llm', or 'prefilter' for noise scored by ai/relevance_filter.py
     promoted_to_signal = Column(Boolean, default=False)
     created_at = Column(DateTime, default=datetime.utcnow)
 
     entity = relationship("Entity", back_populates="news_items")
 
+    __table_args__ = (
+        Index("ux_news_items_url_hash", "url_hash", unique=True),
+        Index("ix_news_items_scored_at", "scored_at"),
+    )
+
     def to_dict(self):
         return {
             "id": self.id,
@@ -293,10 +423,60 @@ class NewsItem(Base):
             "published_at": self.published_at.isoformat() if self.published_at else None,
             "fetched_at": self.fetched_at.isoformat() if self.fetched_at else None,
             "relevance_score": self.relevance_score,
+            "scored_at": self.scored_at.isoformat() if self.scored_at else None,
+            "score_attempts": self.score_attempts or 0,
+            "scored_by": self.scored_by,
             "promoted_to_signal": self.promoted_to_signal,
             "created_at": self.created_at.isoformat() if self.created_at else None,
         }
 
+class NewsFingerprint(Base):
+    """SimHash of a news item, split into LSH bands — see integrations/near_dup.py"""
+    __tablename__ = "news_fingerprints"
+    id = Column(Integer, primary_key=True)
+    news_item_id = Column(Integer, ForeignKey("news_items.id", ondelete="CASCADE"), unique=True, nullable=False)
+    simhash = Column(BigInteger, nullable=False)
+    band_0 = Column(Integer, nullable=False, index=True)
+    band_1 = Column(Integer, nullable=False, index=True)
+    band_2 = Column(Integer, nullable=False, index=True)
+    band_3 = Column(Integer, nullable=False, index=True)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+
+
+class NewsDuplicate(Base):
+    """A fetched item recognized as a near-duplicate of an existing news item, kept instead of a second row"""
+    __tablename__ = "news_duplicates"
+    id = Column(Integer, primary_key=True)
+    canonical_id = Column(Integer, ForeignKey("news_items.id", ondelete="CASCADE"), nullable=False, index=True)
+    entity_id = Column(Integer, ForeignKey("entities.id"))
+    url = Column(String(1000))
+    url_hash = Column(String(40))
+    headline = Column(String(1000))
+    source_name = Column(String(255))
+    source_type = Column(String(50))
+    published_at = Column(DateTime)
+    distance = Column(Integer)
+    detected_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ux_news_duplicates_url_hash", "url_hash", unique=True),
+    )
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "canonical_id": self.canonical_id,
+            "entity_id": self.entity_id,
+            "url": self.url,
+            "headline": self.headline,
+            "source_name": self.source_name,
+            "source_type": self.source_type,
+            "published_at": self.published_at.isoformat() if self.published_at else None,
+            "distance": self.distance,
+            "detected_at": self.detected_at.isoformat() if self.detected_at else None,
+        }
+
+
 class Person(Base):
     __tablename__ = "people"
     id = Column(Integer, primary_key=True)
@@ -583,3 +763,144 @@ class PushFeedback(Base):
             "actioned_at": self.actioned_at.isoformat() if self.actioned_at else None,
             "push_rationale": self.push_rationale,
         }
+
+
+class Task(Base):
+    """Durable background task — see jobs/task_queue.py"""
+    __tablename__ = "tasks"
+    id = Column(Integer, primary_key=True)
+    task_type = Column(String(50), nullable=False)
+    payload = Column(JSON)
+    status = Column(String(20), default="queued", nullable=False)
+    dedupe_key = Column(String(255))
+    priority = Column(Integer, default=0)
+    attempts = Column(Integer, default=0)
+    max_attempts = Column(Integer, default=3)
+    run_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    locked_by = Column(String(100))
+    locked_at = Column(DateTime)
+    heartbeat_at = Column(DateTime)
+    last_error = Column(Text)
+    result = Column(JSON)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    finished_at = Column(DateTime)
+
+    __table_args__ = (
+        Index("ix_tasks_claim", "status", "run_at"),
+        # At most one queued/running task per dedupe key (e.g. one dossier per entity)
+        Index("ux_tasks_active_dedupe", "dedupe_key", unique=True,
+              postgresql_where=text("status IN ('queued', 'running') AND dedupe_key IS NOT NULL"),
+              sqlite_where=text("status IN ('queued', 'running') AND dedupe_key IS NOT NULL")),
+    )
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "task_type": self.task_type,
+            "payload": self.payload,
+            "status": self.status,
+            "dedupe_key": self.dedupe_key,
+            "priority": self.priority,
+            "attempts": self.attempts,
+            "max_attempts": self.max_attempts,
+            "run_at": self.run_at.isoformat() if self.run_at else None,
+            "locked_by": self.locked_by,
+            "heartbeat_at": self.heartbeat_at.isoformat() if self.heartbeat_at else None,
+            "last_error": self.last_error,
+            "result": self.result,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+
+class FeedState(Base):
+    """Per-feed conditional-GET validators and seen entry ids — see NewsAggregator._fetch_feeds"""
+    __tablename__ = "feed_state"
+    id = Column(Integer, primary_key=True)
+    url = Column(String(1000), unique=True, nullable=False)
+    etag = Column(String(255))
+    last_modified = Column(String(100))
+    last_entry_ids = Column(JSON)
+    last_fetched_at = Column(DateTime)
+    last_changed_at = Column(DateTime)
+    last_status = Column(Integer)
+    last_body_bytes = Column(Integer)
+    fetch_count = Column(Integer, default=0)
+    not_modified_count = Column(Integer, default=0)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "url": self.url,
+            "etag": self.etag,
+            "last_modified": self.last_modified,
+            "entries_tracked": len(self.last_entry_ids or []),
+            "last_fetched_at": self.last_fetched_at.isoformat() if self.last_fetched_at else None,
+            "last_changed_at": self.last_changed_at.isoformat() if self.last_changed_at else None,
+            "last_status": self.last_status,
+            "last_body_bytes": self.last_body_bytes,
+            "fetch_count": self.fetch_count,
+            "not_modified_count": self.not_modified_count,
+        }
+
+
+class NewsPollState(Base):
+    """Per-entity news polling cadence and next due time — see jobs/news_dispatcher.py"""
+    __tablename__ = "news_poll_state"
+    id = Column(Integer, primary_key=True)
+    entity_id = Column(Integer, ForeignKey("entities.id", ondelete="CASCADE"), unique=True, nullable=False)
+    interval_minutes = Column(Float)
+    next_poll_at = Column(DateTime, index=True)
+    last_polled_at = Column(DateTime)
+    last_new_items = Column(Integer)
+    yield_avg = Column(Float, default=0.0)  # moving average of new items per poll
+    poll_count = Column(Integer, default=0)
+
+    def to_dict(self):
+        return {
+            "entity_id": self.entity_id,
+            "interval_minutes": round(self.interval_minutes, 1) if self.interval_minutes else None,
+            "next_poll_at": self.next_poll_at.isoformat() if self.next_poll_at else None,
+            "last_polled_at": self.last_polled_at.isoformat() if self.last_polled_at else None,
+            "last_new_items": self.last_new_items,
+            "yield_avg": round(self.yield_avg or 0, 2),
+            "poll_count": self.poll_count,
+        }
+
+
+class NewsWatermark(Base):
+    """Newest publish time already fetched per entity and source — only later articles are requested"""
+    __tablename__ = "news_watermarks"
+    id = Column(Integer, primary_key=True)
+    entity_id = Column(Integer, ForeignKey("entities.id", ondelete="CASCADE"), nullable=False)
+    source = Column(String(50), nullable=False)
+    last_seen_published_at = Column(DateTime, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ux_news_watermarks_entity_source", "entity_id", "source", unique=True),
+    )
+
+
+class ClassifierModel(Base):
+    """A trained local model, e.g. the news relevance pre-filter (ai/relevance_filter.py)"""
+    __tablename__ = "classifier_models"
+    id = Column(Integer, primary_key=True)
+    name = Column(String(50), nullable=False)
+    weights = Column(LargeBinary, nullable=False)  # numpy .npz
+    threshold = Column(Float)
+    metrics = Column(JSON)
+    trained_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_classifier_models_name_trained_at", "name", "trained_at"),
+    )
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "name": self.name,
+            "threshold": self.threshold,
+            "metrics": self.metrics,
+            "trained_at": self.trained_at.isoformat() if self.trained_at else None,
+        }
@@ -51,3 +51,95 @@ def admin_stats():
             })
     except Exception as e:
         return jsonify({"error": str(e)}), 500
+
+
+@admin_bp.route('/api/admin/circuit-breakers', methods=['GET'])
+@require_role('admin')
+def circuit_breakers():
+    from integrations.circuit_breaker import all_breakers
+    return jsonify({"breakers": all_breakers()})
+
+
+@admin_bp.route('/api/admin/circuit-breakers/<path:name>/reset', methods=['POST'])
+@require_role('admin')
+def reset_circuit_breaker(name):
+    from integrations.circuit_breaker import reset_breaker
+    if not reset_breaker(name):
+        return jsonify({"error": "Breaker not found"}), 404
+    return jsonify({"success": True, "name": name})
+
+
+@admin_bp.route('/api/admin/tasks', methods=['GET'])
+@require_role('admin')
+def task_queue_stats():
+    try:
+        from jobs.task_queue import queue_stats
+        return jsonify(queue_stats())
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@admin_bp.route('/api/admin/tasks/<int:task_id>/retry', methods=['POST'])
+@require_role('admin')
+def retry_task(task_id):
+    """Put a dead task back on the queue with a fresh attempt budget, unless another task
+    already holds its dedupe key"""
+    try:
+        from datetime import datetime
+        from sqlalchemy.exc import IntegrityError
+        from jobs.task_queue import _active_task
+        with get_db() as db:
+            task = db.query(models.Task).filter(models.Task.id == task_id).first()
+            if not task:
+                return jsonify({"error": "Task not found"}), 404
+            if task.status != 'dead':
+                return jsonify({"error": f"Cannot retry a {task.status} task"}), 409
+            active = _active_task(db, task.dedupe_key) if task.dedupe_key else None
+            if active:
+                return jsonify({"error": "Another task with the same dedupe key is queued or running",
+                                "task_id": active.id}), 409
+            task.status = 'queued'
+            task.attempts = 0
+            task.run_at = datetime.utcnow()
+            task.finished_at = None
+            try:
+                db.commit()
+            except IntegrityError:
+                # Enqueued under the same key between our check and commit
+                db.rollback()
+                return jsonify({"error": "Another task with the same dedupe key is queued or running"}), 409
+            return jsonify(task.to_dict())
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@admin_bp.route('/api/admin/dossier-refresh/plan', methods=['GET'])
+@require_role('admin')
+def dossier_refresh_plan():
+    """Preview tonight's refresh ranking and per-dossier cost estimate"""
+    try:
+        from jobs.dossier_refresh import rank_entities, estimate_cost
+        tokens, seconds = estimate_cost()
+        return jsonify({
+            "ranking": rank_entities(),
+            "estimate": {"tokens_per_dossier": tokens, "seconds_per_dossier": seconds},
+        })
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@admin_bp.route('/api/admin/dossier-refresh', methods=['POST'])
+@require_role('admin')
+def trigger_dossier_refresh():
+    """Queue a bulk refresh now; body may override token_budget, time_budget_minutes, max_refreshes"""
+    try:
+        data = request.json or {}
+        payload = {k: int(data[k]) for k in ('token_budget', 'time_budget_minutes', 'max_refreshes', 'concurrency')
+                   if data.get(k)}
+        from jobs.task_queue import enqueue
+        task_id, created = enqueue('dossier.bulk_refresh', payload, dedupe_key='dossier.bulk_refresh')
+        if not created:
+            return jsonify({"error": "Refresh already queued", "task_id": task_id}), 409
+        return jsonify({"success": True, "task_id": task_id}), 202
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
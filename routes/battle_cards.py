@@ -65,29 +65,17 @@ def generate_battle_card():
             ).order_by(models.Dossier.generated_at.desc()).first()
             dossier_id = latest_dossier.id if latest_dossier else None
 
-        import threading
-        from ai.battle_card_agent import BattleCardAgent
-
-        def _gen():
-            agent = BattleCardAgent()
-            card_content = agent.generate(
-                entity_id, dossier_id,
-                data.get('use_case'), data.get('distyl_product')
-            )
-            with get_db() as db2:
-                bc = models.BattleCard(
-                    entity_id=entity_id,
-                    dossier_id=dossier_id,
-                    use_case=data.get('use_case'),
-                    distyl_product=data.get('distyl_product'),
-                    content=card_content,
-                    status='draft',
-                )
-                db2.add(bc)
-                db2.commit()
-
-        threading.Thread(target=_gen, daemon=True).start()
-        return jsonify({"success": True, "message": "Battle card generation started"}), 202
+        from jobs.task_queue import enqueue
+        task_id, created = enqueue('battle_card.generate', {
+            "entity_id": entity_id,
+            "dossier_id": dossier_id,
+            "use_case": data.get('use_case'),
+            "distyl_product": data.get('distyl_product'),
+        }, dedupe_key=f"battle_card:{entity_id}:{data.get('use_case')}:{data.get('distyl_product')}")
+        if not created:
+            return jsonify({"success": True, "message": "Battle card generation already queued",
+                            "task_id": task_id}), 202
+        return jsonify({"success": True, "message": "Battle card generation started", "task_id": task_id}), 202
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -35,11 +35,10 @@ def get_digest(digest_id):
 @require_login
 def generate_digest():
     try:
-        import threading
-        from ai.digest_agent import DigestAgent
-        agent = DigestAgent()
-        threading.Thread(target=agent.generate, daemon=True).start()
-        return jsonify({"success": True, "message": "Digest generation started"}), 202
+        from jobs.task_queue import enqueue
+        task_id, created = enqueue('digest.generate', dedupe_key='digest')
+        message = "Digest generation started" if created else "Digest generation already queued"
+        return jsonify({"success": True, "message": message, "task_id": task_id}), 202
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
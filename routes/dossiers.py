@@ -8,6 +8,11 @@ from middleware.auth import require_login
 dossiers_bp = Blueprint('dossiers', __name__)
 
 
+def _is_circuit_open(brief):
+    from ai.base_agent import CIRCUIT_OPEN_ERROR
+    return str(brief.get('error', '')).startswith(CIRCUIT_OPEN_ERROR)
+
+
 @dossiers_bp.route('/api/dossiers', methods=['GET'])
 @require_login
 def get_dossiers():
@@ -35,6 +40,67 @@ def get_dossier(dossier_id):
         return jsonify({"error": str(e)}), 500
 
 
+@dossiers_bp.route('/api/dossiers/<int:dossier_id>/progress', methods=['GET'])
+@require_login
+def get_dossier_progress(dossier_id):
+    """Completed vs pending sections and elapsed time, readable while generation runs"""
+    try:
+        from ai.dossier_agent import SECTION_GRAPH
+        with get_db() as db:
+            dossier = db.query(models.Dossier).filter(models.Dossier.id == dossier_id).first()
+            if not dossier:
+                return jsonify({"error": "Not found"}), 404
+
+            meta = dossier.generation_meta or {}
+            completed = meta.get('completed_sections') or []
+            started_at = meta.get('started_at')
+            elapsed = None
+            if started_at:
+                end = dossier.generated_at if dossier.generation_status == 'completed' else datetime.utcnow()
+                elapsed = round((end - datetime.fromisoformat(started_at)).total_seconds(), 1)
+
+            return jsonify({
+                "dossier_id": dossier_id,
+                "status": dossier.generation_status,
+                "mode": meta.get('mode'),
+                "attempts": meta.get('attempts', 0),
+                "completed_sections": completed,
+                "pending_sections": [k for k in SECTION_GRAPH if k not in completed],
+                "reused_sections": meta.get('reused_sections', []),
+                "section_timings": meta.get('section_timings', {}),
+                "elapsed_seconds": elapsed,
+                "last_progress_at": dossier.last_progress_at.isoformat() if dossier.last_progress_at else None,
+            })
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@dossiers_bp.route('/api/dossiers/<int:dossier_id>/resume', methods=['POST'])
+@require_login
+def resume_dossier_generation(dossier_id):
+    """Resume a failed (or stale: no checkpoint for the watchdog's STALE_MINUTES) generation from
+    its last checkpointed section, in the mode it was started with"""
+    from jobs.dossier_watchdog import is_stale, resume_dossier
+    try:
+        with get_db() as db:
+            dossier = db.query(models.Dossier).filter(models.Dossier.id == dossier_id).first()
+            if not dossier:
+                return jsonify({"error": "Not found"}), 404
+            if dossier.generation_status != 'failed' and not is_stale(dossier):
+                return jsonify({"error": f"Cannot resume a {dossier.generation_status} dossier"}), 409
+            dossier.generation_status = 'pending'
+            dossier.last_progress_at = datetime.utcnow()
+            db.commit()
+            entity_id = dossier.entity_id
+
+        task_id, created = resume_dossier(dossier_id, entity_id)
+        if not created:
+            return jsonify({"error": "Generation already queued for this entity", "task_id": task_id}), 409
+        return jsonify({"success": True, "dossier_id": dossier_id, "status": "pending", "task_id": task_id}), 202
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
 @dossiers_bp.route('/api/dossiers/generate', methods=['POST'])
 @require_login
 def generate_dossier():
@@ -44,6 +110,15 @@ def generate_dossier():
         entity_id = data.get('entity_id')
         if not entity_id:
             return jsonify({"error": "entity_id required"}), 400
+        mode = data.get('mode', 'full')
+        if mode not in ('full', 'incremental'):
+            return jsonify({"error": "mode must be 'full' or 'incremental'"}), 400
+
+        from jobs.task_queue import find_active
+        queued = find_active(f"dossier:{entity_id}")
+        if queued:
+            return jsonify({"error": "Generation already queued", "task_id": queued["id"],
+                            "dossier_id": (queued["payload"] or {}).get("dossier_id")}), 409
 
         with get_db() as db:
             entity = db.query(models.Entity).filter(models.Entity.id == entity_id).first()
@@ -73,26 +148,21 @@ def generate_dossier():
             db.refresh(dossier)
             dossier_id_new = dossier.id
 
-        def _run_generation(dossier_id, eid):
-            try:
-                from ai.dossier_agent import DossierAgent
-                DossierAgent().generate(dossier_id, eid)
-            except Exception as gen_err:
-                # Clean up orphaned row on failure
-                try:
-                    with get_db() as cleanup_db:
-                        d = cleanup_db.query(models.Dossier).filter(models.Dossier.id == dossier_id).first()
-                        if d and d.generation_status == 'pending':
-                            d.generation_status = 'failed'
-                            cleanup_db.commit()
-                except Exception:
-                    pass
-
-        import threading
-        t = threading.Thread(target=_run_generation, args=(dossier_id_new, entity_id), daemon=True)
-        t.start()
-
-        return jsonify({"success": True, "dossier_id": dossier_id_new, "status": "pending", "version": version}), 202
+        from jobs.task_queue import enqueue
+        task_id, created = enqueue(
+            'dossier.generate',
+            {"dossier_id": dossier_id_new, "entity_id": entity_id, "mode": mode},
+            dedupe_key=f"dossier:{entity_id}",
+        )
+        if not created:
+            # Another request queued this entity between our check and insert
+            with get_db() as db:
+                db.query(models.Dossier).filter(models.Dossier.id == dossier_id_new).delete()
+                db.commit()
+            return jsonify({"error": "Generation already queued", "task_id": task_id}), 409
+
+        return jsonify({"success": True, "dossier_id": dossier_id_new, "status": "pending",
+                        "version": version, "mode": mode, "task_id": task_id}), 202
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -118,6 +188,9 @@ def get_ceo_brief(dossier_id):
         agent = DossierAgent()
         brief = agent.generate_ceo_brief(dossier_id, entity_name)
 
+        if _is_circuit_open(brief):
+            return jsonify({"error": brief['error'], "degraded": True, "dossier_id": dossier_id}), 503
+
         with get_db() as db:
             d = db.query(models.Dossier).filter(models.Dossier.id == dossier_id).first()
             if d:
@@ -140,11 +213,19 @@ def regenerate_ceo_brief(dossier_id):
                 return jsonify({"error": "Not found"}), 404
             entity = db.query(models.Entity).filter(models.Entity.id == dossier.entity_id).first()
             entity_name = entity.name if entity else "Unknown"
+            cached_brief = dossier.ceo_brief
 
         from ai.dossier_agent import DossierAgent
         agent = DossierAgent()
         brief = agent.generate_ceo_brief(dossier_id, entity_name)
 
+        if _is_circuit_open(brief):
+            # Keep the stored brief rather than overwriting it with an error
+            if cached_brief:
+                return jsonify({"ceo_brief": cached_brief, "dossier_id": dossier_id,
+                                "degraded": True, "error": brief['error']})
+            return jsonify({"error": brief['error'], "degraded": True, "dossier_id": dossier_id}), 503
+
         with get_db() as db:
             d = db.query(models.Dossier).filter(models.Dossier.id == dossier_id).first()
             if d:
@@ -7,6 +7,7 @@ from sqlalchemy import or_
 from database import get_db
 import models
 from middleware.auth import require_login
+from integrations import entity_matcher
 
 entities_bp = Blueprint('entities', __name__)
 
@@ -87,12 +88,14 @@ def create_entity():
                 primary_use_cases=data.get('primary_use_cases'),
                 known_clients=data.get('known_clients'),
                 products=data.get('products'),
+                aliases=data.get('aliases'),
                 distyl_exposure=data.get('distyl_exposure', 'none'),
                 threat_level=data.get('threat_level', 'monitor'),
                 status=data.get('status', 'active'),
             )
             db.add(entity)
             db.commit()
+            entity_matcher.invalidate()
             db.refresh(entity)
             return jsonify(entity.to_dict()), 201
 
@@ -137,12 +140,13 @@ def update_entity(entity_id):
 
             for field in ['name', 'entity_type', 'website', 'description', 'headquarters',
                           'employee_count', 'funding_stage', 'industry', 'primary_use_cases',
-                          'known_clients', 'products', 'distyl_exposure', 'threat_level', 'status']:
+                          'known_clients', 'products', 'aliases', 'distyl_exposure', 'threat_level', 'status']:
                 if field in data:
                     setattr(entity, field, data[field])
 
             entity.updated_at = datetime.utcnow()
             db.commit()
+            entity_matcher.invalidate()
             db.refresh(entity)
             return jsonify(entity.to_dict())
 
@@ -161,6 +165,7 @@ def archive_entity(entity_id):
             entity.status = 'archived'
             entity.updated_at = datetime.utcnow()
             db.commit()
+            entity_matcher.invalidate()
             return jsonify({"success": True})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -62,14 +62,10 @@ def gmail_push():
         if not email:
             return jsonify({"ok": True})
 
-        # Process in background so we ack Pub/Sub quickly
-        import threading
-        t = threading.Thread(
-            target=_process_gmail_push,
-            args=(email, history_id),
-            daemon=True
-        )
-        t.start()
+        # Queue so we ack Pub/Sub quickly; Pub/Sub redelivers the same historyId, so dedupe on it
+        from jobs.task_queue import enqueue
+        enqueue('gmail.push', {"email": email, "history_id": history_id},
+                dedupe_key=f"gmail:{email}:{history_id}")
 
         return jsonify({"ok": True})
 
@@ -101,14 +97,17 @@ def _process_gmail_push(email: str, history_id: str):
             messages = list_messages(service, max_results=20)
 
             # Get all tracked entity names for mention scanning
+            from integrations.entity_matcher import EntityMatcher, get_matcher
             entities = db.query(models.Entity).filter(models.Entity.status == 'active').all()
             entity_names = {e.id: e.name for e in entities}
+            matcher = get_matcher() or EntityMatcher(entity_names)
 
             # Get active deal account names for deal alert matching
             deals = db.query(models.Deal).filter(
                 models.Deal.stage.notin_(['closed_won', 'closed_lost'])
             ).all()
-            deal_accounts = {d.id: d.account_name.lower() for d in deals}
+            deal_accounts = {d.id: d.account_name for d in deals if d.account_name}
+            deal_matcher = EntityMatcher(deal_accounts)
 
             for msg_meta in messages[:10]:  # Process latest 10
                 msg_id = msg_meta.get('id')
@@ -129,13 +128,9 @@ def _process_gmail_push(email: str, history_id: str):
                 subject = msg.get('subject', '')
                 sender = msg.get('sender', '')
                 body = msg.get('body', '')
-                full_text = f"{subject} {body}".lower()
 
-                # Find entity mentions
-                mentioned_entities = []
-                for eid, ename in entity_names.items():
-                    if ename.lower() in full_text:
-                        mentioned_entities.append(eid)
+                # Find entity mentions (names and aliases, whole words only)
+                mentioned_entities = sorted(matcher.match(subject, body) & entity_names.keys())
 
                 if not mentioned_entities:
                     continue
@@ -153,6 +148,8 @@ def _process_gmail_push(email: str, history_id: str):
                 db.add(mention)
                 db.flush()
 
+                mentioned_deals = sorted(deal_matcher.match(subject, body))
+
                 # Create Signal for each mentioned entity
                 signal_ids = []
                 for eid in mentioned_entities:
@@ -174,11 +171,8 @@ def _process_gmail_push(email: str, history_id: str):
                     signal_ids.append(signal.id)
 
                     # Check for deal account match → immediate Slack alert
-                    entity_name_lower = entity_names[eid].lower()
-                    for did, account_name in deal_accounts.items():
-                        if account_name in full_text or entity_name_lower in full_text:
-                            _send_deal_alert(entity_names[eid], subject, sender, account_name)
-                            break
+                    if mentioned_deals:
+                        _send_deal_alert(entity_names[eid], subject, sender, deal_accounts[mentioned_deals[0]])
 
                 mention.signal_ids = signal_ids
                 db.commit()
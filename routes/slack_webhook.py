@@ -46,14 +46,24 @@ def slack_commands():
         return jsonify({"response_type": "ephemeral", "text": f"Error: {str(e)}"})
 
 
+def _find_entity(db, text):
+    """Entity named (or aliased) in the command text, else the first whose name contains it."""
+    from integrations.entity_matcher import get_matcher
+    matcher = get_matcher()
+    entity_ids = sorted(matcher.match(text)) if matcher else []
+    if entity_ids:
+        entity = db.query(models.Entity).filter(models.Entity.id == entity_ids[0]).first()
+        if entity:
+            return entity
+    return db.query(models.Entity).filter(models.Entity.name.ilike(f'%{text}%')).first()
+
+
 def handle_intel(entity_name):
     if not entity_name:
         return jsonify({"response_type": "ephemeral", "text": "Usage: /intel [company name]"})
 
     with get_db() as db:
-        entity = db.query(models.Entity).filter(
-            models.Entity.name.ilike(f'%{entity_name}%')
-        ).first()
+        entity = _find_entity(db, entity_name)
         if not entity:
             return jsonify({"response_type": "ephemeral", "text": f"No entity found matching '{entity_name}'"})
 
@@ -62,7 +72,8 @@ def handle_intel(entity_name):
             models.Dossier.generation_status == 'completed'
         ).order_by(models.Dossier.generated_at.desc()).first()
 
-        synopsis = (latest.section_a_synopsis[:800] if latest and latest.section_a_synopsis
+        latest_synopsis = latest.section('a') if latest else None
+        synopsis = (latest_synopsis[:800] if latest_synopsis
                     else entity.description or "No dossier available yet.")
 
         blocks = [
@@ -80,7 +91,7 @@ def handle_signals(entity_name):
         return jsonify({"response_type": "ephemeral", "text": "Usage: /signals [company name]"})
 
     with get_db() as db:
-        entity = db.query(models.Entity).filter(models.Entity.name.ilike(f'%{entity_name}%')).first()
+        entity = _find_entity(db, entity_name)
         if not entity:
             return jsonify({"response_type": "ephemeral", "text": f"No entity found matching '{entity_name}'"})
 
@@ -50,6 +50,13 @@ app.register_blueprint(chat_bp)
 app.register_blueprint(admin_bp)
 
 
+# Background tasks (dossiers, battle cards, digests, Gmail pushes) are queued in the database.
+# Each web process runs a small worker unless a dedicated worker.py process handles them.
+if os.getenv('TASK_WORKER_EMBEDDED', 'true').lower() == 'true':
+    from jobs.task_queue import start_embedded_worker
+    start_embedded_worker()
+
+
 @app.route('/api/health')
 def health():
     return jsonify({"status": "ok", "service": "distyl-intel", "version": "1.0.0"})
@@ -30,6 +30,7 @@ def seed_initial_data():
             },
             {
                 "name": "Google Cloud Healthcare AI",
+                "aliases": ["Google Cloud Healthcare API", "Cloud Healthcare API"],
                 "entity_type": "competitor",
                 "website": "https://cloud.google.com/healthcare-api",
                 "description": "GCP healthcare AI suite -- strong in CX for Healthcare use cases",
@@ -41,6 +42,7 @@ def seed_initial_data():
             },
             {
                 "name": "IBM Watson Health",
+                "aliases": ["Watson Health", "Merative"],
                 "entity_type": "competitor",
                 "website": "https://www.ibm.com/watson-health",
                 "description": "IBM AI for healthcare -- CX for Healthcare and clinical decision support",
@@ -52,6 +54,7 @@ def seed_initial_data():
             },
             {
                 "name": "Palantir",
+                "aliases": ["Palantir Technologies"],
                 "entity_type": "competitor",
                 "website": "https://www.palantir.com",
                 "description": "Data analytics and AI operations platform, enterprise government and commercial",
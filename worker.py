@@ -0,0 +1,52 @@
+"""
+Distyl Intel Portal — background task worker
+
+    python worker.py                      # all task types
+    python worker.py --types dossier.generate --concurrency 4
+
+Run as many as needed, on as many nodes as needed; they coordinate through the tasks table.
+Set TASK_WORKER_EMBEDDED=false on the web process when this runs separately.
+"""
+import argparse
+import os
+import signal
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--types', help='comma-separated task types (default: all)')
+    parser.add_argument('--concurrency', type=int, default=None)
+    args = parser.parse_args()
+
+    from database import init_db
+    import models
+    from jobs.task_queue import TaskWorker, task_types
+
+    init_db()
+    allowed = [t.strip() for t in args.types.split(',')] if args.types else None
+    unknown = set(allowed or []) - set(task_types())
+    if unknown:
+        parser.error(f"unknown task types: {', '.join(sorted(unknown))}")
+
+    worker = TaskWorker(concurrency=args.concurrency, allowed_types=allowed)
+
+    def _shutdown(signum, frame):
+        # Finish what we hold; anything cut off by a hard kill is requeued when its lease expires
+        print(f"🛑 Signal {signum} — draining task worker")
+        threading.Thread(target=worker.stop, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, _shutdown)
+    signal.signal(signal.SIGINT, _shutdown)
+    worker.run()
+
+
+if __name__ == '__main__':
+    main()